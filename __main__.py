@@ -1,4 +1,5 @@
-from game import Game, set_game_settings
+from game import Game, GameOptions, set_game_settings
+from telemetry import TELEMETRY_PATH
 
 ######################################################
 ######################################################
@@ -8,6 +9,11 @@ SCALE_FACTOR = 0.75 # 0.4 <= SCALE_FACTOR < 1. Recommended: 0.75
 asteriod_amount = 6
 bullets_amount = 3
 powered_up_bullets = 5
+record_file = None  # e.g. 'session.jsonl' - records the game input, play it again with game.replay_session(record_file)
+dirty_rects = False  # True - updates only the changed parts of the screen instead of the whole screen every frame
+stress_mode = False  # True - level of detail for hundreds of asteroids (try asteriod_amount = 500), F3 shows the timings
+telemetry_file = TELEMETRY_PATH  # .jsonl or .bin - frame and round stats, written in the background. None - off
+prometheus_file = None  # e.g. 'space_rocks.prom' - totals for the Prometheus textfile collector
 
 ######################################################
 ######################################################
@@ -15,5 +21,6 @@ powered_up_bullets = 5
 set_game_settings(SCALE_FACTOR, asteriod_amount, bullets_amount, powered_up_bullets)
 
 if __name__ == '__main__':
-    space_rocks = Game()
+    space_rocks = Game(options=GameOptions(record=record_file, dirty_rects=dirty_rects, stress=stress_mode,
+                                           telemetry_path=telemetry_file, prometheus_path=prometheus_file))
     space_rocks.main_loop()
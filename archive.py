@@ -0,0 +1,231 @@
+"""Packed asset archive - every sprite and sound in one file with an index, read through a memory map.
+
+    python archive.py build     packs assets/ into assets.pak
+    python archive.py list      shows the entries of assets.pak
+
+File layout: header (magic, version, index size), the index (json - name -> offset, size and mtime of the source file,
+offsets from the end of the index) and then the files one after the other, as they are on disk (.png / .wav).
+When the archive exists, load_sprite and the sound bank read from it. Entries whose source file changed after the
+build are ignored and the loose file is read instead, so a forgotten rebuild never shows an old image.
+"""
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame.image
+from pygame.mixer import Sound
+
+ROOT = os.path.dirname(os.path.abspath(__file__))  # Assets are found from here, not from the current directory
+ASSETS_DIR = os.path.join(ROOT, 'assets')
+ARCHIVE_PATH = os.path.join(ROOT, 'assets.pak')
+ARCHIVE_EXTENSIONS = ('.png', '.wav')  # The music (.mp3) is streamed by the mixer, so it stays a loose file
+
+MAGIC = b'SRPK'
+VERSION = 1
+HEADER = struct.Struct('<4sII')  # Magic, version, index size
+PRELOAD_WORKERS = os.cpu_count() or 1
+
+
+class AssetArchive:
+    """ Reads the entries of an archive from a memory map - only the pages of the entries used are read from disk.
+    Entries can be decoded in a thread pool ahead of time (preload) or when they are first asked for (get).
+            :param path: str - archive file.
+            :param assets_dir: str - folder of the loose files, to find entries that are older than their source.
+            """
+
+    def __init__(self, path=ARCHIVE_PATH, assets_dir=ASSETS_DIR):
+        self.path = path
+        self.assets_dir = assets_dir
+        self._executor = None
+        self._pending = {}  # Name -> Future of the decoded entry
+        self.preloaded = 0
+        self.lazy_loads = 0
+        self._map = None
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_size = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f'{path} is not an asset archive of version {VERSION}')
+            index = json.loads(self._map[HEADER.size:HEADER.size + index_size])
+            self._data_start = HEADER.size + index_size  # Offsets of the index are from here
+            self.index = {name: entry for name, entry in index.items() if not self._stale(name, entry)}
+        except Exception:  # Not left open by an archive that can't be used
+            self.close()
+            raise
+        self.stale = sorted(set(index) - set(self.index))
+
+    def _stale(self, name, entry):
+        """Checks if the source file of an entry changed after the build.
+                :param name: str - name of the entry.
+                :param entry: dict - index entry.
+                :return: bool - False also when there is no source file (the archive is shipped alone).
+                """
+        try:
+            stat = os.stat(os.path.join(self.assets_dir, name))
+        except OSError:
+            return False
+        return stat.st_mtime_ns != entry['mtime_ns'] or stat.st_size != entry['size']
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def names(self, prefix=''):
+        """Names of the entries in a folder of the archive.
+                :param prefix: str - e.g. 'sprites/'.
+                :return: list of str
+                """
+        return sorted(name for name in self.index if name.startswith(prefix))
+
+    def read(self, name):
+        """Returns the bytes of an entry, as they were on disk.
+                :param name: str - e.g. 'sprites/space.png'.
+                :return: bytes
+                """
+        start = self._data_start + self.index[name]['offset']
+        return self._map[start:start + self.index[name]['size']]
+
+    def decode(self, name):
+        """Decodes an entry - safe to run in other threads. Images are not converted to the display format here,
+        convert() needs the main thread.
+                :param name: str - .png or .wav entry.
+                :return: pygame.Surface or pygame.mixer.Sound
+                """
+        data = io.BytesIO(self.read(name))
+        if name.endswith('.wav'):
+            return Sound(file=data)
+        return pygame.image.load(data, name)
+
+    def preload(self, names):
+        """Starts decoding entries in the thread pool. get() then waits only for what isn't done yet. Does nothing
+        on a single core.
+                :param names: list of str - entries of the archive (others are skipped).
+                """
+        if PRELOAD_WORKERS < 2:
+            return  # One core - the threads would only slow down the main thread, get() decodes on first use
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=PRELOAD_WORKERS, thread_name_prefix='assets')
+        for name in names:
+            if name in self.index and name not in self._pending:
+                self._pending[name] = self._executor.submit(self.decode, name)
+                self.preloaded += 1
+
+    def get(self, name):
+        """Returns a decoded entry - from the preload if it was started, else decoded now.
+                :param name: str
+                :return: pygame.Surface, pygame.mixer.Sound or None when the archive has no such (fresh) entry.
+                """
+        future = self._pending.pop(name, None)
+        if future is not None:
+            return future.result()
+        if name not in self.index:
+            return None
+        self.lazy_loads += 1
+        return self.decode(name)
+
+    def stats(self):
+        """Counts of the archive.
+                :return: dict
+                """
+        return {
+            'entries': len(self.index),
+            'stale': len(self.stale),
+            'preloaded': self.preloaded,
+            'lazy_loads': self.lazy_loads,
+            'bytes': len(self._map),
+        }
+
+    def close(self):
+        """Stops the preload and closes the file.
+                """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+_archive = None
+_archive_checked = False
+
+
+def get_archive():
+    """Opens the archive once, on first use.
+            :return: AssetArchive or None when there is no archive - the loose files are used then.
+            """
+    global _archive, _archive_checked
+    if not _archive_checked:
+        _archive_checked = True
+        if os.path.exists(ARCHIVE_PATH):
+            try:
+                _archive = AssetArchive()
+            except (OSError, ValueError, KeyError, struct.error) as error:  # Unreadable or broken - the loose files
+                warnings.warn(f'Ignoring the asset archive: {error}')
+    return _archive
+
+
+def build_archive(assets_dir=ASSETS_DIR, path=ARCHIVE_PATH):
+    """Packs every sprite and sound into one archive. Written to a temporary file first, so a running game never
+    reads half an archive.
+            :param assets_dir: str - folder with the sprites and sounds folders.
+            :param path: str - archive file to write.
+            :return: dict - the index.
+            """
+    files = []
+    for folder in sorted(os.listdir(assets_dir)):
+        if not os.path.isdir(os.path.join(assets_dir, folder)):
+            continue
+        for file in sorted(os.listdir(os.path.join(assets_dir, folder))):
+            if os.path.splitext(file)[1] in ARCHIVE_EXTENSIONS:
+                files.append(f'{folder}/{file}')
+
+    index = {}
+    offset = 0
+    for name in files:
+        stat = os.stat(os.path.join(assets_dir, name))
+        index[name] = {'offset': offset, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        offset += stat.st_size
+    index_bytes = json.dumps(index, sort_keys=True).encode()
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as archive_file:
+        archive_file.write(HEADER.pack(MAGIC, VERSION, len(index_bytes)))
+        archive_file.write(index_bytes)
+        for name in files:
+            with open(os.path.join(assets_dir, name), 'rb') as source:
+                archive_file.write(source.read())
+    os.replace(temp_path, path)
+    return index
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+    if command == 'build':
+        start = time.perf_counter()
+        index = build_archive()
+        size = os.path.getsize(ARCHIVE_PATH)
+        print(f'{len(index)} assets, {size / 1024 / 1024:.1f} MB -> {ARCHIVE_PATH} '
+              f'({time.perf_counter() - start:.2f} s)')
+    elif command == 'list':
+        archive = get_archive()
+        if archive is None:
+            print(f'No archive at {ARCHIVE_PATH} - run: python archive.py build')
+            return
+        for name in archive.names():
+            print(f'{name:<30} {archive.index[name]["size"]:>10} bytes')
+        for name in archive.stale:
+            print(f'{name:<30} changed after the build - the loose file is used')
+    else:
+        print(__doc__)
+
+
+if __name__ == '__main__':
+    main()
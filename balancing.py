@@ -0,0 +1,305 @@
+"""Monte-Carlo balancing of the game settings. Plays many headless games (no window, no sound, no drawing) for every
+combination of settings with a computer pilot, spread over all the cores, and prints a table of the results.
+
+    python balancing.py --asteroids 4,6,8 --bullets 3,5 --games 1000
+    python balancing.py --mode hard,easy --set Spaceship.MAX_SPEED=9,11,13 --pilot random --out results.csv
+    python balancing.py --set Game.power_up_option_interval_hard=5000,8000 --workers 4 --out results.json
+    python balancing.py --games 100000 --scores sim_scores.log
+
+Every setting reports:
+    win_rate - part of the games where all the asteroids were destroyed.
+    time_to_clear - average game seconds to win (won games only).
+    survival - average game seconds played (until win, death or the tick limit).
+    asteroids_destroyed, fastest_bullet_speed, score - averages over all the games.
+With --scores every game is also added to a score log (see ScoreStore), separate from the scores of the players.
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+import game
+from game import Game, set_game_settings
+from inputs import InputFrame, ScriptedInput
+from modules import Spaceship
+from scores import ScoreStore
+from simulation import random_streams
+
+MAX_TICKS = 60 * 120  # A game that isn't over after 2 minutes of game time is stopped
+CONSTANT_CLASSES = {'Game': Game, 'Spaceship': Spaceship}  # Classes whose constants can be set with --set
+AIM_ANGLE = 8  # Degrees - the aiming pilot shoots when the nearest asteroid is this close to straight ahead
+
+# Game of the worker process and its scale - reset for every game instead of made again (see new_game)
+worker_game = None
+worker_scale = None
+
+
+def random_pilot(rng):
+    """Pilot that holds random keys for random times and shoots at random.
+            :param rng: random.Random - the pilot's own random numbers (not the game's).
+            :return: function(tick, game) for ScriptedInput.
+            """
+    held = []
+    until = [0]
+
+    def pilot(tick, space_rocks):
+        if tick == 0:
+            return InputFrame.create(key_down=[pygame.K_SPACE])  # Play! from the menu
+        if tick >= until[0]:
+            held[:] = rng.choice([[], [pygame.K_UP], [pygame.K_LEFT], [pygame.K_RIGHT],
+                                  [pygame.K_UP, pygame.K_LEFT], [pygame.K_UP, pygame.K_RIGHT]])
+            until[0] = tick + rng.randint(5, 40)
+        return InputFrame.create(pressed=held, key_down=[pygame.K_SPACE] if rng.random() < 0.1 else [])
+    return pilot
+
+
+def aim_pilot(rng):
+    """Pilot that turns to the nearest asteroid and shoots when it's in front, with a bit of random thrust.
+            :param rng: random.Random - the pilot's own random numbers (not the game's).
+            :return: function(tick, game) for ScriptedInput.
+            """
+    def pilot(tick, space_rocks):
+        if tick == 0:
+            return InputFrame.create(key_down=[pygame.K_SPACE])
+        spaceship = space_rocks.spaceship
+        if spaceship is None or not space_rocks.asteroids:
+            return None
+        nearest = min(space_rocks.asteroids, key=lambda a: spaceship.position.distance_squared_to(a.position))
+        angle = spaceship.direction.angle_to(nearest.position - spaceship.position)
+        angle = (angle + 180) % 360 - 180  # -180 to 180, positive is clockwise on screen
+        pressed = []
+        if angle > AIM_ANGLE / 2:
+            pressed.append(pygame.K_RIGHT)
+        elif angle < -AIM_ANGLE / 2:
+            pressed.append(pygame.K_LEFT)
+        if rng.random() < 0.2:
+            pressed.append(pygame.K_UP)
+        shoot = abs(angle) < AIM_ANGLE and tick % 6 == 0
+        return InputFrame.create(pressed=pressed, key_down=[pygame.K_SPACE] if shoot else [])
+    return pilot
+
+
+pilots = {'random': random_pilot, 'aim': aim_pilot}
+
+
+def apply_setting(setting):
+    """Sets the settings of the game - the module settings, the mode and the class constants.
+            :param setting: dict - scale, asteroids, bullets, powered_bullets, mode and 'Class.CONSTANT' keys.
+            """
+    set_game_settings(setting['scale'], setting['asteroids'], setting['bullets'], setting['powered_bullets'])
+    game.shield_state = setting['mode'] == 'easy'
+    for name, value in setting.items():
+        if '.' in name:
+            class_name, constant = name.split('.')
+            setattr(CONSTANT_CLASSES[class_name], constant, value)
+
+
+def new_game(seed, pilot, scale):
+    """Gets the game of the worker process ready for a new game. The first game is created, the next ones only
+    reset() it - the display, the sprites and the pools are kept. A new scale needs a new game.
+            :param seed: int - seed of the random streams.
+            :param pilot: ScriptedInput.
+            :param scale: float - SCALE_FACTOR of the setting.
+            :return: Game
+            """
+    global worker_game, worker_scale
+    if worker_game is None or worker_scale != scale:
+        worker_game = Game(headless=True, input_source=pilot, seed=seed)
+        worker_scale = scale
+        return worker_game
+    random_streams.seed(seed)  # The same streams as a new game with this seed
+    worker_game.input_source = pilot
+    worker_game.rounds = 0
+    worker_game.fastest_bullet_speed = 0
+    worker_game.reset()
+    return worker_game
+
+
+def play_game(task):
+    """Plays one headless game - runs in the worker processes.
+            :param task: tuple - (setting index, setting, seed, pilot name, max ticks).
+            :return: tuple - (setting index, result dict).
+            """
+    index, setting, seed, pilot_name, max_ticks = task
+    apply_setting(setting)
+    if Game.score_store.path is not None:
+        Game.score_store = ScoreStore(path=None)  # The computer pilots don't go into the scores of the players
+    pilot = ScriptedInput(pilots[pilot_name](random.Random(seed)))
+    space_rocks = new_game(seed, pilot, setting['scale'])
+    pilot.game = space_rocks
+    ticks = 0
+    while ticks < max_ticks and space_rocks.running:
+        space_rocks.step()
+        ticks += 1
+        if not space_rocks.menu_state and (space_rocks.spaceship is None or space_rocks.win_option):
+            break
+    return index, {
+        'won': space_rocks.win_option,
+        'seconds': ticks / space_rocks.target_fps,
+        'asteroids_destroyed': space_rocks.asteroids_destroyed,
+        'fastest_bullet_speed': space_rocks.fastest_bullet_speed,
+        'score': space_rocks.score,
+    }
+
+
+class Results:
+    """ Sums of the results of one setting.
+            :param setting: dict.
+            """
+
+    def __init__(self, setting):
+        self.setting = setting
+        self.games = 0
+        self.wins = 0
+        self.win_seconds = 0.0
+        self.seconds = 0.0
+        self.asteroids_destroyed = 0
+        self.fastest_bullet_speed = 0.0
+        self.score = 0.0
+
+    def add(self, result):
+        """Adds the result of one game.
+                :param result: dict from play_game.
+                """
+        self.games += 1
+        self.seconds += result['seconds']
+        if result['won']:
+            self.wins += 1
+            self.win_seconds += result['seconds']
+        self.asteroids_destroyed += result['asteroids_destroyed']
+        self.fastest_bullet_speed += result['fastest_bullet_speed']
+        self.score += result['score']
+
+    def row(self):
+        """Averages of the setting.
+                :return: dict - the setting and its results.
+                """
+        games = self.games or 1
+        return dict(self.setting, **{
+            'games': self.games,
+            'win_rate': self.wins / games,
+            'time_to_clear': self.win_seconds / self.wins if self.wins else math.nan,
+            'survival': self.seconds / games,
+            'asteroids_destroyed': self.asteroids_destroyed / games,
+            'fastest_bullet_speed': self.fastest_bullet_speed / games,
+            'score': self.score / games,
+        })
+
+
+def settings_grid(values):
+    """Helper method to build every combination of the settings.
+            :param values: dict - name -> list of values.
+            :return: list of dict.
+            """
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*values.values())]
+
+
+def run(grid, games, pilot='aim', workers=None, max_ticks=MAX_TICKS, scores=None):
+    """Plays the games of all the settings in a process pool.
+            :param grid: list of settings (dict).
+            :param games: int - games per setting, seeds 0 to games-1 (the same seeds for every setting).
+            :param pilot: str - 'aim' or 'random'.
+            :param workers: int or None - processes, None is all the cores.
+            :param max_ticks: int - ticks before a game is stopped.
+            :param scores: ScoreStore or None - adds every game to it, from this process only.
+            :return: list of dict - a row per setting.
+            """
+    results = [Results(setting) for setting in grid]
+    tasks = [(index, setting, seed, pilot, max_ticks) for index, setting in enumerate(grid) for seed in range(games)]
+    workers = workers or os.cpu_count()
+    chunksize = max(1, len(tasks) // (workers * 8))  # Big enough to cut the overhead, small enough to balance
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for index, result in executor.map(play_game, tasks, chunksize=chunksize):
+            results[index].add(result)
+            if scores:
+                scores.add(result['score'], int(result['seconds'] * 1000), result['asteroids_destroyed'])
+    return [result.row() for result in results]
+
+
+def print_table(rows):
+    """Prints the results as a table.
+            :param rows: list of dict.
+            """
+    columns = list(rows[0])
+    widths = [max(len(column), 10) for column in columns]
+    print('  '.join(f'{column:>{width}}' for column, width in zip(columns, widths)))
+    for row in rows:
+        cells = [f'{row[column]:.3f}' if isinstance(row[column], float) else str(row[column]) for column in columns]
+        print('  '.join(f'{cell:>{width}}' for cell, width in zip(cells, widths)))
+
+
+def parse_values(text, kind=float):
+    """Helper method to parse a comma separated list of values.
+            :param text: str.
+            :param kind: type of the values.
+            :return: list
+            """
+    return [kind(value) for value in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte-Carlo balancing of the game settings.')
+    parser.add_argument('--scale', default='0.75', help='comma separated SCALE_FACTOR values')
+    parser.add_argument('--asteroids', default='6', help='comma separated asteroid amounts')
+    parser.add_argument('--bullets', default='3', help='comma separated bullet amounts')
+    parser.add_argument('--powered-bullets', default='5', help='comma separated powered up bullet amounts')
+    parser.add_argument('--mode', default='hard', help='comma separated modes (hard, easy)')
+    parser.add_argument('--set', action='append', default=[], metavar='Class.CONSTANT=v1,v2',
+                        help='class constant of Game or Spaceship to try, can be repeated')
+    parser.add_argument('--games', type=int, default=200, help='games per setting')
+    parser.add_argument('--pilot', default='aim', choices=sorted(pilots))
+    parser.add_argument('--workers', type=int, default=None, help='processes, default is all the cores')
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS, help='ticks before a game is stopped')
+    parser.add_argument('--out', help='.csv or .json file to save the table')
+    parser.add_argument('--scores', help='score log to add every game to')
+    args = parser.parse_args()
+
+    values = {
+        'scale': parse_values(args.scale),
+        'asteroids': parse_values(args.asteroids, int),
+        'bullets': parse_values(args.bullets, int),
+        'powered_bullets': parse_values(args.powered_bullets, int),
+        'mode': args.mode.split(','),
+    }
+    for constant in args.set:
+        name, _, text = constant.partition('=')
+        class_name, _, attribute = name.partition('.')
+        if class_name not in CONSTANT_CLASSES or not hasattr(CONSTANT_CLASSES[class_name], attribute):
+            parser.error(f'unknown constant {name}')
+        values[name] = parse_values(text)
+
+    grid = settings_grid(values)
+    start = time.perf_counter()
+    scores = ScoreStore(args.scores) if args.scores else None
+    rows = run(grid, args.games, args.pilot, args.workers, args.max_ticks, scores)
+    elapsed = time.perf_counter() - start
+    print_table(rows)
+    total = len(grid) * args.games
+    print(f'{total} games in {elapsed:.1f} s ({total / elapsed:.1f} games/s, {args.workers or os.cpu_count()} workers)')
+    if scores:
+        scores.close()
+        print(f'Best scores: {scores.top(10)}  {scores.stats()}')
+
+    if args.out:
+        with open(args.out, 'w', newline='') as file:
+            if args.out.endswith('.csv'):
+                writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                json.dump(rows, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
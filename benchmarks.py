@@ -0,0 +1,513 @@
+"""Microbenchmarks for the hot paths of the game. Runs headless with the SDL dummy drivers (no window, no sound).
+
+    python benchmarks.py run --out results.json
+    python benchmarks.py run --asteroids 10,100,500 --bullets 5,50 --filter draw
+    python benchmarks.py compare old.json new.json --threshold 0.1
+    python benchmarks.py stress --asteroids 250,500,1000,2000 --seconds 5
+    python benchmarks.py stress --asteroids 250,500 --dirty-rects
+
+Every benchmark reports:
+    ns_per_op - best time of one operation over the repeats (median_ns_per_op is the median).
+    allocs_per_op - memory blocks still allocated after the operation (sys.getallocatedblocks, GC off), so
+                    growing lists and objects that are kept count, temporaries that are freed right away don't.
+    peak_kb - the highest extra memory seen by tracemalloc while running the operations, including temporaries.
+
+The stress scenario plays whole frames (logic and draw, no display flip) with many asteroids in stress mode and
+reports the frame rate it sustains, to see how far the game scales. With --dirty-rects the frames are drawn and sent
+to the (dummy) display only where they changed.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from game import Game, GameOptions
+from inputs import ScriptedInput, InputFrame
+from pools import release
+from rendering import DirtyRectRenderer
+from modules import Spaceship, Text
+from scores import ScoreStore
+from utils import get_random_position, get_random_velocity, load_sprite, get_font
+
+MIN_REPEAT_TIME = 0.05  # Seconds - each repeat runs the operation enough times to take at least this long
+REPEATS = 5
+LOGIC_TICKS = 20  # Ticks of _process_game_logic in one operation of the game logic benchmark
+STRESS_WARMUP = 120  # Ticks before the stress scenario measures - the rotated frames are built by then
+STRESS_SHOOT_INTERVAL = 10  # Ticks between the shots of the stress scenario
+
+Game.score_store = ScoreStore(path=None)  # The rounds played here don't go into the scores of the players
+
+benchmarks = []  # (name, function, parameter names)
+
+
+def benchmark(*params):
+    """Decorator to register a benchmark. The function gets the game and the parameters, and returns a function that
+    runs the operations and the amount of operations it runs - and optionally a setup function, run before every call
+    and not measured.
+            :param params: str - names of the parameters (asteroids, bullets).
+            :return: decorator
+            """
+    def register(function):
+        benchmarks.append((function.__name__, function, params))
+        return function
+    return register
+
+
+def _spawn_asteroids(game, amount, rng):
+    """Helper method to fill the game with asteroids of all sizes, in game state.
+            :param game: Game.
+            :param amount: int.
+            :param rng: random.Random.
+            :return: list of asteroids.
+            """
+    asteroids = []
+    for _ in range(amount):
+        asteroids.append(game.asteroid_pool.acquire(get_random_position(game.screen, rng), asteroids.append,
+                                                    size=rng.choice([1, 2, 3]), menu_state=False))
+    return asteroids
+
+
+def _add_asteroids(game, amount, rng):
+    """Helper method to add asteroids of all sizes to the scene of the game - their pieces join it too.
+            :param game: Game.
+            :param amount: int.
+            :param rng: random.Random.
+            """
+    for asteroid in _spawn_asteroids(game, amount, rng):
+        asteroid.create_asteroid_callback = game.scene.add_asteroid
+        game.scene.add_asteroid(asteroid)
+
+
+def _spawn_bullets(game, amount, rng):
+    """Helper method to create bullets at random positions with random velocities.
+            :param game: Game.
+            :param amount: int.
+            :param rng: random.Random.
+            :return: list of bullets.
+            """
+    return [game.bullet_pool.acquire(get_random_position(game.screen, rng), load_sprite('bullet'),
+                                     get_random_velocity(3, 9, rng))
+            for _ in range(amount)]
+
+
+def _spaceship(game, bullets=None):
+    """Helper method to create a spaceship in the middle of the screen.
+            :param game: Game.
+            :param bullets: list or None - where the shot bullets go, None drops them.
+            :return: Spaceship.
+            """
+    spaceship = Spaceship(game.spaceship_init_pos, False, bullets.append if bullets is not None else lambda b: None,
+                          game.scene.add_explosion, 'spaceship0')
+    spaceship.bullet_class = game.bullet_class
+    spaceship.bullet_pool = game.bullet_pool
+    return spaceship
+
+
+@benchmark('asteroids')
+def move(game, asteroids):
+    objects = _spawn_asteroids(game, asteroids, random.Random(1))
+
+    def run():
+        for game_object in objects:
+            game_object.move()
+    return run, asteroids
+
+
+@benchmark('asteroids', 'bullets')
+def collides_with(game, asteroids, bullets):
+    rng = random.Random(2)
+    asteroid_list = _spawn_asteroids(game, asteroids, rng)
+    bullet_list = _spawn_bullets(game, bullets, rng)
+
+    def run():
+        for asteroid in asteroid_list:
+            for bullet in bullet_list:
+                asteroid.collides_with(bullet)
+    return run, asteroids * bullets
+
+
+@benchmark()
+def spaceship_shoot(game):
+    bullets = []
+    spaceship = _spaceship(game, bullets)
+    spaceship.velocity = pygame.Vector2(2, 3)
+
+    def run():
+        spaceship.shoot(False)
+        for bullet in bullets:
+            release(bullet)  # Shot bullets go back to the pool, like bullets leaving the screen
+        bullets.clear()
+    return run, 1
+
+
+@benchmark()
+def spaceship_draw(game):
+    spaceship = _spaceship(game)
+
+    def run():
+        spaceship.rotate(True)
+        spaceship.draw(game.screen)
+    return run, 1
+
+
+@benchmark('asteroids')
+def asteroid_draw(game, asteroids):
+    if game.physics:
+        game.physics.set_menu_state(False)
+    asteroid_list = _spawn_asteroids(game, asteroids, random.Random(3))
+
+    def run():
+        if game.physics:
+            game.physics.bounce(game.screen)
+        for asteroid in asteroid_list:
+            asteroid.random_rotation()
+            asteroid.draw(game.screen)
+    return run, asteroids
+
+
+@benchmark('asteroids')
+def asteroid_blits(game, asteroids):
+    if game.physics:
+        game.physics.set_menu_state(False)
+    asteroid_list = _spawn_asteroids(game, asteroids, random.Random(3))
+    batch = game.blit_batch
+
+    def run():
+        if game.physics:
+            game.physics.bounce(game.screen)
+        for asteroid in asteroid_list:
+            asteroid.random_rotation()
+            batch.commands.append(asteroid.blit_command(game.screen))
+        batch.submit(game.screen)
+    return run, asteroids
+
+
+@benchmark()
+def asteroid_split(game):
+    created = []
+    asteroid = game.asteroid_pool.acquire(game.spaceship_init_pos, created.append)
+
+    def run():
+        asteroid.split()
+        for child in created:
+            if game.physics:
+                game.physics.remove(child)
+            release(child)
+        created.clear()
+    return run, 1
+
+
+@benchmark()
+def show_text(game):
+    text = Text(game.screen, get_font(30))
+    counter = [0]
+
+    def run():
+        counter[0] += 1
+        text.show_text(f"Score: {counter[0] % 100}", 'mediumorchid', (0, 0), center=False)
+    return run, 1
+
+
+@benchmark('asteroids', 'bullets')
+def process_game_logic(game, asteroids, bullets):
+    rng = random.Random(4)
+    game.menu_state = False
+    game.scene.set_menu_state(False)
+    game.game_mode = 'hard'
+    # The spaceship can't die (the game clock doesn't tick here, so no timer ends it) - every tick does the same work
+    game.invulnerable = True
+
+    def reset():
+        for old in game.asteroids + game.bullets:
+            if game.physics:
+                game.physics.remove(old)
+            release(old)
+        game.scene.clear()
+        _add_asteroids(game, asteroids, rng)
+        for bullet in _spawn_bullets(game, bullets, rng):
+            game.scene.add_bullet(bullet)
+        game.spaceship = _spaceship(game)
+        game.spaceship.create_bullet_callback = game.scene.add_bullet
+
+    def run():
+        for _ in range(LOGIC_TICKS):
+            game._process_game_logic()
+    return run, LOGIC_TICKS, reset  # The objects are spawned again before every run, outside the measure
+
+
+@benchmark('asteroids')
+def menu_frame_dirty_rects(game, asteroids):
+    game.renderer = DirtyRectRenderer()  # What GameOptions(dirty_rects=True) gives - headless games draw with it too
+    game.input_source = ScriptedInput(lambda tick, game: None, game)
+    _add_asteroids(game, asteroids, random.Random(5))
+    game.step()  # The first frame is drawn in full
+
+    def run():
+        game.step()
+    return run, 1
+
+
+def _run_calls(run, setup, number):
+    """Helper method to call run a number of times, with the setup before each call when there is one.
+            :param run: function.
+            :param setup: function or None.
+            :param number: int - calls.
+            :return: tuple - (nanoseconds, allocated memory blocks, peak traced bytes) of the calls of run only.
+            """
+    tracing = tracemalloc.is_tracing()
+    if setup is None:
+        base = tracemalloc.get_traced_memory()[0] if tracing else 0
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter_ns() - start
+        peak = tracemalloc.get_traced_memory()[1] - base if tracing else 0
+        return elapsed, sys.getallocatedblocks() - blocks, peak
+    elapsed = allocated = peak = 0
+    for _ in range(number):
+        setup()
+        if tracing:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        run()
+        elapsed += time.perf_counter_ns() - start
+        allocated += sys.getallocatedblocks() - blocks
+        if tracing:
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    return elapsed, allocated, peak
+
+
+def measure(run, ops, setup=None):
+    """Times the operations and measures their memory.
+            :param run: function - runs `ops` operations.
+            :param ops: int - operations in one call of run.
+            :param setup: function or None - runs before every call of run, not measured (e.g. spawning the objects).
+            :return: dict - results.
+            """
+    _run_calls(run, setup, 1)  # Warm up - caches, lazy rotations, first allocations
+    number = 1
+    while True:
+        elapsed = _run_calls(run, setup, number)[0]
+        if elapsed >= MIN_REPEAT_TIME * 1e9 or number >= 1 << 20:
+            break
+        number *= 2
+
+    times = [_run_calls(run, setup, number)[0] / (number * ops) for _ in range(REPEATS)]
+
+    gc.collect()
+    gc.disable()
+    allocs = _run_calls(run, setup, number)[1] / (number * ops)
+    gc.enable()
+
+    tracemalloc.start()
+    peak = _run_calls(run, setup, number)[2]
+    tracemalloc.stop()
+
+    return {
+        'ns_per_op': min(times),
+        'median_ns_per_op': statistics.median(times),
+        'allocs_per_op': allocs,
+        'peak_kb': peak / 1024,
+        'calls': number * REPEATS,
+    }
+
+
+def run_benchmarks(asteroid_counts, bullet_counts, name_filter='', physics='python'):
+    """Runs all the benchmarks with all the combinations of their parameters.
+            :param asteroid_counts: list of int.
+            :param bullet_counts: list of int.
+            :param name_filter: str - runs only benchmarks with this in the name.
+            :param physics: str - physics backend of the game.
+            :return: dict - results by name.
+            """
+    values = {'asteroids': asteroid_counts, 'bullets': bullet_counts}
+    results = {}
+    for name, function, params in benchmarks:
+        if name_filter not in name:
+            continue
+        combinations = [{}]
+        for param in params:
+            combinations = [dict(c, **{param: value}) for c in combinations for value in values[param]]
+        for combination in combinations:
+            game = Game(physics, headless=True, render=True, seed=0)  # A clean game for every benchmark
+            key = name + ''.join(f'[{param}={value}]' for param, value in combination.items())
+            result = measure(*function(game, **combination))
+            result['params'] = combination
+            results[key] = result
+            print(f'{key:<50} {result["ns_per_op"]:>12.0f} ns/op {result["allocs_per_op"]:>8.2f} allocs/op '
+                  f'{result["peak_kb"]:>9.1f} peak KB')
+    return results
+
+
+def compare(old, new, threshold):
+    """Prints the change of every benchmark in both files and flags the regressions.
+            :param old: dict - results file.
+            :param new: dict - results file.
+            :param threshold: float - slowdown ratio that counts as a regression (0.1 = 10% slower).
+            :return: list of str - names of the regressions.
+            """
+    regressions = []
+    for name in sorted(set(old['results']) & set(new['results'])):
+        before = old['results'][name]
+        after = new['results'][name]
+        ratio = after['ns_per_op'] / before['ns_per_op'] if before['ns_per_op'] else 1.0
+        slower = ratio > 1 + threshold
+        more_allocs = after['allocs_per_op'] > before['allocs_per_op'] + 0.5
+        flag = 'REGRESSION' if slower or more_allocs else ('faster' if ratio < 1 - threshold else '')
+        if flag == 'REGRESSION':
+            regressions.append(name)
+        print(f'{name:<50} {before["ns_per_op"]:>12.0f} -> {after["ns_per_op"]:>12.0f} ns/op ({ratio:>6.2f}x) '
+              f'{before["allocs_per_op"]:>7.2f} -> {after["allocs_per_op"]:>7.2f} allocs/op  {flag}')
+    for name in sorted(set(old['results']) ^ set(new['results'])):
+        print(f'{name:<50} only in {"old" if name in old["results"] else "new"} file')
+    return regressions
+
+
+def _stress_pilot(tick, game):
+    """Script of the stress scenario - starts the game, shows the frame timings (F3), flies around and shoots.
+            :param tick: int.
+            :param game: Game.
+            :return: InputFrame
+            """
+    if tick == 0:
+        return InputFrame.create(key_down=[pygame.K_SPACE])  # Play
+    if tick == 1:
+        return InputFrame.create(key_down=[pygame.K_F3])  # An opaque panel in stress mode - hides the objects under it
+    pressed = [pygame.K_UP, pygame.K_LEFT] if tick % 120 < 60 else [pygame.K_RIGHT]
+    return InputFrame.create(pressed=pressed, key_down=[pygame.K_SPACE] if tick % STRESS_SHOOT_INTERVAL == 0 else [])
+
+
+def stress(amount, seconds=5.0, physics='numpy', lod=True, screen_size=(1280, 720), seed=0, dirty_rects=False):
+    """Stress scenario - plays a game with the amount of asteroids (all sizes, all over the screen) and measures the
+    frame rate. The frames are drawn with the frame timings, but not shown (no display flip - the dirty rects go to the
+    dummy display) and not limited to the FPS of the game. The spaceship can't die.
+            :param amount: int - asteroids at the start.
+            :param seconds: float - time measured, after the warm up.
+            :param physics: str - physics backend.
+            :param lod: bool - stress mode (level of detail rules), False plays the normal game.
+            :param screen_size: tuple (width, height).
+            :param seed: int.
+            :param dirty_rects: bool - draws and updates only the parts of the screen that changed.
+            :return: dict - results.
+            """
+    game = Game(physics, headless=True, render=True, seed=seed, screen_size=screen_size,
+                options=GameOptions(stress=lod, dirty_rects=dirty_rects))
+    game.input_source = ScriptedInput(_stress_pilot, game)
+    for asteroid in game.asteroids:  # The asteroids of the menu are replaced
+        if game.physics:
+            game.physics.remove(asteroid)
+        release(asteroid)
+    game.scene.clear()
+    _add_asteroids(game, amount, random.Random(seed))
+    game.invulnerability_time = float('inf')
+    game._start_invulnerability()
+
+    for _ in range(STRESS_WARMUP):
+        game.step()
+    frames = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        game.step()
+        frames += 1
+    elapsed = time.perf_counter() - start
+    frame_times = game.profiler.histograms['frame'].summary()  # The last frames
+    fps = frames / elapsed
+    return {
+        'asteroids': amount,
+        'asteroids_left': len(game.asteroids),
+        'physics': physics,
+        'lod': lod,
+        'dirty_rects': dirty_rects,
+        'fps': fps,
+        'p50_ms': frame_times['p50'],
+        'p99_ms': frame_times['p99'],
+        'sustained': fps >= game.target_fps,
+        'lod_stats': game.lod.stats() if game.lod else {},
+        'blit_stats': game.blit_batch.stats(),
+        'renderer_stats': game.renderer.stats() if game.renderer else {},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks for the game hot paths.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('--out', help='json file to save the results')
+    run_parser.add_argument('--asteroids', default='10,100,500', help='comma separated asteroid counts')
+    run_parser.add_argument('--bullets', default='5,50', help='comma separated bullet counts')
+    run_parser.add_argument('--filter', default='', help='run only benchmarks with this in the name')
+    run_parser.add_argument('--physics', default='python', choices=['python', 'numpy'])
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='slowdown that counts as regression')
+    stress_parser = commands.add_parser('stress', help='frame rate with many asteroids')
+    stress_parser.add_argument('--asteroids', default='250,500,1000,2000', help='comma separated asteroid counts')
+    stress_parser.add_argument('--seconds', type=float, default=5.0, help='time measured for each count')
+    stress_parser.add_argument('--physics', default='numpy', choices=['python', 'numpy'])
+    stress_parser.add_argument('--no-lod', action='store_true', help='the normal game, without the stress mode')
+    stress_parser.add_argument('--dirty-rects', action='store_true', help='update only the changed parts of the screen')
+    stress_parser.add_argument('--size', default='1280x720', help='screen size, WIDTHxHEIGHT')
+    stress_parser.add_argument('--out', help='json file to save the results')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run_benchmarks([int(n) for n in args.asteroids.split(',')], [int(n) for n in args.bullets.split(',')],
+                                 args.filter, args.physics)
+        if args.out:
+            with open(args.out, 'w') as file:
+                json.dump({
+                    'meta': {
+                        'python': platform.python_version(),
+                        'pygame': pygame.version.ver,
+                        'platform': platform.platform(),
+                        'physics': args.physics,
+                        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    },
+                    'results': results,
+                }, file, indent=2)
+    elif args.command == 'stress':
+        screen_size = tuple(int(n) for n in args.size.split('x'))
+        results = []
+        for amount in [int(n) for n in args.asteroids.split(',')]:
+            result = stress(amount, args.seconds, args.physics, not args.no_lod, screen_size,
+                            dirty_rects=args.dirty_rects)
+            results.append(result)
+            print(f'{amount:>6} asteroids {result["fps"]:>8.1f} fps   p50 {result["p50_ms"]:>7.2f} ms   '
+                  f'p99 {result["p99_ms"]:>7.2f} ms   {"sustained" if result["sustained"] else "below"} '
+                  f'{Game.target_fps} fps')
+        sustained = [result['asteroids'] for result in results if result['sustained']]
+        print(f'{Game.target_fps} fps sustained up to {max(sustained)} asteroids' if sustained
+              else f'{Game.target_fps} fps not sustained')
+        if args.out:
+            with open(args.out, 'w') as file:
+                json.dump({'meta': {'python': platform.python_version(), 'pygame': pygame.version.ver,
+                                    'platform': platform.platform(), 'size': args.size},
+                           'results': results}, file, indent=2)
+    else:
+        with open(args.old) as file:
+            old = json.load(file)
+        with open(args.new) as file:
+            new = json.load(file)
+        regressions = compare(old, new, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regression(s)')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import struct
+import time
+
+import pygame
+import pygame.image
+
+from archive import ROOT, ASSETS_DIR, get_archive
+
+CACHE_DIR = os.path.join(ROOT, '.cache', 'sprites')
+MAGIC = b'SRSC'
+VERSION = 1
+HEADER = struct.Struct('<4sIII?20s')  # Magic, version, width, height, alpha, sha1 of the source file
+
+
+class DiskSurfaceCache:
+    """ Keeps scaled sprites on disk between launches, as raw 32 bit pixels in the byte order of the display
+    (BGRA with alpha, RGBX without), so a later launch only reads and converts them - no decoding of the full size
+    image and no scaling.
+    Every file holds the sha1 of its source image and is made again when the source changed. The hashes of the sources
+    are kept by mtime and size, so an unchanged source is not read to be hashed again.
+            :param directory: str - folder of the cache files.
+            """
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        self.enabled = True
+        self._sources = None  # Path -> [mtime_ns, size, sha1 hex], loaded on first use
+        self._hashes = {}  # Sprite name -> sha1 bytes, for this run
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.writes = 0
+        self.load_time = 0.0
+
+    def _path(self, key):
+        """Helper method to name the file of a key - the sprite name and a hash of the scale, angle and size.
+                :param key: tuple - (name, with_alpha, scale, angle, size) of load_sprite.
+                :return: str
+                """
+        digest = hashlib.sha1(repr(key[1:]).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f'{key[0]}.{digest}.raw')
+
+    def _load_sources(self):
+        """Reads the hashes of the sources saved by the last launches.
+                :return: dict
+                """
+        if self._sources is None:
+            try:
+                with open(os.path.join(self.directory, 'sources.json')) as file:
+                    self._sources = json.load(file)
+            except (OSError, ValueError):
+                self._sources = {}
+        return self._sources
+
+    def source_hash(self, name):
+        """Returns the sha1 of the source image of a sprite - the loose file, else the entry of the asset archive.
+                :param name: str - name of the sprite.
+                :return: bytes or None when there is no source.
+                """
+        source_hash = self._hashes.get(name)
+        if source_hash is not None:
+            return source_hash
+        path = os.path.join(ASSETS_DIR, 'sprites', f'{name}.png')
+        try:
+            stat = os.stat(path)
+        except OSError:
+            archive = get_archive()
+            entry = f'sprites/{name}.png'
+            if not archive or entry not in archive:
+                return None
+            source_hash = hashlib.sha1(archive.read(entry)).digest()
+        else:
+            sources = self._load_sources()
+            known = sources.get(path)
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                source_hash = bytes.fromhex(known[2])
+            else:
+                with open(path, 'rb') as file:
+                    source_hash = hashlib.sha1(file.read()).digest()
+                sources[path] = [stat.st_mtime_ns, stat.st_size, source_hash.hex()]
+                self._write(os.path.join(self.directory, 'sources.json'), json.dumps(sources).encode())
+        self._hashes[name] = source_hash
+        return source_hash
+
+    def load(self, key):
+        """Reads a scaled sprite saved by an earlier launch.
+                :param key: tuple - (name, with_alpha, scale, angle, size) of load_sprite.
+                :return: pygame.Surface converted to the display format, or None when it's not cached or stale.
+                """
+        if not self.enabled:
+            return None
+        start = time.perf_counter()
+        try:
+            with open(self._path(key), 'rb') as file:
+                data = file.read()
+        except OSError:
+            self.misses += 1
+            return None
+        if len(data) < HEADER.size:
+            self.stale += 1
+            return None
+        magic, version, width, height, alpha, source_hash = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or source_hash != self.source_hash(key[0]) \
+                or len(data) != HEADER.size + width * height * 4:
+            self.stale += 1
+            return None
+        pixels = memoryview(data)[HEADER.size:]
+        if alpha:
+            surface = pygame.image.frombuffer(pixels, (width, height), 'BGRA').convert_alpha()
+        else:
+            surface = pygame.image.frombuffer(pixels, (width, height), 'RGBX').convert()
+        self.hits += 1
+        self.load_time += time.perf_counter() - start
+        return surface
+
+    def save(self, key, surface):
+        """Saves a scaled sprite for the next launches. Failing to write (e.g. read only folder) only skips caching.
+                :param key: tuple - (name, with_alpha, scale, angle, size) of load_sprite.
+                :param surface: pygame.Surface - the scaled sprite.
+                """
+        source_hash = self.source_hash(key[0]) if self.enabled else None
+        if source_hash is None:
+            return
+        alpha = key[1]
+        header = HEADER.pack(MAGIC, VERSION, surface.get_width(), surface.get_height(), alpha, source_hash)
+        if self._write(self._path(key), header + pygame.image.tobytes(surface, 'BGRA' if alpha else 'RGBX')):
+            self.writes += 1
+
+    def _write(self, path, data):
+        """Helper method to replace a file in one step - other processes never read half a file.
+                :param path: str
+                :param data: bytes
+                :return: bool - written.
+                """
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, path)
+            return True
+        except OSError:
+            return False
+
+    def names(self):
+        """Names of the sprites that have scaled versions on disk.
+                :return: set of str
+                """
+        try:
+            return {file.split('.')[0] for file in os.listdir(self.directory) if file.endswith('.raw')}
+        except OSError:
+            return set()
+
+    def stats(self):
+        """Counts of the cache.
+                :return: dict
+                """
+        return {'hits': self.hits, 'misses': self.misses, 'stale': self.stale, 'writes': self.writes,
+                'load_time': self.load_time}
+
+
+scaled_cache = DiskSurfaceCache()
@@ -1,6 +1,21 @@
+import os
+from dataclasses import dataclass
+
 import pygame
-from utils import load_sprite, menu_get_random_position, get_random_position
-from modules import Spaceship, Asteroid, Text, Sounds, BulletPowerUp, SlowMotionPowerUp
+from utils import load_sprite, menu_get_random_position, get_font, preload_sprites, render_text, rotation_cache
+from modules import Spaceship, Asteroid, Bullet, Explosion, Text, Sounds, BulletPowerUp, SlowMotionPowerUp, \
+    asteroid_imgs
+from spatial import SpatialHash, PlacementSampler
+from physics import PhysicsWorld
+from inputs import LiveInput, InputRecorder, ReplayInput
+from simulation import GameClock, random_streams
+from profiling import FrameProfiler, gc_monitor, OVERLAY_REFRESH
+from pools import ObjectPool, release
+from scene import Scene
+from lod import LevelOfDetail
+from rendering import DirtyRectRenderer, StaticLayer, BlitBatch
+from scores import score_store
+from telemetry import Telemetry
 import random
 
 # Images for assets
@@ -18,10 +33,23 @@ powered_up_bullets = 5
 SCALE_FACTOR = 0.5
 base_pos = -50 * (1 + SCALE_FACTOR)
 
-# Stats
-Round = 0
-fastest_bullet_speed = 0
-time_played = 0
+
+@dataclass
+class GameOptions:
+    """ Optional subsystems of a game, all off by default - a new subsystem adds a field here, not an argument of Game.
+            :param record: str or None - file to record the input to, replay it with replay_session().
+            :param profile_path: str or None - .csv or .json file to export the frame phase timings to.
+            :param dirty_rects: bool - redraws and updates only the parts of the screen that changed.
+            :param stress: bool - stress mode, level of detail rules for hundreds of asteroids (see LevelOfDetail).
+            :param telemetry_path: str or None - .jsonl or .bin file for the frame and round records (see Telemetry).
+            :param prometheus_path: str or None - .prom textfile with the totals of the telemetry.
+            """
+    record: str = None
+    profile_path: str = None
+    dirty_rects: bool = False
+    stress: bool = False
+    telemetry_path: str = None
+    prometheus_path: str = None
 
 
 class Game:
@@ -36,7 +64,7 @@ class Game:
 
     # Counters
     score = 0
-    score_list = []
+    score_store = score_store  # High scores of all the rounds, kept on disk between launches
     asteroids_destroyed = 0
 
     # [NEW] Scaling constraints
@@ -53,59 +81,168 @@ class Game:
     ast_slow_state = False
 
     # Time counters
-    lose_time = 0
     invulnerability_time = 600
-    powered_up_begin_time = 0
     power_up_option_interval_hard = 8000  # Seconds
     power_up_option_interval_easy = 5000  # Seconds
     powered_up_duration = 2000  # Seconds
 
+    # Power-ups
+    powerup_types = (BulletPowerUp, SlowMotionPowerUp)  # Up to 1 of each is on screen
+    powerup_spacing = 100  # Pixels from the spaceship and from the other power-ups
+    powerup_asteroid_clearance = 20  # Pixels from the edge of every asteroid
+    powerup_retry_interval = 100  # Milliseconds between spawn tries when there was no room
+
     # DEFAULT display
     Screen_width = 800
     Screen_height = 600
 
-    def __init__(self):
+    def __init__(self, physics='python', headless=False, input_source=None, render=None, seed=None, screen_size=None,
+                 options=None):
         """Class init. Initiates the game and different states/counters/images and sprites
+                :param physics: str - 'python' moves each object by itself, 'numpy' moves asteroids and bullets in batches
+                :param headless: bool - no window, sound, FPS limit or display flip - runs as fast as possible.
+                :param input_source: LiveInput (default) or ScriptedInput - where the input of every tick comes from.
+                :param render: bool - draws the images. Default is to draw only when not headless.
+                :param seed: int or None - seeds the random streams, for a game that can be played again the same.
+                :param screen_size: tuple (width, height) or None - fixed size instead of the size of the display.
+                :param options: GameOptions or None - the optional subsystems (recording, profiling, dirty rects, ...).
                 """
-        self._init_pygame()
+        options = self.options = options or GameOptions()
+        self.physics_backend = physics
+        self.headless = headless
+        self.render = not headless if render is None else render
+        self.input_source = input_source or LiveInput()
+        self.running = True
+        self.game_clock = GameClock(self.target_fps)  # Timers run on game time, not on the wall clock
+        self.profiler = FrameProfiler(options.profile_path)  # Times every phase of the frame, F3 shows it on screen
+        # Written by a background thread, None - no telemetry
+        self.telemetry = Telemetry(options.telemetry_path, options.prometheus_path) \
+            if options.telemetry_path or options.prometheus_path else None
+        # Stats of all the rounds of this run
+        self.rounds = 0
+        self.fastest_bullet_speed = 0
+        # None - full background blit and flip. Also headless when drawing, the dummy display takes the updates
+        self.renderer = DirtyRectRenderer() if options.dirty_rects and self.render else None
+        self.blit_batch = BlitBatch()  # The objects of a layer are blitted in one call
+        self.drawn_menu_state = True  # Which screen the last frame drew, the menu or the game
+        # Static parts of the screen, drawn again only when what they show changes
+        self.menu_ship_layer = StaticLayer(self._draw_menu_spaceship)
+        self.menu_text_layer = StaticLayer(lambda surface: self._show_menu_text(self, surface))
+        self.score_table_layer = StaticLayer(self._draw_score_table)
+        self.end_layer = StaticLayer(self._draw_end_text)
+        self.end_title = None  # (title, color) of the end screen
+        self.lod = LevelOfDetail() if options.stress else None
+        self.stress_fps = 0  # Frame rate shown in stress mode
+        rotation_cache.set_rle(options.stress)  # Several times faster blits of the rotated sprites, the edges can be 1 off
+        if seed is not None or options.record:
+            random_streams.seed(seed)
+        self._init_pygame(headless)
+        self.background_name = random_streams.get('visual').choice(backgrounds)
+        # Decoded in background threads while the game starts
+        preload_sprites([self.background_name, self._chosen_spaceship(spaceship_kind), *asteroid_imgs, 'bullet',
+                         'bullet1', 'bullets', 'slow_motion', 'explosion'])
         self._init_screen_size(self)
+        if screen_size:
+            self.Screen_width, self.Screen_height = screen_size
         self.screen = pygame.display.set_mode((self.Screen_width, self.Screen_height))
         self.clock = pygame.time.Clock()
-        self.background = pygame.transform.scale(load_sprite(random.choice(backgrounds), False),
-                                                 (self.Screen_width, self.Screen_height))
+        self.backgrounds = {}  # Name -> background scaled to the screen, kept for the next games
+        self.background = None
 
         self.spaceship_init_pos = (self.Screen_width // 2, int(self.Screen_height * 0.77))
         self.table_x = self.Screen_width // 2
         self.table_y = self.Screen_height // 2
+        self.asteroid_grid = SpatialHash()  # Broadphase for collisions with asteroids
+        # Same area as get_random_position
+        self.powerup_placer = PlacementSampler(pygame.Rect(0, 70, self.Screen_width - 70, self.Screen_height - 140))
+        # Physics backend - asteroids and bullets are created from these classes
+        self.physics = PhysicsWorld() if physics == 'numpy' else None
+        self.asteroid_class = self.physics.Asteroid if self.physics else Asteroid
+        self.bullet_class = self.physics.Bullet if self.physics else None
+        # All the game objects, by kind. O(1) remove - the order of the objects in a list is not kept
+        self.scene = Scene(batched_bodies=self.physics is not None)
+        self.asteroids = self.scene.asteroids
+        self.bullets = self.scene.bullets
+        self.explosion = self.scene.explosions
+        self.powerups = self.scene.powerups
+        # Destroyed asteroids and bullets go back to their pool and are reused by the next split/shot
+        self.asteroid_pool = ObjectPool(self.asteroid_class)
+        self.bullet_pool = ObjectPool(self.bullet_class or Bullet)
+        self.explosion_pool = ObjectPool(Explosion)
+        gc_monitor.start()
+
+        self.score_text, self.end_text = self._init_game_texts(self, self.screen)
+        self.menu_layout = self._menu_text_layout(self, self.screen)
+        # The rects are also the click areas of the menu - they don't move, so they are kept from here
+        self.menu_title, self.menu_play, self.menu_toggle_mode, self.menu_score, \
+            self.menu_change_spaceship, self.menu_quit = self._show_menu_text(self, self.screen)
+
+
+        Sounds.bank.muted = headless  # Nothing to hear - the sounds are not even decoded
+        if not headless:
+            Sounds.bank.load()  # Decodes all the sound effects once, before the first frame
+            Sounds().init_background_music('Background_music')
+
+        self.reset_requested = False
+        self._init_game_state()
+
+        if options.record:
+            self.input_source = InputRecorder(self.input_source, options.record, self._session_info())
+
+    def _init_game_state(self):
+        """Starts a new game on the menu - background, counters, states and the menu asteroids.
+                :return: None
+                """
+        name = self.background_name
+        if name not in self.backgrounds:
+            self.backgrounds[name] = load_sprite(name, False, size=(self.Screen_width, self.Screen_height))
+        self.background = self.backgrounds[name]
+        # The settings of the game (set_game_settings) - read again by every new game
         self.asteroid_amount = asteroid_amount
         self.bullets_amount = bullets_amount
         self.powered_up_bullets = powered_up_bullets
-        self.asteroids = []
-        self.bullets = []
-        self.explosion = []
-        self.powerups = []
+        self.game_clock.reset()  # Drops the timers of the last game
+        self.powerup_spawn_timer = None
+        self.powerup_end_timer = None
+        self.invulnerability_timer = None
+        self._start_invulnerability()  # The game time starts at 0 - like a shield break at 0
+        self.spaceship = None
+        self.scene.set_menu_state(True)
+        self.score = 0
+        self.asteroids_destroyed = 0
+        self.win_option = False
+        self.score_ready = True
+        self.ast_slow_state = False
         self.spaceship_bullet_power = False
         self.spaceship_slow_power = False
         self.menu_state = True
         self.table_state = False
         self.game_mode = ''  # Easy or hard
 
-        self.score_text, self.end_text = self._init_game_texts(self, self.screen)
-        self.menu_title, self.menu_play, self.menu_toggle_mode, self.menu_score, \
-            self.menu_change_spaceship, self.menu_quit = self._show_menu_text(self, self.screen)
-
-        
-        Sounds().init_background_music('Background_music')
-
         # Gives random position for each asteroid spawn
         while len(self.asteroids) < self.asteroid_amount:
-            ast_post = menu_get_random_position(self.screen)
-            self.asteroids.append(Asteroid(ast_post, self.asteroids.append)) 
+            ast_post = menu_get_random_position(self.screen, random_streams.get('spawn'))
+            self.scene.add_asteroid(self.asteroid_pool.acquire(ast_post, self.scene.add_asteroid))
+
+    @property
+    def spaceship(self):
+        """The spaceship of the scene - None in the menu and after it died.
+                :return: Spaceship or None
+                """
+        return self.scene.spaceship
+
+    @spaceship.setter
+    def spaceship(self, spaceship):
+        self.scene.set_spaceship(spaceship)
 
     @staticmethod
-    def _init_pygame():
+    def _init_pygame(headless=False):
         """Initiates pygame and sets name of game
+                :param headless: bool - uses the SDL dummy video and audio drivers.
                 """
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
         pygame.init()
         pygame.display.set_caption('Space Rocks')
 
@@ -136,70 +273,48 @@ class Game:
                 """
         body_font_size = int(self.Screen_height * 0.05)
         header_font_size = int(self.Screen_height * 0.1)
-        score_text = Text(surface, font_style=pygame.font.Font(None, body_font_size))
-        end_text = Text(surface, font_style=pygame.font.Font(None, header_font_size))
+        score_text = Text(surface, font_style=get_font(body_font_size))
+        end_text = Text(surface, font_style=get_font(header_font_size))
         return score_text, end_text
 
     @staticmethod
-    def _show_menu_text(self, surface):
-        """Creates the text for the menu with proper spacing and alignment
+    def _menu_text_layout(self, surface):
+        """Places the text of the menu with proper spacing and alignment. Done once per screen size.
                 :param: surface - the background, screen
-                :return: Text surfaces
+                :return: list of (font, text, color, position)
         """
         # Calculate font sizes based on screen height
         body_font_size = int(self.Screen_height * 0.067)
         header_font_size = int(self.Screen_height * 0.175)
         
-        # Create text objects
-        menu_title_text = Text(surface, font_style=pygame.font.Font(None, header_font_size))
-        menu_text = Text(surface, font_style=pygame.font.Font(None, body_font_size))
+        # Fonts of the title and the items
+        menu_title_font = get_font(header_font_size)
+        menu_font = get_font(body_font_size)
         
         # Calculate vertical spacing
         spacing = self.Screen_height * 0.08  # 8% of screen height for spacing
-        title_offset = self.Screen_height * 0.2  # 20% from top for title
         
         # Calculate positions
         title_y = self.Screen_height * 0.15  # Title at 30% of screen height
         start_y = title_y + spacing * 2  # Start menu items below title
         
-        # Create menu items with proper spacing
-        menu_title = menu_title_text.show_text(
-            "Destroyds", 
-            'gray94', 
-            (self.Screen_width // 2, title_y)
-        )
-        
-        menu_play = menu_text.show_text(
-            "Play!", 
-            'gray87', 
-            (self.Screen_width // 2, start_y)
-        )
-        
-        menu_toggle_mode = menu_text.show_text(
-            "Toggle hard/easy mode", 
-            "gray87", 
-            (self.Screen_width // 2, start_y + spacing)
-        )
-        
-        menu_score = menu_text.show_text(
-            "Score Table", 
-            'gray88', 
-            (self.Screen_width // 2, start_y + spacing * 2)
-        )
-        
-        menu_change_spaceship = menu_text.show_text(
-            "Change spaceship", 
-            'gray89', 
-            (self.Screen_width // 2, start_y + spacing * 3)
-        )
-        
-        menu_quit = menu_text.show_text(
-            "Quit game", 
-            'gray90', 
-            (self.Screen_width // 2, start_y + spacing * 4)
-        )
-        
-        return menu_title, menu_play, menu_toggle_mode, menu_score, menu_change_spaceship, menu_quit
+        # Menu items with proper spacing
+        return [
+            (menu_title_font, "Destroyds", 'gray94', (self.Screen_width // 2, title_y)),
+            (menu_font, "Play!", 'gray87', (self.Screen_width // 2, start_y)),
+            (menu_font, "Toggle hard/easy mode", "gray87", (self.Screen_width // 2, start_y + spacing)),
+            (menu_font, "Score Table", 'gray88', (self.Screen_width // 2, start_y + spacing * 2)),
+            (menu_font, "Change spaceship", 'gray89', (self.Screen_width // 2, start_y + spacing * 3)),
+            (menu_font, "Quit game", 'gray90', (self.Screen_width // 2, start_y + spacing * 4)),
+        ]
+
+    @staticmethod
+    def _show_menu_text(self, surface):
+        """Draws the text of the menu (see _menu_text_layout).
+                :param: surface - the background, screen
+                :return: rects of the title, play, toggle mode, score table, change spaceship and quit
+        """
+        return [Text(surface, font).show_text(line, color, position) for font, line, color, position in self.menu_layout]
 
     @staticmethod
     def _chosen_spaceship(i):
@@ -231,30 +346,24 @@ class Game:
             'green' if position == 1 else 'white',
             (x, y))
     
-    def _get_medium_score(self):
-        """Helper method to get the medium score"""
-        if len(self.score_list) < 3:
-            return 0
-            
-        medium_score = sorted(self.score_list)[1]
-        return medium_score
-
     def _scale_font_size(self, scale_factor):
         """Scales the font size based on the screen height and provided scale factor."""
         return int(self.Screen_height * scale_factor)
 
 
-    def _show_score_table_text(self):
+    def _show_score_table_text(self, surface=None):
         """Score table text - shows using the menu
+        :param surface: where to draw, default is the screen
         :return: Score table title and individual score elements
         """
+        surface = surface or self.screen
         # Calculate constrained font sizes
         title_size = self._scale_font_size(0.1)  # 10% of screen height
         score_size = self._scale_font_size(0.067)  # 6.7% of screen height
 
         # Create text elements for the score table
-        score_table_title_text = Text(self.screen, font_style=pygame.font.Font(None, title_size))
-        score_text = Text(self.screen, font_style=pygame.font.Font(None, score_size))
+        score_table_title_text = Text(surface, font_style=get_font(title_size))
+        score_text = Text(surface, font_style=get_font(score_size))
 
         # Position title on the left side of the screen
         title_x = int(self.Screen_width * 0.05)  # Set position closer to the left side (10% from the left)
@@ -279,14 +388,14 @@ class Game:
         grid_y = title_y + int(80 * SCALE_FACTOR)  # Adjusted to be slightly below the title
         grid_width = int(self.Screen_width * 0.25)  # Reduce grid width to make it smaller
         grid_height = int(280 * SCALE_FACTOR)  # Reduce grid height to make it fit scores properly
-        pygame.draw.rect(self.screen, 'white', (grid_x, grid_y, grid_width, grid_height), 1)  # Draw the grid with adjusted positions and size
+        pygame.draw.rect(surface, 'white', (grid_x, grid_y, grid_width, grid_height), 1)  # Draw the grid with adjusted positions and size
 
         # ########## CHANGED ##########
         # Draw underlines for the actual score
         underline_y_offset = 20  # Offset for drawing underline below each score
         for i in range(3):
             underline_y = score_y_base + i * score_y_increment + underline_y_offset
-            pygame.draw.line(self.screen, 'white', (score_x + grid_width // 16 * 4, underline_y), (score_x + grid_width // 16 * 5.5, underline_y), 1)  # Draw underline with appropriate width
+            pygame.draw.line(surface, 'white', (score_x + grid_width // 16 * 4, underline_y), (score_x + grid_width // 16 * 5.5, underline_y), 1)  # Draw underline with appropriate width
 
 
         # Draw scores with correct alignment and scaling, without placeholder duplicates
@@ -297,16 +406,16 @@ class Game:
         score_2 = score_text.show_text("2", 'white', (score_x, score_y_base + score_y_increment))
         score_3 = score_text.show_text("3", 'white', (score_x, score_y_base + score_y_increment * 2))
 
-        # Handle score display logic and update scores
-        if len(self.score_list) >= 1:
-            score_1 = self._draw_score(score_text, 1, max(self.score_list), score_x, score_y_base)
+        # Handle score display logic and update scores - the best three, from the best
+        top_scores = self.score_store.top(3)
+        if len(top_scores) >= 1:
+            score_1 = self._draw_score(score_text, 1, top_scores[0], score_x, score_y_base)
 
-        if len(self.score_list) >= 2:
-            second_score = min(self.score_list) if len(self.score_list) == 2 else self._get_medium_score()
-            score_2 = self._draw_score(score_text, 2, second_score, score_x, score_y_base + score_y_increment)
+        if len(top_scores) >= 2:
+            score_2 = self._draw_score(score_text, 2, top_scores[1], score_x, score_y_base + score_y_increment)
 
-        if len(self.score_list) >= 3:
-            score_3 = self._draw_score(score_text, 3, min(self.score_list), score_x, score_y_base + score_y_increment * 2)
+        if len(top_scores) >= 3:
+            score_3 = self._draw_score(score_text, 3, top_scores[2], score_x, score_y_base + score_y_increment * 2)
 
         # Return all elements similar to the original code structure
         return score_table_title, score_1, score_2, score_3
@@ -315,31 +424,178 @@ class Game:
         """The main loop of the game. Runs both the game loop or the menu loop.
                 :return: None
                 """
-        while True:
-            if self.menu_state:
-                self._menu_handle_input()
-                self._menu_process_game_logic()
-                self._menu_draw()
+        while self.running:
+            self.step()
+
+    def step(self):
+        """Runs one fixed tick - input, logic and draw of the menu or the game.
+                :return: None
+                """
+        profiler = self.profiler
+        profiler.begin_frame()
+        if self.reset_requested:  # F1 in the last frame - this frame is the first of the new game, at game time 0
+            self.reset()
+            profiler.lap('reset')
+        menu = self.menu_state  # The input can change it, the frame still runs the screen it started with
+        if menu:
+            handle_input, process_game_logic, draw = \
+                self._menu_handle_input, self._menu_process_game_logic, self._menu_draw
+            phase = 'menu_'
+        else:
+            handle_input, process_game_logic, draw = self._handle_input, self._process_game_logic, self._draw
+            phase = ''
+        handle_input()
+        profiler.lap(phase + 'input')
+        # Quit or F1 - no logic and no draw, but the frame still ends and the game clock still ticks
+        if self.running and not self.reset_requested:
+            self._update_and_draw(menu, phase, process_game_logic, draw)
+        profiler.end_frame()
+        if self.telemetry:
+            self.telemetry.frame(profiler.frame, profiler.frame_time, len(self.asteroids), len(self.bullets))
+        self.game_clock.tick()
+
+    def _update_and_draw(self, menu, phase, process_game_logic, draw):
+        """Helper method for the logic and the draw of a frame (see step), up to the display update.
+                :param menu: bool - the frame runs the menu.
+                :param phase: str - prefix of the profiler phases.
+                :param process_game_logic: method - logic of the menu or the game.
+                :param draw: method - draw of the menu or the game.
+                :return: None
+                """
+        profiler = self.profiler
+        if self.scene.menu_state != menu:  # Only when switching - the asteroids bounce on half the screen in the menu
+            self.scene.set_menu_state(menu)
+        process_game_logic()
+        profiler.lap(phase + 'logic')
+        if menu != self.drawn_menu_state:  # Switched between menu and game - nothing of the last screen stays
+            self.drawn_menu_state = menu
+            self._invalidate_screen()
+        draw()
+        profiler.lap(phase + 'draw')
+        if profiler.overlay and self.render:
+            # Opaque in stress mode - the objects under it are not drawn
+            overlay_rect = profiler.draw_overlay(self.screen, 'black' if self.lod else None)
+            self._mark_dirty(overlay_rect)
+            if self.lod:
+                self.lod.set_panel('overlay', overlay_rect)
+            profiler.lap('overlay')
+        elif self.lod:
+            self.lod.set_panel('overlay', None)
+        if not self.headless:
+            self.clock.tick(self.target_fps)  # FPS
+            profiler.lap('sleep')
+            if self.renderer:
+                self.renderer.present(self.screen)
             else:
-                self._handle_input()
-                self._process_game_logic()
-                self._draw()
+                pygame.display.flip()
+            profiler.lap('flip')
+        elif self.renderer:  # No FPS limit, but the dirty rects still go to the (dummy) display
+            self.renderer.present(self.screen)
+            profiler.lap('flip')
+
+    def run_headless(self, ticks=None):
+        """Runs fixed ticks one after the other without waiting, until the input script ends or the game quits.
+                :param ticks: int or None - max amount of ticks.
+                :return: int - amount of ticks played.
+                """
+        played = 0
+        while self.running and not self.input_source.finished and (ticks is None or played < ticks):
+            self.step()
+            played += 1
+        return played
+
+    def _clear_screen(self):
+        """Draws the background over the last frame - only under what changed when using dirty rects.
+                :return: None
+                """
+        if self.renderer:
+            self.renderer.restore(self.screen, self.background)
+        else:
+            self.screen.blit(self.background, (0, 0))
+
+    def _mark_dirty(self, *rects):
+        """Adds drawn areas to the dirty rects of this frame (nothing without dirty rects).
+                :param rects: pygame.Rect or None.
+                :return: None
+                """
+        if self.renderer:
+            for rect in rects:
+                self.renderer.add(rect)
+
+    def _invalidate_screen(self):
+        """The next frame is drawn in full - for changes outside the dirty rects (menu/game switch, score table).
+                :return: None
+                """
+        if self.renderer:
+            self.renderer.invalidate()
+
+    def _get_ticks(self):
+        """Time of the game in milliseconds - fixed ticks of the game clock, the same when playing, headless or replayed.
+                :return: int
+                """
+        return self.game_clock.get_ticks()
+
+    def _session_info(self):
+        """Everything needed to play this game again the same way, saved as the header of recordings.
+                :return: dict
+                """
+        return {
+            'seed': random_streams.seed_value,
+            'screen_size': [self.Screen_width, self.Screen_height],
+            'settings': [SCALE_FACTOR, self.asteroid_amount, self.bullets_amount, self.powered_up_bullets],
+            'shield_state': shield_state,
+            'spaceship_kind': spaceship_kind,
+            'target_fps': self.target_fps,
+        }
+
+    def _quit(self):
+        """Quits the game - exits when playing, stops the run when headless.
+                :return: None
+                """
+        self.input_source.close()
+        self.profiler.close()
+        if self.telemetry:
+            self.telemetry.close()
+        if self.headless:
+            self.running = False
+        else:
+            quit()
+
+    def reset(self):
+        """Starts a new game (F1) in the same window - the display, the caches, the sounds and the music are kept,
+        only the game state is new. The objects of the last game go back to their pools.
+                :return: None
+                """
+        self.reset_requested = False
+        for game_object in [*self.asteroids, *self.bullets]:
+            if self.physics:
+                self.physics.remove(game_object)
+            release(game_object)
+        for explosion in self.explosion:
+            release(explosion)
+        self.scene.clear()
+        self.background_name = random_streams.get('visual').choice(backgrounds)
+        self._init_game_state()
+        self._invalidate_screen()
 
     def _handle_input(self):
         """The method handles all user clicks on keyboard, enables the game to quit using 'X' on top right and
-             restart of the game by running the loop again.
+             restart of the game with F1 (see reset).
                 :return: None
                 """
-        global fastest_bullet_speed  # Saves the speed from all game rounds
-        for event in pygame.event.get():
+        frame = self.input_source.poll()
+        for event in frame.events:
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                quit()
+                self._quit()
 
             # Enables 'restart' using ESC
             if event.type == pygame.KEYDOWN and event.key == pygame.K_F1:
-                pygame.quit()
-                space_rocks = Game()
-                space_rocks.main_loop()
+                self.reset_requested = True
+                return
+
+            # Shows / hides the frame timings
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.overlay = not self.profiler.overlay
 
             # Handles different amount of bullets according to game state - default/powerup/end game
             if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE and self.spaceship:
@@ -350,11 +606,11 @@ class Game:
                         self.spaceship.shoot(False)
                 elif self.spaceship and len(self.bullets) < self.powered_up_bullets and self.spaceship_bullet_power:
                     self.spaceship.shoot(True)
-                if self.spaceship.bullet_speed() > fastest_bullet_speed:
-                    fastest_bullet_speed = self.spaceship.bullet_speed()
+                if self.spaceship.bullet_speed() > self.fastest_bullet_speed:  # The speed from all game rounds
+                    self.fastest_bullet_speed = self.spaceship.bullet_speed()
 
         # Handles movement of spaceship
-        keys_pressed = pygame.key.get_pressed()
+        keys_pressed = frame.keys
         if self.spaceship:
             if keys_pressed[pygame.K_RIGHT]:
                 self.spaceship.rotate(True)
@@ -365,16 +621,153 @@ class Game:
             elif not keys_pressed[pygame.K_UP]:
                 self.spaceship.friction()
 
-    def _get_game_objects(self):
-        """Captures all sprites to one list and returns it. Runs in the game loop.
-                :return: list of sprites
+    def _move_objects(self):
+        """Moves all the objects of the scene - the same lists in the menu and in the game.
+                :return: None
+                """
+        if self.physics:
+            self.physics.move()  # Asteroids and bullets move in one batch
+        for group in self.scene.update_groups:
+            for game_object in group:
+                game_object.move()
+
+    def _draw_objects(self):
+        """Draws all the objects of the scene, or only bounces them when the game is not drawn. The objects add their
+        blits to the batch and every layer is blitted in one call - only the spaceship draws itself (with the shield).
+                :return: None
+                """
+        screen = self.screen
+        lod = self.lod
+        if self.physics:
+            self.physics.bounce(screen)  # The asteroid bodies don't bounce in draw()
+        if not self.render:
+            for group in self.scene.draw_groups:
+                for game_object in group:
+                    game_object.bounce(screen)  # Only the part of draw() that changes the game
+            return
+        batch = self.blit_batch
+        add = batch.commands.append
+        for layer in self.scene.layers:
+            for game_object in layer:
+                if lod and lod.covered(game_object):  # Hidden under the HUD
+                    game_object.bounce(screen)
+                else:
+                    add(game_object.blit_command(screen))
+            self._mark_dirty(*batch.submit(screen, rects=self.renderer is not None))
+        for spaceship in self.scene.ships:
+            if lod and lod.covered(spaceship):
+                spaceship.bounce(screen)
+            else:
+                self._mark_dirty(spaceship.draw(screen))
+
+    def _rotate_asteroids(self):
+        """Rotates all the asteroids - in one batch with the numpy backend, by the level of detail rules in stress mode.
+                :return: None
                 """
-        for ast in self.asteroids:
-            ast.change_menu_state(False)
-        game_objects = [*self.asteroids, *self.bullets, *self.explosion, *self.powerups]
-        if self.spaceship:
-            game_objects.append(self.spaceship)
-        return game_objects
+        if self.physics:
+            self.physics.rotate()
+        elif self.lod:
+            # Around the spaceship every tick, the rest less often
+            focus = self.spaceship.position if self.spaceship else self.screen.get_rect().center
+            self.lod.rotate(self.asteroids, focus, self.scene.asteroid_removals)
+        else:
+            for asteroid in self.asteroids:
+                asteroid.random_rotation()
+
+    def _destroy_asteroid(self, asteroid):
+        """Removes an asteroid from the game and splits it.
+                :param asteroid: Asteroid
+                :return: None
+                """
+        self.scene.remove_asteroid(asteroid)
+        asteroid.split()
+        if self.physics:
+            self.physics.remove(asteroid)
+        release(asteroid)
+
+    def _remove_bullet(self, bullet):
+        """Removes a bullet from the game.
+                :param bullet: Bullet
+                :return: None
+                """
+        self.scene.remove_bullet(bullet)
+        if self.physics:
+            self.physics.remove(bullet)
+        release(bullet)
+
+    def pool_stats(self):
+        """Occupancy of the object pools and the pauses of the garbage collector.
+                :return: dict
+                """
+        return {
+            'asteroids': self.asteroid_pool.stats(),
+            'bullets': self.bullet_pool.stats(),
+            'explosions': self.explosion_pool.stats(),
+            'scene': self.scene.stats(),
+            'gc': gc_monitor.stats(),
+        }
+
+    def _schedule_powerup_spawn(self, delay=None):
+        """(Re)starts the timer of the next powerup spawn.
+                :param delay: float or None - milliseconds, None is the interval of the game mode (easy/hard).
+                :return: None
+                """
+        if delay is None:
+            # Changes time between powerups according to game mode (easy/hard)
+            if self.game_mode == 'easy':
+                delay = self.power_up_option_interval_easy
+            else:
+                delay = self.power_up_option_interval_hard
+        self.game_clock.cancel(self.powerup_spawn_timer)
+        self.powerup_spawn_timer = self.game_clock.schedule(delay, self._spawn_powerups)
+
+    def _spawn_powerups(self):
+        """Timer - spawns the missing powerups, 1 of each type, far from the spaceship, the other powerups and the
+        asteroids. The placer has a bounded cost, when there's no room it tries again a bit later.
+                :return: None
+                """
+        if self.spaceship is None or self.win_option:
+            return
+        missing = [kind for kind in self.powerup_types
+                   if not any(isinstance(powerup, kind) for powerup in self.powerups)]
+        if not missing:
+            return
+        exclusions = [(self.spaceship.position, self.powerup_spacing)]
+        exclusions += [(powerup.position, self.powerup_spacing) for powerup in self.powerups]
+        exclusions += [(asteroid.position, asteroid.radius + self.powerup_asteroid_clearance)
+                       for asteroid in self.asteroids]
+        positions = self.powerup_placer.place(len(missing), exclusions, self.powerup_spacing,
+                                              random_streams.get('powerups'))
+        for kind, position in zip(missing, positions):
+            self.scene.add_powerup(kind(position))
+        if len(positions) < len(missing):
+            self._schedule_powerup_spawn(self.powerup_retry_interval)
+
+    def _end_powerups(self):
+        """Timer - the powerups taken run out. Slow motion gives the asteroids their speed back.
+                :return: None
+                """
+        self.spaceship_bullet_power = False
+        if self.spaceship_slow_power and self.ast_slow_state:
+            for asteroid in self.asteroids:
+                if asteroid.velocity.length() < 4:
+                    asteroid.velocity *= 3.33
+            self.spaceship_slow_power = False
+            self.ast_slow_state = False
+
+    def _start_invulnerability(self):
+        """The spaceship can't die for invulnerability_time (after the shield breaks).
+                :return: None
+                """
+        self.invulnerable = True
+        self.game_clock.cancel(self.invulnerability_timer)
+        self.invulnerability_timer = self.game_clock.schedule(self.invulnerability_time, self._end_invulnerability)
+
+    def _end_invulnerability(self):
+        """Timer - the spaceship can die again.
+                :return: None
+                """
+        self.invulnerable = False
 
     def _process_game_logic(self):
         """This method take cares of:
@@ -387,130 +780,93 @@ class Game:
         7. Bullets going out of borders.
                 :return: None
                 """
-        global shield_state, time_played
+        global shield_state
         # All objects movement
-        for game_object in self._get_game_objects():
-            game_object.move()
+        self._move_objects()
 
         if self.spaceship:
             # Saves score only in the end of game (lose/win)
             if len(self.asteroids) == 0 and self.win_option and self.score_ready:
-                if len(self.score_list) < 3:
-                    self.score_list.append(self.score)
-                else:
-                    self.score_list.remove(min(self.score_list))
-                    self.score_list.append(self.score)
+                self._save_score()
                 self.score_ready = False
 
-            # Duration of powerup
-            if pygame.time.get_ticks() - self.powered_up_begin_time > self.powered_up_duration:
-                self.spaceship_bullet_power = False
-
-            # Changes time between powerups according to game mode (easy/hard)
-            if self.game_mode == 'easy':
-                power_up_option_interval = self.power_up_option_interval_easy
-            else:
-                power_up_option_interval = self.power_up_option_interval_hard
-
-
-            ######################### NEEDS SCALE AS WELL #######################################
-
-
-            # Spawns the powerups according to interval, and makes sure only 2 and far from each other and spaceship.
-            if pygame.time.get_ticks() - self.powered_up_begin_time > power_up_option_interval:
-                while True:
-                    bullet_powerup_position = get_random_position(self.screen)
-                    slow_powerup_position = get_random_position(self.screen)
-                    if bullet_powerup_position.distance_to(self.spaceship.position) > 100 \
-                            and slow_powerup_position.distance_to(self.spaceship.position) > 100:
-                        if len(self.powerups) == 0 and bullet_powerup_position.distance_to(slow_powerup_position) > 100:
-                            break
-                        elif len(self.powerups) == 1:
-                            if isinstance(self.powerups[0], BulletPowerUp):
-                                if self.powerups[0].position.distance_to(slow_powerup_position) > 100:
-                                    break
-                            elif isinstance(self.powerups[0], SlowMotionPowerUp):
-                                if self.powerups[0].position.distance_to(bullet_powerup_position) > 100:
-                                    break
-                        elif len(self.powerups) == 2:
-                            break
-
-                # Makes sure to spawn up to 2 powerups and 1 of each
-                if self.win_option is False:
-                    bullet_powerup = BulletPowerUp(bullet_powerup_position)
-                    slow_powerup = SlowMotionPowerUp(slow_powerup_position)
-                    if len(self.powerups) == 0:
-                        self.powerups.append(bullet_powerup)
-                        self.powerups.append(slow_powerup)
-                    elif len(self.powerups) == 1:
-                        if not isinstance(self.powerups[0], BulletPowerUp):
-                            self.powerups.append(bullet_powerup)
-                        elif not isinstance(self.powerups[0], SlowMotionPowerUp):
-                            self.powerups.append(slow_powerup)
-
-            # Handles powerup taking
+            # Handles powerup taking - the power lasts powered_up_duration from the last powerup taken, and the next
+            # powerups spawn an interval after it
             if len(self.powerups) > 0:
                 for powerup in self.powerups:
                     if self.spaceship.collides_with(powerup):
                         Sounds().powerup_sound()
-                        self.powered_up_begin_time = pygame.time.get_ticks()
+                        self.game_clock.cancel(self.powerup_end_timer)
+                        self.powerup_end_timer = self.game_clock.schedule(self.powered_up_duration, self._end_powerups)
+                        self._schedule_powerup_spawn()
                         if isinstance(powerup, BulletPowerUp):
                             self.spaceship_bullet_power = True
                         elif isinstance(powerup, SlowMotionPowerUp):
                             self.spaceship_slow_power = True
-                        self.powerups.remove(powerup)
+                        self.scene.remove_powerup(powerup)
 
             # Handles asteroid collision - both when easy mode and hard mode.
-            for asteroid in self.asteroids:
+            # Only asteroids in the grid cells around the ship are checked, the numpy backend checks all in one batch.
+            if self.physics:
+                asteroids = self.asteroids[:]
+                hits = self.physics.circle_hits(asteroids, self.spaceship.position, self.spaceship.radius)
+                near_asteroids = [asteroids[i] for i in hits.nonzero()[0]]
+            else:
+                self.asteroid_grid.build(self.asteroids)
+                near_asteroids = self.asteroid_grid.query(self.spaceship)
+            for asteroid in near_asteroids:
                 if asteroid.collides_with(self.spaceship):
                     # Shield break and sound.
                     if shield_state is True:
-                        self.lose_time = pygame.time.get_ticks()
+                        self._start_invulnerability()
                         self.spaceship.shield = False
                         Sounds().shield_explosion()
                         self.spaceship.velocity *= -1.3
                         shield_state = False
 
                     # Spaceship can get hit and 'die' after sine invulnerability time.
-                    elif pygame.time.get_ticks() > self.lose_time + self.invulnerability_time and shield_state is False:
+                    elif not self.invulnerable and shield_state is False:
                         Sounds().lose_event_sound()
                         self.spaceship.explosion()
                         self.spaceship = None
-                        self.asteroids.remove(asteroid)
-                        asteroid.split()
-                        time_played = pygame.time.get_ticks()
-                        print(self.game_stats())  # Prints round number, total time played, the fastest bullet speed and
-                        # asteroids destroyed.
-
-                        if len(self.score_list) < 3:
-                            self.score_list.append(self.score)
-                        else:
-                            if self.score > min(self.score_list):
-                                self.score_list.remove(min(self.score_list))
-                                self.score_list.append(self.score)
+                        self._destroy_asteroid(asteroid)
+                        self._end_round(False)
                     break
 
         # The slow motion power up is not dependent on self.spaceship inorder to change even when you lose.
-        if self.spaceship_slow_power:
-            if self.ast_slow_state is False:
-                for asteroid in self.asteroids:
-                    asteroid.velocity = pygame.Vector2(asteroid.velocity) * 0.3
-                self.ast_slow_state = True
-            elif pygame.time.get_ticks() - self.powered_up_begin_time > self.powered_up_duration:
-                for asteroid in self.asteroids:
-                    if pygame.Vector2(asteroid.velocity).length() < 4:
-                        asteroid.velocity = pygame.Vector2(asteroid.velocity) * 3.33
-                self.spaceship_slow_power = False
-                self.ast_slow_state = False
+        # It ends with the power up timer (_end_powerups).
+        if self.spaceship_slow_power and self.ast_slow_state is False:
+            for asteroid in self.asteroids:
+                asteroid.velocity *= 0.3
+            self.ast_slow_state = True
+
+        self._rotate_asteroids()
 
         # Handles bullet hitting asteroids and score counting.
-        for asteroid in self.asteroids[:]:
-            asteroid.random_rotation()
-            for bullet in self.bullets[:]:
-                if asteroid.collides_with(bullet):
-                    self.asteroids.remove(asteroid)
-                    self.bullets.remove(bullet)
-                    asteroid.split()
+        # Only the asteroids with bullets near them are checked, a bullet can destroy only one asteroid.
+        asteroids = self.asteroids[:]
+        candidates = {}  # Index in asteroids -> bullets near it, in the order of the bullets
+        if self.bullets:
+            if self.physics:
+                # Numpy backend - checks all asteroid/bullet pairs in one batch
+                bullets = self.bullets[:]
+                hits = self.physics.collisions(asteroids, bullets)
+                for i, j in zip(*hits.nonzero()):
+                    candidates.setdefault(i, []).append(bullets[j])
+            else:
+                # The grid gives each bullet the asteroids near it - a query per bullet, not per asteroid
+                self.asteroid_grid.build(asteroids)
+                for bullet in self.bullets:
+                    for i in self.asteroid_grid.query_indices(bullet.position, bullet.radius):
+                        candidates.setdefault(i, []).append(bullet)
+        used_bullets = set()
+        for i in sorted(candidates):  # Same order as checking every asteroid
+            asteroid = asteroids[i]
+            for bullet in candidates[i]:
+                if id(bullet) not in used_bullets and asteroid.collides_with(bullet):
+                    used_bullets.add(id(bullet))
+                    self._remove_bullet(bullet)
+                    self._destroy_asteroid(asteroid)
                     if self.spaceship:
                         if self.game_mode == 'hard':
                             self.score += 1
@@ -521,60 +877,109 @@ class Game:
                     break
 
         # Makes sure there are no powerups when you 'lose'.
-        if self.win_option or self.spaceship is None:
-            self.powerups = []
+        if (self.win_option or self.spaceship is None) and self.powerups:
+            self.scene.clear_powerups()
 
         for bullet in self.bullets[:]:  # A copy of the list in order to not iterate on the original one
             if not self.screen.get_rect().collidepoint(bullet.position):  # The method checks if it's inside the rect
-                self.bullets.remove(bullet)
+                self._remove_bullet(bullet)
 
     def _draw(self):
         """Handles the images 'drawn' on screen - background, score, sprites and win/lose text. Draws according to FPS.
                 :return: None
                 """
-        self.screen.blit(self.background, (0, 0))
-        self.score_text.show_text(f"Score: {self.score}", self.score_color, (0, 0), center=False)
-
+        if self.render:
+            self._clear_screen()
+            if not self.lod:
+                self._mark_dirty(self.score_text.show_text(f"Score: {self.score}", self.score_color, (0, 0),
+                                                           center=False))
 
-        for game_object in self._get_game_objects():
-            game_object.draw(self.screen)
+        self._draw_objects()
+        if self.lod and self.render:
+            self._draw_stress_hud()
 
-        if self.spaceship is None:
-            game_over_position = (self.Screen_width // 2, self.Screen_height * 0.3)
-            restart_text_position = (self.Screen_width // 2, self.Screen_height * 0.3 + int(100 * SCALE_FACTOR))
-            exit_text_position = (self.Screen_width // 2, self.Screen_height * 0.3 + int(175 * SCALE_FACTOR))
-
-            self.end_text.show_text("GAME OVER!", 'lavender', game_over_position, center=True)
-            self.score_text.show_text("Press F1 to restart", 'lavenderblush', restart_text_position, center=True)
-            self.score_text.show_text("Press ESC to exit", 'lavenderblush', exit_text_position, center=True)
+        if self.spaceship is None and self.render:
+            self._show_end_text("GAME OVER!", 'lavender')
 
         # If game is won
         if self.win_option:
-            you_win_position = (self.Screen_width // 2, self.Screen_height * 0.3)
-            restart_text_position = (self.Screen_width // 2, self.Screen_height * 0.3 + int(100 * SCALE_FACTOR))
-            exit_text_position = (self.Screen_width // 2, self.Screen_height * 0.3 + int(175 * SCALE_FACTOR))
-
-            self.end_text.show_text("YOU WIN!", 'ivory', you_win_position, center=True)
-            self.score_text.show_text("Press F1 to restart", 'lavenderblush', restart_text_position, center=True)
-            self.score_text.show_text("Press ESC to exit", 'lavenderblush', exit_text_position, center=True)
+            if self.render:
+                self._show_end_text("YOU WIN!", 'ivory')
 
         # Makes sure all stats for win are correct.
         elif not self.win_option and len(self.asteroids) == 0 and self.spaceship:
             self.win_option = True
-            print(self.game_stats())
+            self._end_round(True)
             Sounds().win_event_sound()
 
-        self.clock.tick(self.target_fps)  # FPS
-        pygame.display.flip()
+    def _save_score(self):
+        """Saves the score of the round to the score store - written to disk in the background.
+                :return: None
+                """
+        self.score_store.add(self.score, self._get_ticks(), self.asteroids_destroyed)
+
+    def _end_round(self, won):
+        """Counts the round and records its stats - round number, time played, the fastest bullet speed, asteroids
+        destroyed and score - in the telemetry. A lost round also saves its score, a won one saves it when the
+        asteroids of the win are gone.
+                :param won: bool
+                :return: None
+                """
+        self.rounds += 1
+        if not won:
+            self._save_score()
+        if self.telemetry:
+            self.telemetry.round(self.rounds, self._get_ticks(), self.fastest_bullet_speed, self.asteroids_destroyed,
+                                 self.score, won)
+
+    def _draw_stress_hud(self):
+        """Stress mode - the score, the amount of asteroids and the frame rate on an opaque panel over the objects.
+        The objects under it are not drawn (see LevelOfDetail).
+                :return: None
+                """
+        frames = self.profiler.histograms.get('frame')
+        if frames and self.profiler.frame % OVERLAY_REFRESH == 0:
+            self.stress_fps = 1000 / max(frames.summary()['p50'], 0.001)
+        text_surface = render_text(self.score_text.font, f"Score: {self.score}   Asteroids: {len(self.asteroids)}   "
+                                                         f"FPS: {self.stress_fps:.0f}", self.score_color)
+        rect = text_surface.get_rect().inflate(20, 10)
+        rect.topleft = (0, 0)
+        self.screen.fill('black', rect)
+        self.screen.blit(text_surface, (10, 5))
+        self.lod.set_panel('hud', rect)
+        self._mark_dirty(rect)
+
+    def _show_end_text(self, title, color):
+        """Shows the end of game title (win/lose) and the restart/exit options - a static layer.
+                :param title: str - "GAME OVER!" or "YOU WIN!".
+                :param color: str - color of the title.
+                :return: None
+                """
+        self.end_title = (title, color)
+        self._mark_dirty(*self.end_layer.blit(self.screen, self.end_title))
+
+    def _draw_end_text(self, surface):
+        """Draws the end of game layer (see _show_end_text).
+                :param surface: transparent surface of the layer.
+                :return: rects of the title and the options
+                """
+        title, color = self.end_title
+        end_text = Text(surface, self.end_text.font)
+        score_text = Text(surface, self.score_text.font)
+        title_position = (self.Screen_width // 2, self.Screen_height * 0.3)
+        restart_text_position = (self.Screen_width // 2, self.Screen_height * 0.3 + int(100 * SCALE_FACTOR))
+        exit_text_position = (self.Screen_width // 2, self.Screen_height * 0.3 + int(175 * SCALE_FACTOR))
+
+        return [end_text.show_text(title, color, title_position, center=True),
+                score_text.show_text("Press F1 to restart", 'lavenderblush', restart_text_position, center=True),
+                score_text.show_text("Press ESC to exit", 'lavenderblush', exit_text_position, center=True)]
 
     def _menu_process_game_logic(self):
         """Menu - moves asteroids on half screen and rotates them. Same asteroids continue in game.
                 :return: None
                 """
-        for asteroid in [*self.asteroids]:
-            asteroid.change_menu_state(True)
-            asteroid.move()
-            asteroid.random_rotation()
+        self._move_objects()
+        self._rotate_asteroids()
 
     def _menu_handle_input(self):
         """Menu - moves asteroids on half screen and rotates them. Same asteroids continue in game.
@@ -582,78 +987,92 @@ class Game:
                 """
         # Very similar to game loop.
         global spaceship_kind, shield_state
-        for event in pygame.event.get():
+        frame = self.input_source.poll()
+        mouse_position = frame.mouse
+        for event in frame.events:
 
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                quit()
+                self._quit()
 
             if event.type == pygame.KEYDOWN and event.key == pygame.K_F1:
-                pygame.quit()
-                space_rocks = Game()
-                space_rocks.main_loop()
+                self.reset_requested = True
+                return
+
+            # Shows / hides the frame timings
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.overlay = not self.profiler.overlay
 
             # All the handles for pressing text in menu.
             if self.menu_state:
-                if self.menu_play.collidepoint(pygame.mouse.get_pos()) and event.type == pygame.MOUSEBUTTONDOWN \
+                if self.menu_play.collidepoint(mouse_position) and event.type == pygame.MOUSEBUTTONDOWN \
                         or (event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE):
                     # Enables the change of the spaceship image.
                     self.spaceship = Spaceship(self.spaceship_init_pos, shield_state,
-                                               self.bullets.append,
-                                               self.explosion.append, self._chosen_spaceship(spaceship_kind))
+                                               self.scene.add_bullet,
+                                               self.scene.add_explosion, self._chosen_spaceship(spaceship_kind))
+                    self.spaceship.bullet_class = self.bullet_class
+                    self.spaceship.bullet_pool = self.bullet_pool
+                    self.spaceship.explosion_pool = self.explosion_pool
                     self.menu_state = False
                     self.game_mode = 'easy' if shield_state else 'hard'
-                    self.powered_up_begin_time = pygame.time.get_ticks()
+                    self._schedule_powerup_spawn()
                 # Changes game mode.
-                if self.menu_toggle_mode.collidepoint(pygame.mouse.get_pos()) and event.type == pygame.MOUSEBUTTONDOWN:
+                if self.menu_toggle_mode.collidepoint(mouse_position) and event.type == pygame.MOUSEBUTTONDOWN:
                     shield_state = not shield_state
                 # Changes spaceship image.
                 if self.menu_change_spaceship.collidepoint(
-                        pygame.mouse.get_pos()) and event.type == pygame.MOUSEBUTTONDOWN:
+                        mouse_position) and event.type == pygame.MOUSEBUTTONDOWN:
                     spaceship_kind += 1
                     if spaceship_kind == 4:
                         spaceship_kind = 0
                 # Shows score table.
                 if self.menu_score.collidepoint(
-                        pygame.mouse.get_pos()) and event.type == pygame.MOUSEBUTTONDOWN:
+                        mouse_position) and event.type == pygame.MOUSEBUTTONDOWN:
                     self.table_state = not self.table_state
                 # Quits the code (game).
                 if self.menu_quit.collidepoint(
-                        pygame.mouse.get_pos()) and event.type == pygame.MOUSEBUTTONDOWN:
-                    quit()
+                        mouse_position) and event.type == pygame.MOUSEBUTTONDOWN:
+                    self._quit()
 
     def _menu_draw(self):
         """Menu draw. Similar to game loop but adds menu options.
                 :return: None
                 """
-        self.screen.blit(self.background, (0, 0))
-        self.menu_spaceship = Spaceship(self.spaceship_init_pos, shield_state, self.bullets.append,
-                                        self.explosion.append, self._chosen_spaceship(spaceship_kind))
-        self.menu_spaceship.draw(self.screen)
-
-        for game_object in [*self.asteroids]:
-            game_object.draw(self.screen)
+        if not self.render:
+            self._draw_objects()
+            return
+
+        # Only the asteroids are drawn every frame - the spaceship (under them), the text and the score table (over
+        # them) are static layers. With dirty rects the layers are marked too - antialiased text blitted again over
+        # itself without the background gets bolder
+        self._clear_screen()
+        self._mark_dirty(*self.menu_ship_layer.blit(self.screen, (shield_state, spaceship_kind)))
+
+        self._draw_objects()
+        # A solid line - cheaper to draw than to blit as a layer the width of the screen
         pygame.draw.line(self.screen, (91, 91, 91), (0, self.Screen_height / 2 + 100),
                          (self.Screen_width, self.Screen_height / 2 + 100))
-        self._show_menu_text(self, self.screen)
+        self._mark_dirty(*self.menu_text_layer.blit(self.screen))
 
         if self.table_state:
-            self._show_score_table_text()
-        # display.update vs flip > update can be used on a specific object while flip is for all
+            self._mark_dirty(*self.score_table_layer.blit(self.screen, tuple(self.score_store.top(3))))
 
-        self.clock.tick(self.target_fps)
-        pygame.display.flip()
+    def _draw_menu_spaceship(self, surface):
+        """Draws the chosen spaceship of the menu, with the shield in easy mode.
+                :param surface: transparent surface of the layer.
+                :return: rects of the spaceship
+                """
+        self.menu_spaceship = Spaceship(self.spaceship_init_pos, shield_state, self.scene.add_bullet,
+                                        self.scene.add_explosion, self._chosen_spaceship(spaceship_kind))
+        return [self.menu_spaceship.draw(surface)]
 
-    def game_stats(self):
-        """Shows end game stats - round number, time of round, the fastest bullet speed and asteroids destroyed.
-                :return: Strings - game stats.
+    def _draw_score_table(self, surface):
+        """Draws the score table layer. The whole table is kept, the grid lines are not in the rects of the text.
+                :param surface: transparent surface of the layer.
+                :return: None
                 """
-        global Round
-        Round += 1
-        return f'Round {Round}:\n' \
-               f''f'Total time played: {(time_played / 1000):.2f} seconds\n' \
-               f'Fastest bullet speed: {fastest_bullet_speed:.2f} m/s\n' \
-               f'Total asteroids destroyed: {self.asteroids_destroyed}\n' \
-               f'{"#" * 30}'
+        self._show_score_table_text(surface)
+        # display.update vs flip > update can be used on a specific object while flip is for all
 
 def set_game_settings(scale, asteroids, bullets, powered_bullets):
     """Changes the setting in the game.
@@ -667,3 +1086,29 @@ def set_game_settings(scale, asteroids, bullets, powered_bullets):
     asteroid_amount = asteroids
     bullets_amount = bullets
     powered_up_bullets = powered_bullets
+
+
+def replay_session(path, physics='python', render=False):
+    """Plays a recorded session again, headless and as fast as possible. Same seed, screen, settings and input give
+    the same game, tick by tick.
+            :param path: str - file recorded with Game(options=GameOptions(record=path)).
+            :param physics: str - physics backend of the replay.
+            :param render: bool - draws the images (slower).
+            :return: Game - the replayed game, in its final state.
+            """
+    global shield_state, spaceship_kind
+    replay = ReplayInput(path)
+    header = replay.header
+    set_game_settings(*header['settings'])
+    shield_state = header['shield_state']
+    spaceship_kind = header['spaceship_kind']
+    target_fps = Game.target_fps
+    Game.target_fps = header['target_fps']  # Read by __init__ for the game clock - only for this game
+    try:
+        game = Game(physics, headless=True, input_source=replay, render=render, seed=header['seed'],
+                    screen_size=tuple(header['screen_size']))
+    finally:
+        Game.target_fps = target_fps
+    game.target_fps = header['target_fps']
+    game.run_headless()
+    return game
@@ -0,0 +1,210 @@
+import json
+
+import pygame
+
+# Keys the game reads with get_pressed() - the only ones recorded
+TRACKED_KEYS = (pygame.K_UP, pygame.K_LEFT, pygame.K_RIGHT)
+# Events the game handles - the only ones recorded
+TRACKED_EVENTS = {pygame.QUIT: 'quit', pygame.KEYDOWN: 'key', pygame.MOUSEBUTTONDOWN: 'click'}
+
+
+class KeyState:
+    """ Pressed keys of one frame. Indexed by key like pygame.key.get_pressed().
+            :param pressed: iterable of pygame key constants.
+            """
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+class InputFrame:
+    """ All the input of one frame - events, pressed keys and mouse position.
+            :param events: list of pygame events.
+            :param keys: object indexed by key (pygame.key.get_pressed() or KeyState).
+            :param mouse: tuple (x, y).
+            """
+
+    def __init__(self, events=(), keys=None, mouse=(0, 0)):
+        self.events = list(events)
+        self.keys = keys if keys is not None else KeyState()
+        self.mouse = mouse
+
+    @classmethod
+    def create(cls, pressed=(), key_down=(), click=None, quit_game=False):
+        """Helper method to build a frame for scripts.
+                :param pressed: keys held down in this frame (arrows).
+                :param key_down: keys pressed in this frame (space, F1, ESC).
+                :param click: None or tuple (x, y) - mouse click position.
+                :param quit_game: bool - adds a QUIT event.
+                :return: InputFrame
+                """
+        events = [pygame.event.Event(pygame.KEYDOWN, key=key) for key in key_down]
+        mouse = (0, 0)
+        if click is not None:
+            mouse = click
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=click, button=1))
+        if quit_game:
+            events.append(pygame.event.Event(pygame.QUIT))
+        return cls(events, KeyState(pressed), mouse)
+
+
+class LiveInput:
+    """ Input from the keyboard and mouse (the default).
+            """
+    finished = False
+
+    @staticmethod
+    def poll():
+        """Reads the input of this frame from pygame.
+                :return: InputFrame
+                """
+        return InputFrame(pygame.event.get(), pygame.key.get_pressed(), pygame.mouse.get_pos())
+
+    def close(self):
+        """Nothing to close.
+                """
+
+
+class ScriptedInput:
+    """ Input from a script, for headless runs. The script is either a list of InputFrames (one per tick) or a function
+    that gets the tick number and the game and returns an InputFrame (or None for no input).
+            :param script: list of InputFrames or function(tick, game).
+            :param game: the Game passed to a script function.
+            """
+
+    def __init__(self, script, game=None):
+        self.script = script
+        self.game = game
+        self.tick = 0
+
+    @property
+    def finished(self):
+        """A list script finishes after its last frame, a function script never does.
+                :return: bool
+                """
+        return not callable(self.script) and self.tick >= len(self.script)
+
+    def poll(self):
+        """Returns the frame of the current tick and moves to the next one.
+                :return: InputFrame
+                """
+        if callable(self.script):
+            frame = self.script(self.tick, self.game)
+        elif self.tick < len(self.script):
+            frame = self.script[self.tick]
+        else:
+            frame = None
+        self.tick += 1
+        return frame if frame is not None else InputFrame()
+
+    def close(self):
+        """Nothing to close.
+                """
+
+
+def frame_to_record(frame):
+    """Helper method to turn a frame into a json-friendly dict, keeping only the input the game uses.
+            :param frame: InputFrame.
+            :return: dict
+            """
+    events = []
+    for event in frame.events:
+        name = TRACKED_EVENTS.get(event.type)
+        if name == 'key':
+            events.append([name, event.key])
+        elif name == 'click':
+            events.append([name, list(event.pos), event.button])
+        elif name == 'quit':
+            events.append([name])
+    return {'e': events, 'k': [key for key in TRACKED_KEYS if frame.keys[key]], 'm': list(frame.mouse)}
+
+
+def record_to_frame(record):
+    """Helper method to turn a recorded dict back into a frame.
+            :param record: dict from frame_to_record.
+            :return: InputFrame
+            """
+    events = []
+    for event in record['e']:
+        if event[0] == 'key':
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=event[1]))
+        elif event[0] == 'click':
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=tuple(event[1]), button=event[2]))
+        elif event[0] == 'quit':
+            events.append(pygame.event.Event(pygame.QUIT))
+    return InputFrame(events, KeyState(record['k']), tuple(record['m']))
+
+
+class InputRecorder:
+    """ Wraps another input source and writes the input of every tick to a file (json lines). The first line is the
+    session header - seed, screen size and settings - so the session can be replayed exactly with ReplayInput.
+            :param source: input source to record (LiveInput, ScriptedInput...).
+            :param path: str - file to write.
+            :param header: dict - session info written as the first line.
+            """
+
+    def __init__(self, source, path, header):
+        self.source = source
+        self.path = path
+        self.file = open(path, 'w')
+        self.file.write(json.dumps(header) + '\n')
+        self.ticks = 0
+
+    @property
+    def finished(self):
+        """The recording finishes with the wrapped source.
+                :return: bool
+                """
+        return self.source.finished
+
+    def poll(self):
+        """Polls the wrapped source and records the frame.
+                :return: InputFrame
+                """
+        frame = self.source.poll()
+        self.file.write(json.dumps(frame_to_record(frame), separators=(',', ':')) + '\n')
+        self.ticks += 1
+        return frame
+
+    def close(self):
+        """Writes everything to the file and closes it.
+                """
+        if not self.file.closed:
+            self.file.close()
+        self.source.close()
+
+
+class ReplayInput:
+    """ Plays back a file written by InputRecorder, one recorded frame per tick.
+            :param path: str - recorded file.
+            """
+
+    def __init__(self, path):
+        with open(path) as file:
+            self.header = json.loads(file.readline())
+            self.records = [json.loads(line) for line in file if line.strip()]
+        self.tick = 0
+
+    @property
+    def finished(self):
+        """The replay finishes after the last recorded tick.
+                :return: bool
+                """
+        return self.tick >= len(self.records)
+
+    def poll(self):
+        """Returns the recorded frame of the current tick.
+                :return: InputFrame
+                """
+        if self.finished:
+            return InputFrame()
+        frame = record_to_frame(self.records[self.tick])
+        self.tick += 1
+        return frame
+
+    def close(self):
+        """Nothing to close - the file is read at the start.
+                """
@@ -0,0 +1,120 @@
+LOD_FOCUS_RADIUS = 300  # Pixels around the spaceship where the asteroids rotate every tick
+LOD_FAR_INTERVAL = 4  # Ticks between the rotations of the asteroids away from the spaceship
+LOD_FAST_SPEED = 5.5  # Pixels per tick - faster asteroids don't rotate, the spin can't be followed anyway
+LOD_SMALL_SIZE = 1  # Asteroids of this size and smaller don't rotate
+LOD_COVER_MARGIN = 1.5  # Radius of an object for culling, in radiuses of its sprite - a rotated frame is bigger
+
+
+class LevelOfDetail:
+    """ Rules of the stress mode, to keep hundreds or thousands of asteroids running - less work for what can't be
+    seen:
+    - Small or fast asteroids don't rotate.
+    - Asteroids away from the focus (the spaceship, else the centre of the screen) rotate every few ticks by the angle
+      of all those ticks - the same spin with fewer updates. Every tick rotates a different part of them.
+    - Objects fully under an opaque panel of the HUD are not drawn (they still bounce).
+    The rotation rules are for the per-object physics - the numpy backend rotates all the asteroids in one batch.
+            :param focus_radius: int - pixels around the focus where the asteroids rotate every tick.
+            :param far_interval: int - ticks between the rotations of the other asteroids.
+            :param fast_speed: float - pixels per tick from which the asteroids don't rotate.
+            """
+
+    def __init__(self, focus_radius=LOD_FOCUS_RADIUS, far_interval=LOD_FAR_INTERVAL, fast_speed=LOD_FAST_SPEED):
+        self.focus_radius = focus_radius
+        self.far_interval = far_interval
+        self.fast_speed = fast_speed
+        self.near = []  # Asteroids rotated every tick
+        self.far = [[] for _ in range(far_interval)]  # Asteroids rotated every far_interval ticks, a part per tick
+        self.tick = 0
+        self.removals = 0  # Asteroid removals of the scene when the lists were sorted
+        self.panels = {}  # Name -> (left, top, right, bottom) of the opaque HUD panels
+        # Counters
+        self.rotations = 0
+        self.skipped_rotations = 0
+        self.culled = 0
+
+    def _sort(self, asteroids, focus):
+        """Helper method to sort the asteroids into the ones that rotate every tick, every few ticks or not at all.
+        Runs once every far_interval ticks, so new asteroids wait at most that long for their first rotation.
+                :param asteroids: list of Asteroids.
+                :param focus: vector - centre of the area that rotates every tick.
+                """
+        near = self.near = []
+        far = self.far = [[] for _ in range(self.far_interval)]
+        fast_squared = self.fast_speed * self.fast_speed
+        focus_squared = self.focus_radius * self.focus_radius
+        far_count = 0
+        for asteroid in asteroids:
+            if asteroid.size <= LOD_SMALL_SIZE or asteroid.velocity.length_squared() >= fast_squared:
+                continue
+            if asteroid.position.distance_squared_to(focus) <= focus_squared:
+                near.append(asteroid)
+            else:
+                far[far_count % self.far_interval].append(asteroid)  # Spread over the ticks
+                far_count += 1
+
+    def _drop_removed(self, asteroids):
+        """Helper method to take the asteroids that left the scene out of the lists in the middle of a cycle. The
+        others keep their part, so each one still rotates once per far_interval ticks.
+                :param asteroids: list of Asteroids - the scene (an EntityList finds them in O(1)).
+                """
+        self.near = [asteroid for asteroid in self.near if asteroid in asteroids]
+        self.far = [[asteroid for asteroid in far if asteroid in asteroids] for far in self.far]
+
+    def rotate(self, asteroids, focus, removals=0):
+        """Rotates the asteroids by the rules - instead of Asteroid.random_rotation for each one.
+                :param asteroids: list of Asteroids.
+                :param focus: vector.
+                :param removals: int - asteroids removed from the scene so far (Scene.asteroid_removals) - the removed
+                ones are not rotated after their release.
+                """
+        part = self.tick % self.far_interval
+        if part == 0:
+            self._sort(asteroids, focus)
+        elif removals != self.removals:
+            self._drop_removed(asteroids)
+        self.removals = removals
+        self.tick += 1
+        for asteroid in self.near:
+            asteroid.random_rotation()
+        interval = self.far_interval
+        for asteroid in self.far[part]:
+            asteroid.ast_direction.rotate_ip(asteroid.rotation_direction * asteroid.rotation_speed * interval)
+        rotated = len(self.near) + len(self.far[part])
+        self.rotations += rotated
+        self.skipped_rotations += len(asteroids) - rotated  # Not rotated in this tick
+
+    def set_panel(self, name, rect):
+        """Adds, moves or removes an opaque panel of the HUD - drawn over the objects, so the objects under it are
+        not drawn. The panels drawn in a frame hide the objects of the next frame.
+                :param name: str
+                :param rect: pygame.Rect or None to remove it.
+                """
+        if rect is None:
+            self.panels.pop(name, None)
+        else:
+            self.panels[name] = (rect.left, rect.top, rect.right, rect.bottom)
+
+    def covered(self, game_object):
+        """Checks if an object is fully under an opaque panel.
+                :param game_object: GameObject
+                :return: bool
+                """
+        if not self.panels:
+            return False
+        x, y = game_object.position
+        radius = game_object.radius * LOD_COVER_MARGIN
+        for left, top, right, bottom in self.panels.values():
+            if left <= x - radius and x + radius <= right and top <= y - radius and y + radius <= bottom:
+                self.culled += 1
+                return True
+        return False
+
+    def stats(self):
+        """Counts of the work saved.
+                :return: dict
+                """
+        return {
+            'rotations': self.rotations,
+            'skipped_rotations': self.skipped_rotations,
+            'culled': self.culled,
+        }
@@ -1,16 +1,19 @@
-import random
+import os
+import time
 
 import pygame
 from pygame.math import Vector2
 from pygame.mixer import Sound
-from pygame.transform import rotozoom
 from pygame import font, mixer
 
-from utils import load_sprite, get_random_velocity
+from archive import ASSETS_DIR, get_archive
+from utils import load_sprite, get_random_velocity, set_random_velocity, rotation_cache, render_text
+from simulation import random_streams
 
 # Variables
 UP = Vector2(0, -1)
 asteroid_imgs = ['asteroid', 'asteroid1', 'asteroid2']
+SOUNDS_DIR = os.path.join(ASSETS_DIR, 'sounds')
 
 
 class GameObject:
@@ -20,33 +23,69 @@ class GameObject:
             :param sprite: image of the sprite.
             :param vel: vector - initial speed.
             """
+    # Slots instead of a dict per object - less memory and faster attribute access. Subclasses add their own
+    __slots__ = ('position', 'sprite', 'radius', 'velocity', 'acceleration', 'pool')
 
     def __init__(self, position, sprite, vel):
         self.position = Vector2(position)  # if only one number is given, will be used as double - (position, position)
         self.sprite = sprite
         self.radius = sprite.get_width() / 2
-        self.velocity = Vector2(vel)
+        self.velocity = Vector2(vel)  # Always a Vector2 - changed in place, not replaced
         self.acceleration = Vector2(0, 0)
+        self.pool = None  # The ObjectPool the object was acquired from, None if it was created directly
+
+    def reset(self, position, sprite, vel):
+        """Starts a released object again (see ObjectPool) - the same as __init__, but in the vectors it already has.
+                :param position: vector.
+                :param sprite: image of the sprite.
+                :param vel: vector - initial speed.
+                """
+        self.sprite = sprite
+        self.radius = sprite.get_width() / 2
+        # Changed in place and assigned back - the physics bodies keep their vectors in the world arrays
+        position_vector = self.position
+        position_vector.update(position)
+        self.position = position_vector
+        velocity = self.velocity
+        velocity.update(vel)
+        self.velocity = velocity
+        self.acceleration.update(0, 0)
+        self.pool = None
 
     def draw(self, surface):
         """Draws the sprite on the screen.
                 :param surface: screen it draws on
+                :return: pygame.Rect - the area drawn.
+                """
+        return surface.blit(*self.blit_command(surface))
+
+    def blit_command(self, surface):
+        """The same as draw(), but returns the blit instead of doing it - the game blits many objects in one call
+        (see BlitBatch). Objects that draw more than one sprite (the spaceship with its shield) are drawn with draw().
+                :param surface: screen (for the bounce).
+                :return: tuple - (sprite, top-left position).
                 """
-        blit_position = self.position - Vector2(self.radius)
-        surface.blit(self.sprite, blit_position)
+        return self.sprite, (self.position.x - self.radius, self.position.y - self.radius)
 
     def move(self):
         """Moves the sprite inside the screen according to its speed.
                 """
-        self.position = self.position + self.velocity
+        self.position += self.velocity  # In place - no new vector every frame
+
+    def bounce(self, surface):
+        """Keeps the sprite inside the screen. Runs as part of draw(), or alone when the game is not drawn.
+                :param surface: screen
+                """
 
     def collides_with(self, other_obj):
         """Helper method to check if two sprites collide.
                 :param other_obj: the obj you check the distance to
                 :return: bool - Placement of score (x), using backspaces
                 """
-        distance = self.position.distance_to(other_obj.position)
-        return distance < self.radius + other_obj.radius
+        # Squared distances - no square root is needed to compare them
+        distance = self.position.distance_squared_to(other_obj.position)
+        radius_sum = self.radius + other_obj.radius
+        return distance < radius_sum * radius_sum
 
 
 class Spaceship(GameObject):
@@ -62,14 +101,19 @@ class Spaceship(GameObject):
     FRICTION = -0.015  # Deceleration when no movement.
     MAX_SPEED = 11
     BULLET_SPEED = 9.5
-    bullet_vel = 0
+    __slots__ = ('direction', 'create_bullet_callback', 'create_explosion_callback', 'shield', 'bullet_vel',
+                 'bullet_class', 'bullet_pool', 'explosion_pool')
 
     def __init__(self, position, shield, create_bullet_callback, create_explosion_callback, spaceship_img):
-        self.sprite = rotozoom(load_sprite(spaceship_img), 0, 0.07)
+        self.sprite = load_sprite(spaceship_img, scale=0.07)
         self.direction = Vector2(UP)  # Initially the same as UP but will be modified (Makes a copy of UP)
         self.create_bullet_callback = create_bullet_callback
         self.create_explosion_callback = create_explosion_callback
         self.shield = shield
+        self.bullet_vel = Vector2(0)
+        self.bullet_class = None  # Class of the bullets shot, Bullet unless changed (e.g. to physics handles)
+        self.bullet_pool = None  # ObjectPool of the bullets - used instead of bullet_class when set
+        self.explosion_pool = None  # ObjectPool of the explosions
         super().__init__(position, self.sprite, vel=Vector2(0))
 
     def rotate(self, clockwise=True):
@@ -86,7 +130,6 @@ class Spaceship(GameObject):
         """Spaceship rotation using angle change (left/right clockwise).
                 """
         self.velocity += self.direction * self.ACCELERATION
-        self.velocity = Vector2(self.velocity)
 
         # Acceleration change to create smooth and easy movement.
         if self.velocity.length() < 0.5:
@@ -106,22 +149,28 @@ class Spaceship(GameObject):
     def friction(self):
         """Slows down the spaceship when it doesn't move (deceleration).
                 """
-        self.velocity += Vector2(self.velocity) * self.FRICTION
+        self.velocity += self.velocity * self.FRICTION
 
     def spaceship_bounce(self, surface):
         """Constrains the ship from going out of screen.
                 :param surface: the screen (background).
                 """
-        x, y = self.velocity
+        x, y = self.velocity  # Each check sets the speed from the speed before the bounce
         w, h = surface.get_size()
         if self.position.x >= w:
-            self.velocity = (-5, y)
+            self.velocity.update(-5, y)
         if self.position.y >= h:
-            self.velocity = (x, -5)
+            self.velocity.update(x, -5)
         if self.position.x <= 0:
-            self.velocity = (5, y)
+            self.velocity.update(5, y)
         if self.position.y <= 0:
-            self.velocity = (x, 5)
+            self.velocity.update(x, 5)
+
+    def bounce(self, surface):
+        """The spaceship bounces from the walls (see spaceship_bounce).
+                :param surface: the screen.
+                """
+        self.spaceship_bounce(surface)
 
     def shoot(self, powerup):
         """Spaceship rotation using angle change (left/right clockwise)
@@ -129,7 +178,6 @@ class Spaceship(GameObject):
                 """
         # Bullet speed mechanic to make sure it doesn't go too fast or too slow because is based on the ship's movement.
         mini = self.direction.copy()
-        self.velocity = Vector2(self.velocity)
 
         if 0 <= self.velocity.length() <= 3:
             mini.scale_to_length(6)
@@ -182,10 +230,11 @@ class Spaceship(GameObject):
                 bullet_vel = (mini * 1.5 + self.velocity)
 
         # When powered up - changes bullet to red
+        bullet_class = self.bullet_pool.acquire if self.bullet_pool else self.bullet_class or Bullet
         if powerup:
-            bullet = Bullet(self.position, rotozoom(load_sprite('bullet1'), 1, 0.2), bullet_vel, True)
+            bullet = bullet_class(self.position, load_sprite('bullet1', scale=0.2, angle=1), bullet_vel, True)
         else:
-            bullet = Bullet(self.position, load_sprite('bullet'), bullet_vel)
+            bullet = bullet_class(self.position, load_sprite('bullet'), bullet_vel)
         Sounds().shoot_sound()
         self.bullet_vel = bullet_vel
         self.create_bullet_callback(bullet)  # Equals to self.bullets.append(bullet)
@@ -199,23 +248,27 @@ class Spaceship(GameObject):
     def explosion(self):
         """Handles the 'death' of the spaceship using explosion class.
                 """
-        explosion_icon = rotozoom(load_sprite("explosion"), 0, 0.15)
-        explosion = Explosion(self.position, explosion_icon)
+        explosion_icon = load_sprite("explosion", scale=0.15)
+        explosion_class = self.explosion_pool.acquire if self.explosion_pool else Explosion
+        explosion = explosion_class(self.position, explosion_icon)
         self.create_explosion_callback(explosion)
 
     def draw(self, surface):
         """Handles the change of angle to rotate the image of the spaceship, adds shield if easy mode and draws the ship
                 :param surface: the screen.
+                :return: pygame.Rect - the area drawn, with the shield.
                 """
         angle = self.direction.angle_to(UP)  # Calculates the angle to a given vector
-        rotated_surface = rotozoom(self.sprite, angle, 1.0)  # 1.0 same scale # This rotates the object
-        rotated_surface_size = Vector2(rotated_surface.get_size())
+        # Pre-rotated frame of the sprite - the offset is half of its size
+        rotated_surface, offset = rotation_cache.frame(self.sprite, angle)
         self.spaceship_bounce(surface)
-        blit_position = self.position - rotated_surface_size * 0.5  # Takes the centre of the rect as the position
+        blit_position = self.position - offset  # Takes the centre of the rect as the position
+        shield_rect = None
         if self.shield:
-            pygame.draw.circle(surface, color='mediumvioletred', center=self.position,
-                               radius=(self.radius + 8), width=5)
-        surface.blit(rotated_surface, blit_position)
+            shield_rect = pygame.draw.circle(surface, color='mediumvioletred', center=self.position,
+                                             radius=(self.radius + 8), width=5)
+        rect = surface.blit(rotated_surface, blit_position)
+        return rect.union(shield_rect) if shield_rect else rect
 
 
 class Asteroid(GameObject):
@@ -225,30 +278,55 @@ class Asteroid(GameObject):
             :param size: int - size of Asteroid.
             :param menu_state: bool - menu on/off.
             """
+    __slots__ = ('create_asteroid_callback', 'size', 'menu_state', 'ast_direction', 'rotation_direction',
+                 'rotation_speed')
+    SIZE_SCALE = {3: 2.1, 2: 1.2, 1: 0.7}  # Scale of the sprite by size
+    ROTATION_DIRECTIONS = (-1, 1)
+    ROTATION_SPEEDS = (0.3, 0.4)
+
     def __init__(self, position, create_asteroid_callback, size=3, menu_state=True):
         self.create_asteroid_callback = create_asteroid_callback
         self.size = size
         self.menu_state = menu_state
         self.ast_direction = Vector2(UP)
-        self.rotation_direction = random.choice([-1, 1])
-        self.rotation_speed = random.choice([0.3, 0.4])
-        size_scale = {
-            3: 2.1,
-            2: 1.2,
-            1: 0.7
-        }
-        scale = size_scale[size]
-        self.sprite = rotozoom(load_sprite(random.choice(asteroid_imgs)), angle=0, scale=scale)
+        rng = random_streams.get('asteroids')
+        self.rotation_direction = rng.choice(self.ROTATION_DIRECTIONS)
+        self.rotation_speed = rng.choice(self.ROTATION_SPEEDS)
+        self.sprite = load_sprite(rng.choice(asteroid_imgs), scale=self.SIZE_SCALE[size])
         # A method to scale the rect
-        super().__init__(position, self.sprite, vel=get_random_velocity(4, 6))
+        super().__init__(position, self.sprite, vel=get_random_velocity(4, 6, rng))
         # The scale is passed before "super" in order to calculate radius and other stuff
 
+    def reset(self, position, create_asteroid_callback, size=3, menu_state=True):
+        """Starts a released asteroid again (see ObjectPool) - the same random values in the same order as __init__,
+        so a reused asteroid is the same as a new one.
+                :param position: vector.
+                :param create_asteroid_callback: type Class, Asteroid.
+                :param size: int - size of Asteroid.
+                :param menu_state: bool - menu on/off.
+                """
+        self.create_asteroid_callback = create_asteroid_callback
+        self.size = size
+        self.menu_state = menu_state
+        direction = self.ast_direction
+        direction.update(UP)
+        self.ast_direction = direction
+        rng = random_streams.get('asteroids')
+        self.rotation_direction = rng.choice(self.ROTATION_DIRECTIONS)
+        self.rotation_speed = rng.choice(self.ROTATION_SPEEDS)
+        super().reset(position, load_sprite(rng.choice(asteroid_imgs), scale=self.SIZE_SCALE[size]), 0)
+        velocity = self.velocity
+        set_random_velocity(velocity, 4, 6, rng)
+        self.velocity = velocity
+
     def split(self):
         """Handles the split of the asteroid mechanic.
                 """
         if self.size > 1:
             for a in range(2):
-                asteroid = Asteroid(self.position, self.create_asteroid_callback, self.size - 1)
+                # Same class (or pool) as this asteroid, so physics handles split into handles
+                asteroid_class = self.pool.acquire if self.pool else type(self)
+                asteroid = asteroid_class(self.position, self.create_asteroid_callback, self.size - 1)
                 self.create_asteroid_callback(
                     asteroid)  # This "creates" the option for splitting the asteroid in the original one.
                 # When .split() is used, the asteroid is appended to the game_objects based on the asteroid before.
@@ -286,20 +364,26 @@ class Asteroid(GameObject):
 
         if self.position.x > w:
             self.position.x = w - 5
-            self.velocity = (-x, y)
+            self.velocity.update(-x, y)
         if self.position.x < w_o:
             self.position.x = w_o + 5
-            self.velocity = (-x, y)  # Needs to receive reverse current speed
+            self.velocity.update(-x, y)  # Needs to receive reverse current speed
         if self.position.y < y_o:
             self.position.y = y_o + 5
-            self.velocity = (x, -y)
+            self.velocity.update(x, -y)
         if self.menu_state is False:
             if self.position.y > h:
                 self.position.y = h - 5
-                self.velocity = (x, -y)
+                self.velocity.update(x, -y)
         elif self.menu_state:
             if self.position.y > (h + 50) / 2:
-                self.velocity = (x, -y)
+                self.velocity.update(x, -y)
+
+    def bounce(self, surface):
+        """The asteroid bounces from the walls (see asteroid_bounce).
+                :param surface: screen.
+                """
+        self.asteroid_bounce(surface)
 
     def random_rotation(self):
         """rotates randomly the asteroids.
@@ -309,13 +393,33 @@ class Asteroid(GameObject):
     def draw(self, surface):
         """Handles the drawing of the asteroids according to movement mechanics.
                 :param surface: screen,
+                :return: pygame.Rect - the area drawn.
                 """
         self.asteroid_bounce(surface)
+        return self.draw_sprite(surface)
+
+    def blit_command(self, surface):
+        """Bounces the asteroid and returns the blit of its rotated sprite (see GameObject.blit_command).
+                :param surface: screen.
+                :return: tuple - (rotated sprite, top-left position).
+                """
+        self.asteroid_bounce(surface)
+        return self.sprite_command()
+
+    def sprite_command(self):
+        """The blit of the rotated asteroid, without bouncing it.
+                :return: tuple - (rotated sprite, top-left position).
+                """
         angle = self.ast_direction.angle_to(UP)
-        rotated_surface = rotozoom(self.sprite, angle, 1.0)  # 1.0 same scale # This rotates the object
-        rotated_surface_size = Vector2(rotated_surface.get_size())
-        blit_position = self.position - rotated_surface_size * 0.5  # Takes the centre of the rect as the position
-        surface.blit(rotated_surface, blit_position)
+        rotated_surface, offset = rotation_cache.frame(self.sprite, angle)  # Pre-rotated frame of the sprite
+        return rotated_surface, self.position - offset  # Takes the centre of the rect as the position
+
+    def draw_sprite(self, surface):
+        """Draws the rotated asteroid without bouncing it.
+                :param surface: screen,
+                :return: pygame.Rect - the area drawn.
+                """
+        return surface.blit(*self.sprite_command())
 
 
 class Bullet(GameObject):
@@ -325,27 +429,51 @@ class Bullet(GameObject):
         :param vel: Vector - speed ot the bullet.
         :param powerup: bool - powered up or not.
     """
+    __slots__ = ('powerup', 'bullet')
+
     def __init__(self, position, bullet, vel, powerup=False):
         super().__init__(position, bullet, vel)
         self.powerup = powerup
         self.bullet = bullet
 
+    def reset(self, position, bullet, vel, powerup=False):
+        """Starts a released bullet again (see ObjectPool).
+                :param position: vector.
+                :param bullet: sprite, bullet image.
+                :param vel: Vector - speed ot the bullet.
+                :param powerup: bool - powered up or not.
+                """
+        super().reset(position, bullet, vel)
+        self.powerup = powerup
+        self.bullet = bullet
+
 
 class Explosion(GameObject):
     """ This class is a subclass. Adds the explosion sprite.
         :param position: vector.
         :param sprite: the explosion image.
         """
+    __slots__ = ()
+
     def __init__(self, position, sprite):
         super().__init__(position, sprite, 0)
 
+    def reset(self, position, sprite):
+        """Starts a released explosion again (see ObjectPool).
+                :param position: vector.
+                :param sprite: the explosion image.
+                """
+        super().reset(position, sprite, 0)
+
 
 class BulletPowerUp(GameObject):
     """ This class is a subclass. Adds the 'more bullets' powerup sprite.
             :param position: vector.
         """
+    __slots__ = ()
+
     def __init__(self, position):
-        self.sprite = rotozoom(load_sprite("bullets"), 0, 0.1)
+        self.sprite = load_sprite("bullets", scale=0.1)
         super().__init__(position, self.sprite, 0)
 
     def powerup(self):
@@ -359,8 +487,10 @@ class SlowMotionPowerUp(GameObject):
     """ This class is a subclass. Adds the 'slow motion' powerup sprite.
             :param position: vector.
         """
+    __slots__ = ()
+
     def __init__(self, position):
-        self.sprite = rotozoom(load_sprite("slow_motion"), 0, 0.1)
+        self.sprite = load_sprite("slow_motion", scale=0.1)
         super().__init__(position, self.sprite, 0)
 
     def powerup(self):
@@ -388,7 +518,7 @@ class Text:
             :param center: bool - Whether to center the text at the given position or align top-left.
             :return: pygame.rect
         """
-        text_surface = self.font.render(text, True, color)
+        text_surface = render_text(self.font, text, color)  # Cached - the same text is rendered only once
         rect = text_surface.get_rect()  # Creates a rect without specific coordinates (size only)
 
         if position is None:
@@ -426,23 +556,136 @@ class Text:
         return table, line_1, line_2, line_3
 
 
+class SoundBank:
+    """ Decodes every sound once (from the asset archive, or the sounds folder) and plays the same pygame.Sound
+    buffers again and again. Each category of effects gets its own reserved channels, so rapid fire can't cut off an
+    explosion. A muted bank (headless games) decodes and plays nothing.
+            :param directory: str - folder of the .wav files.
+            """
+    # Category -> amount of reserved channels
+    CHANNEL_POOLS = {
+        'shoot': 3,
+        'impact': 2,
+        'powerup': 1,
+        'event': 2,  # Win, shield break and death - a death right after a shield break doesn't cut it off
+    }
+    FREE_CHANNELS = 8  # Extra channels that stay free for Sound.play()
+
+    def __init__(self, directory=SOUNDS_DIR):
+        self.directory = directory
+        self.muted = False
+        self.sounds = {}
+        self.pools = {}
+        self._next_channel = {}
+        # Latency counters
+        self.loads = 0
+        self.load_time = 0.0
+        self.plays = 0
+        self.play_time = 0.0
+        self.max_play_time = 0.0
+
+    def load(self):
+        """Decodes all the .wav files and reserves the channel pools. Needs to run again after the mixer restarts.
+                """
+        start = time.perf_counter()
+        if not mixer.get_init():
+            mixer.init()  # Started here and not on import, so the game can pick the audio driver first
+        self.sounds = {}
+        archive = get_archive() if self.directory == SOUNDS_DIR else None
+        if archive:
+            entries = archive.names('sounds/')
+            archive.preload(entries)  # Decoded in parallel
+            for entry in entries:
+                self.sounds[os.path.splitext(os.path.basename(entry))[0]] = archive.get(entry)
+                self.loads += 1
+        if os.path.isdir(self.directory):
+            for file in sorted(os.listdir(self.directory)):
+                name, extension = os.path.splitext(file)
+                if extension == '.wav' and name not in self.sounds:
+                    self.sounds[name] = Sound(os.path.join(self.directory, file))
+                    self.loads += 1
+
+        reserved = sum(self.CHANNEL_POOLS.values())
+        mixer.set_num_channels(reserved + self.FREE_CHANNELS)
+        mixer.set_reserved(reserved)  # Channels 0 - reserved-1 are never picked by Sound.play()
+        channel_id = 0
+        for category, amount in self.CHANNEL_POOLS.items():
+            self.pools[category] = [mixer.Channel(channel_id + i) for i in range(amount)]
+            self._next_channel[category] = 0
+            channel_id += amount
+        self.load_time += time.perf_counter() - start
+
+    def get(self, name):
+        """Returns the decoded sound (loads the bank on first use).
+                :param name: str - name of file without extension.
+                :return: pygame.Sound
+                """
+        if not self.sounds:
+            self.load()
+        return self.sounds[name]
+
+    def _channel(self, category):
+        """Picks a free channel of the category, or the oldest one when all are busy.
+                :param category: str - key of CHANNEL_POOLS.
+                :return: pygame.mixer.Channel
+                """
+        pool = self.pools[category]
+        for channel in pool:
+            if not channel.get_busy():
+                return channel
+        index = self._next_channel[category]
+        self._next_channel[category] = (index + 1) % len(pool)
+        return pool[index]
+
+    def play(self, name, category, volume=1.0, maxtime=0):
+        """Plays a sound on a channel of its category.
+                :param name: str - name of file without extension.
+                :param category: str - key of CHANNEL_POOLS.
+                :param volume: float - channel volume (the shared buffer volume is not touched).
+                :param maxtime: int - stops after the given milliseconds, 0 plays all of it.
+                :return: pygame.mixer.Channel or None when muted.
+                """
+        if self.muted:
+            return None
+        start = time.perf_counter()
+        sound = self.get(name)
+        channel = self._channel(category)
+        channel.set_volume(volume)
+        channel.play(sound, maxtime=maxtime)
+        play_time = time.perf_counter() - start
+        self.plays += 1
+        self.play_time += play_time
+        self.max_play_time = max(self.max_play_time, play_time)
+        return channel
+
+    def stats(self):
+        """Load and play latency counters.
+                :return: dict.
+                """
+        return {
+            'sounds': len(self.sounds),
+            'loads': self.loads,
+            'load_time': self.load_time,
+            'plays': self.plays,
+            'avg_play_time': self.play_time / self.plays if self.plays else 0.0,
+            'max_play_time': self.max_play_time,
+        }
+
+
 class Sounds:
-    """ This class handles all the sounds in the game.
+    """ This class handles all the sounds in the game. All instances share the same sound bank.
         """
     lose_sounds = ["l_sound1", "l_sound2", "l_sound3"]
     ast_impact_sounds = ['ast_impact', 'ast_impact2']
-    mixer.init()
+    bank = SoundBank()
 
-    @staticmethod
-    def load_sound(file):
-        """Loads the file as pygame.sound.
+    @classmethod
+    def load_sound(cls, file):
+        """Returns the file as pygame.sound from the sound bank.
                 :param file: str - name of file.
                 :return: pygame.sound type
                 """
-        path = f'assets/sounds/{file}.wav'
-        sound = Sound(path)
-        sound.set_volume(1)
-        return sound
+        return cls.bank.get(file)
 
     @staticmethod
     def load_music(file):
@@ -450,30 +693,30 @@ class Sounds:
                 :param file: str - name of file.
                 :return: pygame.mixer type
                 """
-        path = f'assets/sounds/{file}.mp3'
+        path = os.path.join(SOUNDS_DIR, f'{file}.mp3')
         return mixer.music.load(path)
 
     def win_event_sound(self):
         """Stops music and plays win sound.
                 """
+        if self.bank.muted:
+            return
         mixer.music.fadeout(600)
-        self.load_sound("win_sound").play(0)
+        self.bank.play("win_sound", 'event')
 
     def shoot_sound(self):
         """Plays shoot sound.
                 """
-        sound = self.load_sound("shoot")
-        sound.set_volume(0.5)
-        sound.play()
+        self.bank.play("shoot", 'shoot', volume=0.5)
 
     def lose_event_sound(self):
         """Stops music, plays explosion sound and then plays lose sound.
                 """
+        if self.bank.muted:
+            return
         mixer.music.fadeout(600)
-        sound_channel = mixer.Channel(1)
-        sound_channel.set_volume(1)
-        sound_channel.play(self.load_sound('spaceship_die'), maxtime=1200)
-        sound_channel.queue(self.load_sound(random.choice(self.lose_sounds)))
+        sound_channel = self.bank.play('spaceship_die', 'event', maxtime=1200)
+        sound_channel.queue(self.load_sound(random_streams.get('sounds').choice(self.lose_sounds)))
 
     def init_background_music(self, file):
         """Plays music in background.
@@ -485,21 +728,17 @@ class Sounds:
 
     def ast_impact(self):
         """Plays asteroid destruction sound.
-                :return: pygame.sound type
+                :return: pygame.mixer.Channel type
                 """
-        sounds = self.load_sound(random.choice(self.ast_impact_sounds))
-        return sounds.play()
+        return self.bank.play(random_streams.get('sounds').choice(self.ast_impact_sounds), 'impact')
 
     def shield_explosion(self):
         """Plays explosion sound of shield.
                 """
-        explosion_sound = self.load_sound('shield_explosion')
-        explosion_sound.set_volume(1)
-        explosion_sound.play()
+        self.bank.play('shield_explosion', 'event')
 
     def powerup_sound(self):
         """Plays power up sound..
-                :return: pygame.sound type
+                :return: pygame.mixer.Channel type
                 """
-        sound = self.load_sound('powerup')
-        return sound.play()
+        return self.bank.play('powerup', 'powerup')
@@ -0,0 +1,324 @@
+import math
+
+from pygame.math import Vector2
+
+from modules import Asteroid, Bullet
+
+try:
+    import numpy as np
+except ImportError:  # The numpy backend is optional - the game runs the per-object physics without it
+    np = None
+
+# Distance from the walls where an asteroid bounces, by size (same as Asteroid.asteroid_bounce)
+BOUNCE_MARGIN = {3: 50, 2: 35, 1: 25}
+
+
+class BodyArrays:
+    """ Struct of arrays for one kind of body - every attribute is a contiguous numpy array and each body is a row.
+    Removing a body moves the last row into its place, so the arrays never have holes.
+            :param capacity: int - initial amount of rows, doubles when full.
+            """
+    VECTOR_FIELDS = ('position', 'velocity', 'direction')
+    SCALAR_FIELDS = ('radius', 'size', 'menu', 'spin_cos', 'spin_sin')
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.handles = []  # Row -> handle object
+        self.position = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.direction = np.zeros((capacity, 2))  # Rotation of asteroids (ast_direction)
+        self.radius = np.zeros(capacity)
+        self.size = np.zeros(capacity, dtype=np.int64)
+        self.menu = np.zeros(capacity, dtype=bool)
+        self.spin_cos = np.ones(capacity)  # Rotation per tick, as cos and sin of the angle
+        self.spin_sin = np.zeros(capacity)
+
+    def _grow(self):
+        """Doubles the capacity of all the arrays.
+                """
+        for field in self.VECTOR_FIELDS + self.SCALAR_FIELDS:
+            old = getattr(self, field)
+            new = np.zeros((len(old) * 2,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, field, new)
+
+    def add(self, handle):
+        """Adds a row for a body.
+                :param handle: the object that owns the row.
+                :return: int - the row (slot) of the body.
+                """
+        if self.count == len(self.radius):
+            self._grow()
+        slot = self.count
+        self.count += 1
+        self.handles.append(handle)
+        self.spin_cos[slot] = 1.0
+        self.spin_sin[slot] = 0.0
+        return slot
+
+    def remove(self, handle):
+        """Removes the row of a body by moving the last row into it.
+                :param handle: the object that owns the row.
+                """
+        slot = handle.slot
+        last = self.count - 1
+        if slot != last:
+            for field in self.VECTOR_FIELDS + self.SCALAR_FIELDS:
+                array = getattr(self, field)
+                array[slot] = array[last]
+            moved = self.handles[last]
+            moved.slot = slot
+            self.handles[slot] = moved
+        self.handles.pop()
+        self.count = last
+        handle.slot = None
+
+
+def _vector_field(field):
+    """Helper method to create a Vector2 property backed by a row of an array.
+    The getter returns a copy, so changing it in place doesn't change the body - assign it back.
+            :param field: str - name of the array in BodyArrays.
+            :return: property
+            """
+    def getter(self):
+        array = getattr(self.arrays, field)
+        return Vector2(array.item(self.slot, 0), array.item(self.slot, 1))  # item() - python floats, no numpy scalars
+
+    def setter(self, value):
+        x, y = Vector2(value)
+        row = getattr(self.arrays, field)[self.slot]
+        row[0] = x
+        row[1] = y
+
+    return property(getter, setter)
+
+
+def _scalar_field(field, kind):
+    """Helper method to create a scalar property backed by a row of an array.
+            :param field: str - name of the array in BodyArrays.
+            :param kind: type - python type returned (float, int or bool).
+            :return: property
+            """
+    def getter(self):
+        return kind(getattr(self.arrays, field).item(self.slot))
+
+    def setter(self, value):
+        getattr(self.arrays, field)[self.slot] = value
+
+    return property(getter, setter)
+
+
+class Body:
+    """ Mixin that turns a GameObject into a thin handle of a row in a PhysicsWorld. The attributes used by the physics
+    live in the world arrays, the rest of the object stays the same.
+            """
+    world = None  # Set on the classes created by PhysicsWorld
+    kind = ''  # 'asteroids' or 'bullets'
+    __slots__ = ()  # The slots are in the handle classes - a mixin with slots can't be combined with GameObject
+
+    position = _vector_field('position')
+    velocity = _vector_field('velocity')
+    radius = _scalar_field('radius', float)
+
+    def __init__(self, *args, **kwargs):
+        self.arrays = getattr(self.world, self.kind)
+        self.slot = self.arrays.add(self)
+        super().__init__(*args, **kwargs)
+
+    def reset(self, *args, **kwargs):
+        """Starts a released body again (see ObjectPool) - in a new row, its old one was removed with it.
+                """
+        self.slot = self.arrays.add(self)
+        super().reset(*args, **kwargs)
+
+    def move(self):
+        """Moves only this body (the world moves all of them together in PhysicsWorld.move).
+                """
+        self.arrays.position[self.slot] += self.arrays.velocity[self.slot]
+
+
+class AsteroidBody(Body, Asteroid):
+    """ Asteroid handle - same API as Asteroid, with the movement, bounce and rotation stored in the world arrays.
+            """
+    kind = 'asteroids'
+    __slots__ = ('arrays', 'slot')
+
+    size = _scalar_field('size', int)
+    menu_state = _scalar_field('menu', bool)
+    ast_direction = _vector_field('direction')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._set_spin()
+
+    def reset(self, *args, **kwargs):
+        """Starts a released asteroid again (see ObjectPool).
+                """
+        super().reset(*args, **kwargs)
+        self._set_spin()
+
+    def _set_spin(self):
+        """Helper method to store the rotation per tick of the asteroid in the world arrays.
+                """
+        # Same angle conversion as Vector2.rotate_ip - normalized to [0, 360) and then to radians
+        angle = math.fmod(self.rotation_direction * self.rotation_speed, 360.)
+        if angle < 0:
+            angle += 360.
+        angle = angle * math.pi / 180.0
+        self.arrays.spin_cos[self.slot] = math.cos(angle)
+        self.arrays.spin_sin[self.slot] = math.sin(angle)
+
+    def asteroid_bounce(self, surface):
+        """Bounces only this asteroid (the world bounces all of them together in PhysicsWorld.bounce).
+                :param surface: screen.
+                """
+        self.world.bounce(surface, slots=[self.slot])
+
+    def bounce(self, surface):
+        """Nothing to do - PhysicsWorld.bounce bounces all the asteroid bodies together.
+                :param surface: screen.
+                """
+
+    def random_rotation(self):
+        """Rotates only this asteroid (the world rotates all of them together in PhysicsWorld.rotate).
+                """
+        self.world.rotate(slots=[self.slot])
+
+    def draw(self, surface):
+        """Draws the asteroid. The bounce is not done here - PhysicsWorld.bounce runs for all of them before drawing.
+                :param surface: screen.
+                :return: pygame.Rect - the area drawn.
+                """
+        return Asteroid.draw_sprite(self, surface)
+
+    def blit_command(self, surface):
+        """The blit of the rotated asteroid - without the bounce, like draw().
+                :param surface: screen.
+                :return: tuple - (rotated sprite, top-left position).
+                """
+        return Asteroid.sprite_command(self)
+
+
+class BulletBody(Body, Bullet):
+    """ Bullet handle - same API as Bullet, with the movement stored in the world arrays.
+            """
+    kind = 'bullets'
+    __slots__ = ('arrays', 'slot')
+
+
+class PhysicsWorld:
+    """ Numpy physics backend. Stores asteroids and bullets as struct of arrays and moves, bounces, rotates and
+    collides all of them with batch operations. The results are the same as the per-object methods of the modules.
+    Create bodies with world.Asteroid(...) / world.Bullet(...), which take the same arguments as Asteroid / Bullet.
+            :param capacity: int - initial amount of rows for each kind.
+            """
+
+    def __init__(self, capacity=64):
+        if np is None:
+            raise ImportError('The numpy physics backend needs numpy installed')
+        self.asteroids = BodyArrays(capacity)
+        self.bullets = BodyArrays(capacity)
+        # Handle classes bound to this world - Asteroid.split creates the same class as the asteroid it splits
+        self.Asteroid = type('Asteroid', (AsteroidBody,), {'world': self, '__slots__': ()})
+        self.Bullet = type('Bullet', (BulletBody,), {'world': self, '__slots__': ()})
+
+    def remove(self, body):
+        """Removes a body from the world. Call after it was removed from the game (and split if it's an asteroid).
+                :param body: AsteroidBody or BulletBody.
+                """
+        if body.slot is not None:
+            body.arrays.remove(body)
+
+    def move(self):
+        """Moves all the asteroids and bullets - the same as GameObject.move for each one.
+                """
+        for arrays in (self.asteroids, self.bullets):
+            n = arrays.count
+            arrays.position[:n] += arrays.velocity[:n]
+
+    def rotate(self, slots=None):
+        """Rotates asteroids - the same as Asteroid.random_rotation for each one.
+                :param slots: list of rows or None for all.
+                """
+        arrays = self.asteroids
+        rows = slice(0, arrays.count) if slots is None else slots
+        x = arrays.direction[rows, 0].copy()  # Copies - both are needed after the first column is written
+        y = arrays.direction[rows, 1].copy()
+        cos = arrays.spin_cos[rows]
+        sin = arrays.spin_sin[rows]
+        arrays.direction[rows, 0] = cos * x - sin * y
+        arrays.direction[rows, 1] = sin * x + cos * y
+
+    def bounce(self, surface, slots=None):
+        """Bounces asteroids from the walls - the same as Asteroid.asteroid_bounce for each one, including the half
+        screen of the menu for asteroids in menu state.
+                :param surface: screen.
+                :param slots: list of rows or None for all.
+                """
+        arrays = self.asteroids
+        rows = slice(0, arrays.count) if slots is None else slots
+        width, height = surface.get_size()
+        size = arrays.size[rows]
+        margin = np.where(size == 3, BOUNCE_MARGIN[3], np.where(size == 2, BOUNCE_MARGIN[2], BOUNCE_MARGIN[1]))
+        w = width - margin
+        h = height - margin
+        px = arrays.position[rows, 0]
+        py = arrays.position[rows, 1]
+        menu = arrays.menu[rows]
+
+        # Same order of checks as the per-object method - each one sees the position changed by the one before
+        right = px > w
+        px = np.where(right, w - 5, px)
+        left = px < margin
+        px = np.where(left, margin + 5, px)
+        top = py < margin
+        py = np.where(top, margin + 5, py)
+        bottom = ~menu & (py > h)
+        py = np.where(bottom, h - 5, py)
+        menu_bottom = menu & (py > (h + 50) / 2)
+
+        # The velocity is set from the speed before the bounce, and the last check that hits decides it
+        flip_y = top | bottom | menu_bottom
+        flip_x = (right | left) & ~flip_y
+        vx = arrays.velocity[rows, 0]
+        vy = arrays.velocity[rows, 1]
+        arrays.position[rows, 0] = px
+        arrays.position[rows, 1] = py
+        arrays.velocity[rows, 0] = np.where(flip_x, -vx, vx)
+        arrays.velocity[rows, 1] = np.where(flip_y, -vy, vy)
+
+    def collisions(self, asteroids, bullets):
+        """Circle collision of every asteroid with every bullet - the same as GameObject.collides_with for each pair.
+                :param asteroids: list of asteroid bodies.
+                :param bullets: list of bullet bodies.
+                :return: numpy bool matrix - [i, j] is True if asteroids[i] collides with bullets[j].
+                """
+        a = self.asteroids
+        b = self.bullets
+        a_rows = [asteroid.slot for asteroid in asteroids]
+        b_rows = [bullet.slot for bullet in bullets]
+        delta = a.position[a_rows][:, None, :] - b.position[b_rows][None, :, :]
+        distance = delta[..., 0] * delta[..., 0] + delta[..., 1] * delta[..., 1]
+        radius_sum = a.radius[a_rows][:, None] + b.radius[b_rows][None, :]
+        return distance < radius_sum * radius_sum
+
+    def circle_hits(self, asteroids, position, radius):
+        """Circle collision of every asteroid with one circle (the spaceship) - the same as GameObject.collides_with
+        for each one.
+                :param asteroids: list of asteroid bodies.
+                :param position: vector - centre of the circle.
+                :param radius: float.
+                :return: numpy bool array - [i] is True if asteroids[i] collides with the circle.
+                """
+        a = self.asteroids
+        rows = [asteroid.slot for asteroid in asteroids]
+        dx = a.position[rows, 0] - position[0]
+        dy = a.position[rows, 1] - position[1]
+        radius_sum = a.radius[rows] + radius
+        return dx * dx + dy * dy < radius_sum * radius_sum
+
+    def set_menu_state(self, state):
+        """Changes the menu state of all the asteroids (see Asteroid.change_menu_state).
+                :param state: bool.
+                """
+        self.asteroids.menu[:self.asteroids.count] = state
@@ -0,0 +1,132 @@
+class ObjectPool:
+    """ Reuses released objects of one class instead of creating new ones. acquire() runs reset() on a released
+    object - the same start as __init__, but in the vectors the object already has - so a reused object starts exactly
+    like a new one without allocating it again. The pool only grows - it keeps as many objects as were in use at the
+    same time.
+            :param cls: class of the objects with a reset() method (Bullet, Asteroid, Explosion or a physics handle).
+            """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args, **kwargs):
+        """Returns an object initiated with the arguments - a released one if there is, else a new one.
+                :param args: arguments of the class.
+                :return: object of the class.
+                """
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            obj = self.cls(*args, **kwargs)
+            self.created += 1
+        obj.pool = self
+        self.in_use += 1
+        if self.in_use > self.peak_in_use:
+            self.peak_in_use = self.in_use
+        return obj
+
+    def release(self, obj):
+        """Gives an object back to the pool. It must not be used after this.
+                :param obj: object acquired from this pool.
+                """
+        self.free.append(obj)
+        self.in_use -= 1
+
+    def stats(self):
+        """Occupancy of the pool.
+                :return: dict
+                """
+        return {
+            'in_use': self.in_use,
+            'free': len(self.free),
+            'peak_in_use': self.peak_in_use,
+            'created': self.created,
+            'reused': self.reused,
+        }
+
+
+def release(obj):
+    """Helper method to give an object back to its pool - objects that were not acquired from a pool are left alone.
+            :param obj: game object.
+            """
+    pool = getattr(obj, 'pool', None)
+    if pool is not None:
+        obj.pool = None  # Released once, even if removed twice
+        pool.release(obj)
+
+
+class EntityList(list):
+    """ List of game objects with O(1) remove - the last object is moved into the place of the removed one, so the
+    order is not kept. Everything else works like a list.
+            :param items: iterable of objects.
+            """
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self._index = {}  # id(object) -> position
+        self._reindex()
+
+    def _reindex(self):
+        """Rebuilds the positions after a change not done by append/remove.
+                """
+        self._index = {id(item): i for i, item in enumerate(self)}
+
+    def append(self, item):
+        self._index[id(item)] = len(self)
+        super().append(item)
+
+    def remove(self, item):
+        index = self._index.pop(id(item), None)
+        if index is None:
+            raise ValueError('EntityList.remove(x): x not in list')
+        last = super().pop()
+        if last is not item:
+            super().__setitem__(index, last)
+            self._index[id(last)] = index
+
+    def clear(self):
+        super().clear()
+        self._index.clear()
+
+    def __contains__(self, item):
+        return id(item) in self._index  # O(1) - the objects are compared by identity
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._reindex()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._reindex()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._reindex()
+        return item
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._reindex()
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._reindex()
+
+    def reverse(self):
+        super().reverse()
+        self._reindex()
@@ -0,0 +1,207 @@
+import gc
+import json
+import os
+import time
+
+import pygame
+
+from utils import get_font
+
+HISTORY = 600  # Samples kept per phase - 10 seconds at 60 fps
+OVERLAY_REFRESH = 30  # Frames between updates of the overlay text
+EXPORT_INTERVAL = 300  # Frames between exports to the file
+
+
+class RollingHistogram:
+    """ Rolling window of the last samples of one phase, in milliseconds. Adding is O(1), the percentiles are computed
+    only when asked (overlay refresh and export).
+            :param size: int - amount of samples kept.
+            """
+
+    def __init__(self, size=HISTORY):
+        self.size = size
+        self.samples = [0.0] * size
+        self.index = 0
+        self.count = 0
+
+    def add(self, value):
+        """Adds a sample, replacing the oldest one when full.
+                :param value: float - milliseconds.
+                """
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count += 1
+
+    def summary(self):
+        """Percentiles of the samples in the window.
+                :return: dict - samples, p50, p95, p99 and max (milliseconds).
+                """
+        n = min(self.count, self.size)
+        if n == 0:
+            return {'samples': 0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        values = sorted(self.samples[:n])
+        return {
+            'samples': n,
+            'p50': values[int(0.50 * (n - 1))],
+            'p95': values[int(0.95 * (n - 1))],
+            'p99': values[int(0.99 * (n - 1))],
+            'max': values[-1],
+        }
+
+
+class FrameProfiler:
+    """ Times the phases of every frame - input, logic, draw, overlay, clock.tick sleep and display.flip (menu phases
+    are prefixed with 'menu_'). Every lap() closes the phase that started at the previous lap. The 'startup' phase has
+    one sample - the time from the creation of the profiler (with the game) to the end of the first frame.
+    Can draw the results on screen (toggle with F3) and export them every few seconds to a .csv or .json file.
+            :param export_path: str or None - file for the periodic export, the format is by the extension.
+            """
+
+    def __init__(self, export_path=None):
+        self.histograms = {}
+        self.overlay = False
+        self.frame = 0
+        self.export_path = export_path
+        self._file = None
+        self._last = time.perf_counter()
+        self._frame_start = self._last
+        self.created = self._last  # Start of the game, for the time to the first frame
+        self.time_to_first_frame = None  # Milliseconds
+        self.frame_time = 0.0  # Milliseconds of the last frame
+        self._font = None
+        self._overlay_surfaces = []  # Rendered lines of the overlay, reused between refreshes
+
+    def begin_frame(self):
+        """Starts timing a frame.
+                """
+        self._last = self._frame_start = time.perf_counter()
+
+    def lap(self, phase):
+        """Ends a phase - the time since the last lap (or the frame start) is added to its histogram.
+                :param phase: str - name of the phase.
+                :return: float - milliseconds of the phase.
+                """
+        now = time.perf_counter()
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            histogram = self.histograms[phase] = RollingHistogram()
+        elapsed = (now - self._last) * 1000
+        histogram.add(elapsed)
+        self._last = now
+        return elapsed
+
+    def end_frame(self):
+        """Ends a frame - adds the total frame time and exports when it's time to.
+                """
+        self._last = self._frame_start
+        self.frame_time = self.lap('frame')
+        if self.frame == 0:  # Startup - from the creation of the game to the end of its first frame
+            self._last = self.created
+            self.lap('startup')
+            self.time_to_first_frame = self.histograms['startup'].samples[0]
+        self.frame += 1
+        if self.export_path and self.frame % EXPORT_INTERVAL == 0:
+            self.export()
+
+    def summary(self):
+        """Percentiles of all the phases.
+                :return: dict - phase -> summary.
+                """
+        return {phase: histogram.summary() for phase, histogram in self.histograms.items()}
+
+    def draw_overlay(self, surface, background=None):
+        """Draws the timings at the top right corner. The text is rendered again only every few frames, in between
+        the same surfaces are blitted, so the overlay barely changes what it measures.
+                :param surface: screen.
+                :param background: color or None - fills the area under the text, None leaves it transparent.
+                :return: pygame.Rect - the area drawn.
+                """
+        if self.frame % OVERLAY_REFRESH == 0 or not self._overlay_surfaces:
+            if self._font is None:
+                self._font = get_font(20)
+            lines = [f'{"phase":<12} {"p50":>6} {"p95":>6} {"p99":>6} {"max":>6} ms']
+            for phase, stats in sorted(self.summary().items()):
+                lines.append(f'{phase:<12} {stats["p50"]:6.2f} {stats["p95"]:6.2f} {stats["p99"]:6.2f} '
+                             f'{stats["max"]:6.2f}')
+            self._overlay_surfaces = [self._font.render(line, True, 'palegreen') for line in lines]
+
+        width = max(line.get_width() for line in self._overlay_surfaces)
+        x = surface.get_width() - width - 10
+        y = 10
+        if background is not None:
+            surface.fill(background, (x, y, width, sum(line.get_height() for line in self._overlay_surfaces)))
+        rect = pygame.Rect(x, y, 0, 0)
+        for line in self._overlay_surfaces:
+            rect.union_ip(surface.blit(line, (x, y)))
+            y += line.get_height()
+        return rect
+
+    def export(self):
+        """Appends the current percentiles of all the phases to the export file.
+                """
+        if self._file is None:
+            new_file = not os.path.exists(self.export_path) or os.path.getsize(self.export_path) == 0
+            self._file = open(self.export_path, 'a')
+            if new_file and self.export_path.endswith('.csv'):
+                self._file.write('frame,phase,samples,p50_ms,p95_ms,p99_ms,max_ms\n')
+        summary = self.summary()
+        if self.export_path.endswith('.csv'):
+            for phase, stats in sorted(summary.items()):
+                self._file.write(f'{self.frame},{phase},{stats["samples"]},{stats["p50"]:.4f},{stats["p95"]:.4f},'
+                                 f'{stats["p99"]:.4f},{stats["max"]:.4f}\n')
+        else:
+            self._file.write(json.dumps({'frame': self.frame, 'phases': summary}) + '\n')
+        self._file.flush()
+
+    def close(self):
+        """Closes the export file.
+                """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class GCMonitor:
+    """ Times the pauses of the garbage collector with gc.callbacks - how often it runs and how long the game stops.
+            """
+
+    def __init__(self):
+        self.pauses = RollingHistogram()
+        self.collections = [0, 0, 0]  # By generation
+        self.total_ms = 0.0
+        self._start = None
+
+    def start(self):
+        """Starts timing the collections.
+                """
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+
+    def stop(self):
+        """Stops timing the collections.
+                """
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase, info):
+        """Called by gc before and after every collection.
+                :param phase: str - 'start' or 'stop'.
+                :param info: dict - generation, collected, uncollectable.
+                """
+        if phase == 'start':
+            self._start = time.perf_counter()
+        elif self._start is not None:
+            pause = (time.perf_counter() - self._start) * 1000
+            self._start = None
+            self.pauses.add(pause)
+            self.collections[info['generation']] += 1
+            self.total_ms += pause
+
+    def stats(self):
+        """Collections by generation and percentiles of the pauses (milliseconds).
+                :return: dict
+                """
+        return {'collections': list(self.collections), 'total_ms': self.total_ms, **self.pauses.summary()}
+
+
+gc_monitor = GCMonitor()
@@ -0,0 +1,170 @@
+import pygame
+
+DIRTY_AREA_THRESHOLD = 0.5  # Part of the screen - above it a full flip is cheaper than updating the rects
+FAST_BLITS = hasattr(pygame.Surface, 'fblits')  # pygame-ce - many blits without making their rects
+
+
+def merge_rects(rects):
+    """Joins overlapping rects when their union is not bigger than both of them - an object moves only a few pixels
+    every frame, so its old and new rects become one.
+            :param rects: list of pygame.Rect.
+            :return: list of pygame.Rect
+            """
+    merged = []
+    for rect in rects:
+        for i, other in enumerate(merged):
+            if rect.colliderect(other):
+                union = other.union(rect)
+                if union.width * union.height <= other.width * other.height + rect.width * rect.height:
+                    merged[i] = union
+                    break
+        else:
+            merged.append(rect)
+    return merged
+
+
+class DirtyRectRenderer:
+    """ Draws only what changed. Every frame the background is restored under the rects of the last frame, the
+    objects are drawn and only the rects of the last and the current frame are sent to the display.
+    Static things (menu text) are drawn every frame anyway, so only moving objects need to be added.
+    When the dirty area is bigger than the threshold, or after invalidate(), the whole screen is flipped.
+            :param threshold: float - part of the screen area above which the whole screen is flipped.
+            """
+
+    def __init__(self, threshold=DIRTY_AREA_THRESHOLD):
+        self.threshold = threshold
+        self.previous_rects = []
+        self.current_rects = []
+        self.full_redraw = True  # The first frame draws everything
+        self.full_frame = False  # The current frame was restored in full
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        """The next frame redraws and flips the whole screen (e.g. menu changes, game start). Called in the middle of
+        a frame, it doesn't change that frame.
+                """
+        self.full_redraw = True
+
+    def restore(self, screen, background):
+        """Clears the screen from the last frame - only under its rects, or everything after invalidate().
+                :param screen: the screen surface.
+                :param background: surface of the same size as the screen.
+                """
+        self.full_frame = self.full_redraw
+        self.full_redraw = False
+        if self.full_frame:
+            screen.blit(background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                screen.blit(background, rect, rect)  # Same area of the background over the old image
+
+    def add(self, rect):
+        """Adds the rect of something drawn this frame.
+                :param rect: pygame.Rect or None.
+                """
+        if rect:
+            self.current_rects.append(rect)
+
+    def present(self, screen):
+        """Sends the frame to the display - the dirty rects, or a full flip.
+                :param screen: the screen surface.
+                """
+        screen_rect = screen.get_rect()
+        rects = merge_rects([rect.clip(screen_rect) for rect in self.previous_rects + self.current_rects])
+        dirty_area = sum(rect.width * rect.height for rect in rects)
+        if self.full_frame or dirty_area > self.threshold * screen_rect.width * screen_rect.height:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            pygame.display.update(rects)
+            self.partial_frames += 1
+        self.previous_rects = self.current_rects
+        self.current_rects = []
+        self.full_frame = False
+
+    def stats(self):
+        """Counts of full and partial frames.
+                :return: dict
+                """
+        return {'full_frames': self.full_frames, 'partial_frames': self.partial_frames}
+
+
+class BlitBatch:
+    """ Command list of a frame - the objects add what they would blit, (surface, position), and every layer of
+    objects is drawn with one Surface.blits call instead of a blit call per object. Surface.fblits is used instead when
+    pygame has it and the rects are not needed.
+            """
+
+    def __init__(self):
+        self.commands = []  # (surface, position) - objects append to it directly
+        self.submits = 0
+        self.blits = 0
+
+    def submit(self, surface, rects=False):
+        """Blits the commands added since the last submit, in order, and empties the list.
+                :param surface: the screen surface.
+                :param rects: bool - returns the areas drawn (for dirty rects).
+                :return: list of pygame.Rect - empty when the rects are not asked for.
+                """
+        commands = self.commands
+        if not commands:
+            return []
+        self.submits += 1
+        self.blits += len(commands)
+        drawn = []
+        if rects:
+            drawn = surface.blits(commands)
+        elif FAST_BLITS:
+            surface.fblits(commands)
+        else:
+            surface.blits(commands, doreturn=False)
+        commands.clear()
+        return drawn
+
+    def stats(self):
+        """Counts of the batches.
+                :return: dict
+                """
+        return {'submits': self.submits, 'blits': self.blits,
+                'blits_per_submit': self.blits / self.submits if self.submits else 0.0}
+
+
+class StaticLayer:
+    """ A part of the screen that changes only with the state of the game (menu text, score table, end screen).
+    It's drawn once on a transparent surface, cut to the parts that were drawn, and then only blitted every frame -
+    until its state key or the screen size changes.
+            :param draw: function(surface) - draws the layer on a transparent surface of the screen size. Can return
+                         the rects it drew (e.g. text lines) so only those are kept, else everything drawn is kept.
+            """
+
+    def __init__(self, draw):
+        self.draw = draw
+        self.key = None
+        self.pieces = None  # (surface, position) of every drawn part
+        self.renders = 0
+
+    def invalidate(self):
+        """The layer is drawn again on the next blit.
+                """
+        self.pieces = None
+
+    def blit(self, screen, key=None):
+        """Blits the layer, drawing it again first if the state changed.
+                :param screen: the screen surface.
+                :param key: hashable - state the layer depends on (mode, spaceship, scores...).
+                :return: list of pygame.Rect - the areas drawn.
+                """
+        key = (screen.get_size(), key)
+        if self.pieces is None or key != self.key:
+            canvas = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+            rects = self.draw(canvas)
+            if not isinstance(rects, (list, tuple)):
+                rects = [canvas.get_bounding_rect()]
+            canvas_rect = canvas.get_rect()
+            # Separate pieces instead of one rect around all of them - no blitting of the empty space in between
+            rects = merge_rects([pygame.Rect(rect).clip(canvas_rect) for rect in rects if rect])
+            self.pieces = [(canvas.subsurface(rect).convert_alpha(), rect) for rect in rects]
+            self.key = key
+            self.renders += 1
+        return screen.blits(self.pieces)
@@ -0,0 +1,126 @@
+from pools import EntityList
+
+
+class Scene:
+    """ Registry of the game objects - one list per kind, kept for the whole game instead of joining them into a new
+    list every frame. Objects join through the add hooks (also the callbacks of Spaceship and Asteroid) and leave
+    through the remove hooks, both O(1). The menu and the game move and draw the same lists.
+            :param batched_bodies: bool - the asteroids and bullets are moved by the physics backend, not one by one.
+            """
+
+    def __init__(self, batched_bodies=False):
+        self.asteroids = EntityList()
+        self.bullets = EntityList()
+        self.explosions = EntityList()
+        self.powerups = EntityList()
+        self.ships = EntityList()  # The spaceship, when there is one - a list so it's drawn like the others
+        self.spaceship = None
+        self.menu_state = True  # The asteroids bounce on the top half of the screen in the menu
+        # Draw order - the spaceship on top. The layers are drawn with one blit call each, the spaceship by itself
+        self.layers = (self.asteroids, self.bullets, self.explosions, self.powerups)
+        self.draw_groups = self.layers + (self.ships,)
+        if batched_bodies:
+            self.update_groups = (self.explosions, self.powerups, self.ships)
+        else:
+            self.update_groups = self.draw_groups
+        # Counters
+        self.added = 0
+        self.removed = 0
+        self.asteroid_removals = 0  # The level of detail sorts its asteroids again when it changes
+
+    def add_asteroid(self, asteroid):
+        """Adds an asteroid - a new one or a piece of a split. It takes the menu state of the scene.
+                :param asteroid: Asteroid
+                """
+        asteroid.menu_state = self.menu_state
+        self.asteroids.append(asteroid)
+        self.added += 1
+
+    def remove_asteroid(self, asteroid):
+        """Removes an asteroid.
+                :param asteroid: Asteroid
+                """
+        self.asteroids.remove(asteroid)
+        self.removed += 1
+        self.asteroid_removals += 1
+
+    def add_bullet(self, bullet):
+        """Adds a bullet shot by the spaceship.
+                :param bullet: Bullet
+                """
+        self.bullets.append(bullet)
+        self.added += 1
+
+    def remove_bullet(self, bullet):
+        """Removes a bullet.
+                :param bullet: Bullet
+                """
+        self.bullets.remove(bullet)
+        self.removed += 1
+
+    def add_explosion(self, explosion):
+        """Adds the explosion of the spaceship.
+                :param explosion: Explosion
+                """
+        self.explosions.append(explosion)
+        self.added += 1
+
+    def add_powerup(self, powerup):
+        """Adds a powerup.
+                :param powerup: BulletPowerUp or SlowMotionPowerUp
+                """
+        self.powerups.append(powerup)
+        self.added += 1
+
+    def remove_powerup(self, powerup):
+        """Removes a powerup (taken).
+                :param powerup: BulletPowerUp or SlowMotionPowerUp
+                """
+        self.powerups.remove(powerup)
+        self.removed += 1
+
+    def clear_powerups(self):
+        """Removes all the powerups (end of the game).
+                """
+        self.removed += len(self.powerups)
+        self.powerups.clear()
+
+    def set_spaceship(self, spaceship):
+        """Replaces the spaceship.
+                :param spaceship: Spaceship or None - None removes it (the spaceship died).
+                """
+        self.ships.clear()
+        if spaceship is not None:
+            self.ships.append(spaceship)
+        self.spaceship = spaceship
+
+    def set_menu_state(self, state):
+        """Changes the menu state of the scene and of all its asteroids (see Asteroid.change_menu_state). Runs only
+        when switching between the menu and the game.
+                :param state: bool.
+                """
+        self.menu_state = state
+        for asteroid in self.asteroids:
+            asteroid.change_menu_state(state)
+
+    def clear(self):
+        """Removes all the objects. Giving them back to their pools is left to the caller.
+                """
+        self.removed += sum(len(group) for group in self.draw_groups)
+        self.asteroid_removals += len(self.asteroids)
+        for group in self.draw_groups:
+            group.clear()
+        self.spaceship = None
+
+    def stats(self):
+        """Counts of the objects in the scene.
+                :return: dict
+                """
+        return {
+            'asteroids': len(self.asteroids),
+            'bullets': len(self.bullets),
+            'explosions': len(self.explosions),
+            'powerups': len(self.powerups),
+            'added': self.added,
+            'removed': self.removed,
+        }
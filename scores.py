@@ -0,0 +1,234 @@
+import atexit
+import heapq
+import os
+import queue
+import struct
+import threading
+import time
+
+from archive import ROOT
+
+SCORES_PATH = os.path.join(ROOT, 'scores.log')
+MAGIC = b'SRSL'
+VERSION = 2
+HEADER = struct.Struct('<4sIQ')  # Magic, version, rounds dropped by the compactions
+# Score (a float - easy mode counts half points), milliseconds played, asteroids destroyed, unix time of the round end
+RECORD = struct.Struct('<dIId')
+TOP_SCORES = 100  # Rounds kept in the index and by the compaction
+COMPACT_RECORDS = 10000  # Rounds in the log before it's compacted to the top ones - also bounds the load time
+
+
+def _score(value):
+    """Helper function to give back a score read from the log as the game had it - whole scores as int.
+            :param value: float
+            :return: int or float
+            """
+    return int(value) if value.is_integer() else value
+
+
+class ScoreStore:
+    """ High scores kept between launches. Every round is appended to a log on disk as a fixed size record, and the
+    best rounds are kept in a bounded min-heap - adding a round is O(log TOP_SCORES) and the top scores are ready
+    without sorting all the rounds.
+    The log is written by a background thread, so the frame that ends a round never waits for the disk. When the log
+    holds more than compact_records rounds (batch simulations) the thread rewrites it with only the top rounds.
+    A log that can't be read or written only loses the persistence - the scores of this run are still kept.
+            :param path: str or None - file of the log, None keeps the scores in memory only.
+            :param keep: int - rounds kept in the index and after a compaction.
+            :param compact_records: int - rounds in the log that start a compaction.
+            """
+
+    def __init__(self, path=SCORES_PATH, keep=TOP_SCORES, compact_records=COMPACT_RECORDS):
+        self.path = path
+        self.keep = keep
+        self.compact_records = compact_records
+        self._heap = None  # Min-heap of (score, -round) - the worst of the kept rounds on top. Loaded on first use
+        self._top = None  # Kept scores from the best, made again after a change
+        self._rounds = 0  # Rounds in the index, for the order of equal scores
+        self._past_rounds = 0  # Rounds dropped from the log before this launch
+        self._queue = queue.Queue()  # Packed records waiting for the writer
+        self._writer = None
+        # Owned by the writer thread - the log as it is on disk
+        self._disk_heap = []  # Min-heap of (score, -round, record) of the rounds in the log
+        self._disk_records = 0
+        self._dropped = 0  # Rounds removed by the compactions, for the total count
+        self._valid = False  # The log has a good header - appending is safe
+        # Counters
+        self.added = 0
+        self.written = 0
+        self.compactions = 0
+        self.write_errors = 0
+        self.write_time = 0.0
+
+    def _push(self, heap, entry):
+        """Helper method to add an entry to a bounded min-heap - the worst entry leaves when it's full.
+                :param heap: list
+                :param entry: tuple - compared by (score, -round).
+                :return: bool - the entry was kept.
+                """
+        if len(heap) < self.keep:
+            heapq.heappush(heap, entry)
+            return True
+        if entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+            return True
+        return False
+
+    def _load(self):
+        """Helper method to read the log saved by the last launches into the index - once, on first use.
+                :return: None
+                """
+        if self._heap is not None:
+            return
+        self._heap = []
+        if self.path is None:
+            return
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return
+        if len(data) < HEADER.size:
+            return
+        magic, version, dropped = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            return  # Not a log of this version - the writer starts a new one
+        end = len(data) - (len(data) - HEADER.size) % RECORD.size  # A record cut by a crash is left out
+        for offset in range(HEADER.size, end, RECORD.size):
+            score = _score(RECORD.unpack_from(data, offset)[0])
+            self._rounds += 1
+            self._push(self._heap, (score, -self._rounds))
+            self._push(self._disk_heap, (score, -self._rounds, data[offset:offset + RECORD.size]))
+        self._disk_records = self._rounds
+        self._dropped = self._past_rounds = dropped
+        self._valid = end == len(data)  # Else the writer compacts it first, to drop the cut record
+
+    def add(self, score, time_played=0, asteroids_destroyed=0):
+        """Adds the result of a round. The index changes right away, the log is written in the background.
+                :param score: int or float - easy mode scores have halves.
+                :param time_played: int - milliseconds.
+                :param asteroids_destroyed: int
+                :return: None
+                """
+        self._load()
+        self._rounds += 1
+        if self._push(self._heap, (score, -self._rounds)):
+            self._top = None
+        self.added += 1
+        if self.path is None:
+            return
+        self._queue.put(RECORD.pack(score, time_played, asteroids_destroyed, time.time()))
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name='scores', daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    def top(self, amount=3):
+        """The best scores.
+                :param amount: int - up to keep.
+                :return: list of int or float - from the best, shorter when there were fewer rounds.
+                """
+        self._load()
+        if self._top is None:
+            self._top = [score for score, _ in sorted(self._heap, reverse=True)]
+        return self._top[:amount]
+
+    def _write_loop(self):
+        """Writer thread - appends the records of the queue, all the waiting ones in one write, and compacts the log
+        when it's too long. Stops at None (close).
+                :return: None
+                """
+        while True:
+            records = [self._queue.get()]
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = records[-1] is None
+            records = [record for record in records if record is not None]
+            if records:
+                self._append(records)
+            for _ in range(len(records) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _append(self, records):
+        """Helper method to append records to the log (writer thread).
+                :param records: list of bytes - packed records.
+                :return: None
+                """
+        start = time.perf_counter()
+        for record in records:
+            self._disk_records += 1
+            self._push(self._disk_heap, (_score(RECORD.unpack(record)[0]), -self._disk_records, record))
+        try:
+            if not self._valid or self._disk_records > self.compact_records:
+                self._compact()
+            else:
+                with open(self.path, 'ab') as file:
+                    file.write(b''.join(records))
+            self.written += len(records)
+        except OSError:
+            self.write_errors += 1
+        self.write_time += time.perf_counter() - start
+
+    def _compact(self):
+        """Helper method to rewrite the log with only the top rounds, from the best (writer thread). The new log
+        replaces the old one in one step, so a crash leaves one of them whole.
+                :return: None
+                """
+        kept = sorted(self._disk_heap, reverse=True)
+        dropped = self._dropped + self._disk_records - len(kept)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, dropped))
+            file.write(b''.join(record for _, _, record in kept))
+        os.replace(temp_path, self.path)
+        self._dropped = dropped
+        # The rounds are numbered again in the order of the new log
+        self._disk_heap = [(score, -i, record) for i, (score, _, record) in enumerate(kept, 1)]
+        heapq.heapify(self._disk_heap)
+        self._disk_records = len(kept)
+        self._valid = True
+        self.compactions += 1
+
+    def flush(self):
+        """Waits until the rounds added so far are on disk.
+                :return: None
+                """
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        """Writes what's left and stops the writer thread. Runs at exit - a later add starts a new writer.
+                :return: None
+                """
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+            atexit.unregister(self.close)
+
+    def stats(self):
+        """Counts of the store.
+                :return: dict
+                """
+        self._load()
+        return {
+            'rounds': self._past_rounds + self._rounds,
+            'kept': len(self._heap),
+            'added': self.added,
+            'written': self.written,
+            'log_records': self._disk_records,
+            'compactions': self.compactions,
+            'write_errors': self.write_errors,
+            'write_ms': self.write_time * 1000,
+        }
+
+
+score_store = ScoreStore()
@@ -0,0 +1,137 @@
+import heapq
+import itertools
+import random
+
+# Subsystems with their own random stream - using one doesn't change the numbers of the others
+STREAMS = ('spawn', 'asteroids', 'powerups', 'sounds', 'visual')
+
+
+class RandomStreams:
+    """ Seeded random number streams, one per subsystem, all derived from one seed. A game played with the same seed
+    and the same input gives the same asteroids, velocities and power-ups every time.
+            :param seed: int or None - None picks a random seed.
+            """
+
+    def __init__(self, seed=None):
+        self.seed_value = None
+        self.streams = {}
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Restarts all the streams from a seed.
+                :param seed: int or None - None picks a random seed.
+                :return: int - the seed used.
+                """
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.seed_value = seed
+        self.streams = {name: random.Random(f'{seed}:{name}') for name in STREAMS}
+        return seed
+
+    def get(self, name):
+        """Returns the stream of a subsystem.
+                :param name: str - one of STREAMS.
+                :return: random.Random
+                """
+        return self.streams[name]
+
+
+class Timer:
+    """ A callback scheduled on the game clock (see GameClock.schedule).
+            :param due: float - game time in milliseconds when it fires.
+            :param callback: function.
+            :param args: arguments of the callback.
+            """
+    __slots__ = ('due', 'callback', 'args', 'cancelled')
+
+    def __init__(self, due, callback, args):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class GameClock:
+    """ Simulated clock of the game. Advances by a fixed step every tick instead of following the wall clock, so the
+    timers (power-ups, invulnerability) behave the same when the game is slow, headless or replayed.
+    Timed effects schedule a callback instead of comparing timestamps every frame - the timers are kept in a heap by
+    due time, and a tick only looks at the first one unless it's due. The clock (and with it the timers) can be paused
+    and run faster or slower with time_scale.
+            :param fps: int - ticks per second of game time.
+            """
+
+    def __init__(self, fps=60):
+        self.step_ms = 1000 / fps
+        self.time = 0.0
+        self.frame = 0
+        self.time_scale = 1.0  # Game milliseconds per real tick milliseconds - 2.0 runs the game time twice as fast
+        self.paused = False
+        self._timers = []  # Heap of (due, sequence, Timer) - the sequence keeps timers of the same time in order
+        self._sequence = itertools.count()
+        self.fired = 0
+
+    def tick(self):
+        """Advances the clock by one tick and runs the callbacks of the timers that are due, in due time order.
+                """
+        self.frame += 1
+        if self.paused:
+            return
+        self.time += self.step_ms * self.time_scale
+        timers = self._timers
+        while timers and timers[0][0] <= self.time:
+            timer = heapq.heappop(timers)[2]
+            if not timer.cancelled:
+                timer.cancelled = True  # Fired - cancelling it later does nothing
+                self.fired += 1
+                timer.callback(*timer.args)
+
+    def schedule(self, delay, callback, *args):
+        """Runs a callback after some game time.
+                :param delay: float - milliseconds of game time.
+                :param callback: function.
+                :param args: arguments of the callback.
+                :return: Timer - to cancel it.
+                """
+        timer = Timer(self.time + delay, callback, args)
+        heapq.heappush(self._timers, (timer.due, next(self._sequence), timer))
+        return timer
+
+    @staticmethod
+    def cancel(timer):
+        """Cancels a timer - it stays in the heap until its time and is skipped then.
+                :param timer: Timer or None.
+                """
+        if timer is not None:
+            timer.cancelled = True
+
+    def pause(self):
+        """Stops the game time and the timers (ticks are still counted).
+                """
+        self.paused = True
+
+    def resume(self):
+        """Runs the game time and the timers again.
+                """
+        self.paused = False
+
+    def pending(self):
+        """Amount of timers waiting to fire.
+                :return: int
+                """
+        return sum(1 for _, _, timer in self._timers if not timer.cancelled)
+
+    def reset(self):
+        """Starts the clock again from 0 (new game), without any timers.
+                """
+        self.time = 0.0
+        self.frame = 0
+        self._timers.clear()
+
+    def get_ticks(self):
+        """Game time in milliseconds, like pygame.time.get_ticks().
+                :return: int
+                """
+        return int(self.time)
+
+
+random_streams = RandomStreams()
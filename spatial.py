@@ -0,0 +1,160 @@
+import random
+import time
+from collections import defaultdict
+from itertools import compress
+
+from pygame.math import Vector2
+
+# Cell size of the collision grid - a bit bigger than the biggest asteroid radius, so most objects cover 1-4 cells
+CELL_SIZE = 128
+PLACEMENT_SPACING = 40  # Pixels between the candidate positions of PlacementSampler
+PLACEMENT_CELL_SIZE = 64  # Cell size of the index of the candidates - small cells, fewer distance checks
+
+
+class SpatialHash:
+    """ Uniform grid broadphase for collisions. Objects are hashed into every cell their circle's bounding box touches,
+    and a query returns only the objects of the cells around it - instead of checking against all the objects.
+    The narrow phase (GameObject.collides_with) is left to the caller.
+            :param cell_size: int - size of a grid cell in pixels.
+            """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)  # (column, row) -> indices of objects
+        self.objects = []
+
+    def _cell_range(self, position, radius):
+        """Helper method to get the columns and rows covered by a circle.
+                :param position: vector - centre of the circle.
+                :param radius: float.
+                :return: tuple - (range of columns, range of rows).
+                """
+        x, y = position
+        size = self.cell_size
+        return range(int((x - radius) // size), int((x + radius) // size) + 1), \
+            range(int((y - radius) // size), int((y + radius) // size) + 1)
+
+    def build(self, objects):
+        """Rebuilds the grid from the objects. Runs once every tick, after the objects moved.
+                :param objects: list of GameObjects.
+                """
+        self.cells.clear()
+        self.objects = list(objects)
+        cells = self.cells
+        for index, game_object in enumerate(self.objects):
+            columns, rows = self._cell_range(game_object.position, game_object.radius)
+            for column in columns:
+                for row in rows:
+                    cells[(column, row)].append(index)
+
+    def query_indices(self, position, radius):
+        """Indices of the objects in the cells touched by the circle, without duplicates and in build order.
+                :param position: vector.
+                :param radius: float.
+                :return: list of int.
+                """
+        columns, rows = self._cell_range(position, radius)
+        cells = self.cells
+        found = set()
+        for column in columns:
+            for row in rows:
+                cell = cells.get((column, row))
+                if cell:
+                    found.update(cell)
+        return sorted(found)  # Same order as the original list, so the first hit is the same as a linear scan
+
+    def query(self, game_object):
+        """Candidates for collision with the object.
+                :param game_object: GameObject.
+                :return: list of GameObjects.
+                """
+        objects = self.objects
+        return [objects[i] for i in self.query_indices(game_object.position, game_object.radius)]
+
+
+class PlacementSampler:
+    """ Picks free positions for new objects (power-ups) in bounded time. The candidate positions are made once - a
+    grid with one randomly moved point per cell - and every placement only removes the candidates too close to the
+    exclusion circles and picks from the rest. No retries: the cost depends on the amount of candidates and
+    exclusions, and when no candidate is free the placement fails instead of looping.
+            :param rect: pygame.Rect - area of the positions.
+            :param spacing: int - distance between the candidates (the grid size).
+            :param seed: int - seed of the candidate positions (not from the game streams).
+            :param cell_size: int - cell size of the index of the candidates.
+            """
+
+    def __init__(self, rect, spacing=PLACEMENT_SPACING, seed=0, cell_size=PLACEMENT_CELL_SIZE):
+        rng = random.Random(seed)
+        self.cell_size = cell_size
+        self.points = []
+        for y in range(rect.top, rect.bottom, spacing):
+            for x in range(rect.left, rect.right, spacing):
+                self.points.append((x + rng.randrange(min(spacing, rect.right - x)),
+                                    y + rng.randrange(min(spacing, rect.bottom - y))))
+        self.cells = defaultdict(list)  # (column, row) -> indices of candidates
+        for index, (x, y) in enumerate(self.points):
+            self.cells[(x // cell_size, y // cell_size)].append(index)
+        self._free = bytearray(len(self.points))
+        # Counters
+        self.placements = 0
+        self.failures = 0
+        self.calls = 0
+        self.total_time = 0.0
+        self.worst_time = 0.0
+
+    def _exclude(self, position, radius):
+        """Helper method to remove the candidates inside a circle.
+                :param position: vector or tuple - centre of the circle.
+                :param radius: float.
+                """
+        x, y = position
+        size = self.cell_size
+        points = self.points
+        free = self._free
+        radius_squared = radius * radius
+        for column in range(int((x - radius) // size), int((x + radius) // size) + 1):
+            for row in range(int((y - radius) // size), int((y + radius) // size) + 1):
+                for index in self.cells.get((column, row), ()):
+                    px, py = points[index]
+                    if (px - x) * (px - x) + (py - y) * (py - y) <= radius_squared:
+                        free[index] = 0
+
+    def place(self, count, exclusions, spacing, rng):
+        """Picks positions that are outside all the exclusion circles and at least spacing from each other.
+                :param count: int - amount of positions.
+                :param exclusions: list of tuples - (position, radius) of the areas to keep clear.
+                :param spacing: float - distance between the new positions.
+                :param rng: random.Random stream.
+                :return: list of Vector2 - fewer than count when there is no free room.
+                """
+        start = time.perf_counter()
+        self._free[:] = b'\x01' * len(self.points)
+        for position, radius in exclusions:
+            self._exclude(position, radius)
+        positions = []
+        for _ in range(count):
+            free = list(compress(range(len(self.points)), self._free))
+            if not free:
+                self.failures += count - len(positions)
+                break
+            point = self.points[rng.choice(free)]
+            positions.append(Vector2(point))
+            self._exclude(point, spacing)
+        self.placements += len(positions)
+        self.calls += 1
+        elapsed = time.perf_counter() - start
+        self.total_time += elapsed
+        self.worst_time = max(self.worst_time, elapsed)
+        return positions
+
+    def stats(self):
+        """Counts and times of the placements (milliseconds).
+                :return: dict
+                """
+        return {
+            'candidates': len(self.points),
+            'placements': self.placements,
+            'failures': self.failures,
+            'avg_ms': self.total_time / self.calls * 1000 if self.calls else 0.0,
+            'worst_ms': self.worst_time * 1000,
+        }
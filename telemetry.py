@@ -0,0 +1,312 @@
+import atexit
+import json
+import os
+import struct
+import threading
+import time
+
+from profiling import RollingHistogram
+
+# Default file of the game - next to the game, not in the current directory. Rotated, so it never grows past
+# (ROTATE_BACKUPS + 1) * ROTATE_BYTES
+TELEMETRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'telemetry', 'session.jsonl')
+RING_SIZE = 8192  # Records waiting for the writer - over 2 minutes of frames at 60 fps
+FLUSH_INTERVAL = 0.5  # Seconds between the writes of the writer thread
+ROTATE_BYTES = 4 * 1024 * 1024  # Size of a telemetry file before it's rotated
+ROTATE_BACKUPS = 3  # Rotated files kept - name.1.jsonl is the newest
+METRIC_PREFIX = 'space_rocks'
+
+MAGIC = b'SRTM'
+VERSION = 2
+HEADER = struct.Struct('<4sI')  # Magic, version - at the start of every binary file
+FRAME = 1
+ROUND = 2
+RECORDS = {
+    FRAME: struct.Struct('<BdIfII'),  # Kind, unix time, frame, frame milliseconds, asteroids, bullets
+    ROUND: struct.Struct('<BdIIfId?'),  # Kind, unix time, round, ms played, fastest bullet, destroyed, score, won
+}
+FIELDS = {
+    FRAME: ('type', 'time', 'frame', 'frame_ms', 'asteroids', 'bullets'),
+    ROUND: ('type', 'time', 'round', 'time_played_ms', 'fastest_bullet_speed', 'asteroids_destroyed', 'score', 'won'),
+}
+NAMES = {FRAME: 'frame', ROUND: 'round'}
+
+
+class RingBuffer:
+    """ Ring of records from one producer (the game) to one consumer (the writer thread), without locks - each side
+    moves only its own counter, and storing a list item or an attribute is atomic in CPython. When the ring is full
+    the new record is dropped and counted, so the game never waits for a slow disk.
+            :param size: int - amount of records it holds.
+            """
+
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.slots = [None] * size
+        self.head = 0  # Records put - moved only by the producer
+        self.tail = 0  # Records taken - moved only by the consumer
+        self.dropped = 0
+
+    def put(self, record):
+        """Adds a record (producer).
+                :param record: tuple
+                :return: bool - False when it was dropped.
+                """
+        head = self.head
+        if head - self.tail >= self.size:
+            self.dropped += 1
+            return False
+        self.slots[head % self.size] = record
+        self.head = head + 1  # Only after the slot is written - the consumer reads up to head
+        return True
+
+    def take(self):
+        """Takes all the records put so far (consumer).
+                :return: list of tuples - oldest first.
+                """
+        head = self.head
+        slots = self.slots
+        size = self.size
+        records = [slots[i % size] for i in range(self.tail, head)]
+        self.tail = head
+        return records
+
+
+class Telemetry:
+    """ Structured metrics of the game - a record per frame and a record per round. The game only puts tuples in a
+    ring buffer; a writer thread turns them into JSON lines (.jsonl) or packed binary records (.bin, see RECORDS) every
+    FLUSH_INTERVAL seconds, into files that are rotated by size. It can also keep a Prometheus textfile (for the
+    textfile collector of node_exporter) with the totals and the frame time percentiles.
+    A slow or failing disk only drops records (counted), it never stalls the frame.
+            :param path: str or None - file of the records, the format is by the extension. None writes no records.
+            :param prometheus_path: str or None - .prom file, written again at every flush.
+            :param ring_size: int - records waiting for the writer.
+            :param max_bytes: int - size of a file before it's rotated.
+            :param backups: int - rotated files kept.
+            :param flush_interval: float - seconds between the writes.
+            """
+
+    def __init__(self, path=None, prometheus_path=None, ring_size=RING_SIZE, max_bytes=ROTATE_BYTES,
+                 backups=ROTATE_BACKUPS, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.binary = bool(path) and path.endswith('.bin')
+        self.prometheus_path = prometheus_path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.ring = RingBuffer(ring_size)
+        # Owned by the writer thread
+        self._file = None
+        self._size = 0
+        self.frame_times = RollingHistogram()
+        self.frames = 0
+        self.rounds = 0
+        self.wins = 0
+        self.asteroids_destroyed = 0
+        self.fastest_bullet_speed = 0.0
+        self.best_score = 0
+        # Counters
+        self.written = 0
+        self.rotations = 0
+        self.write_errors = 0
+        self.write_time = 0.0
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name='telemetry', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def frame(self, frame, frame_ms, asteroids, bullets):
+        """Records a frame.
+                :param frame: int - number of the frame.
+                :param frame_ms: float - time of the frame.
+                :param asteroids: int
+                :param bullets: int
+                :return: None
+                """
+        self.ring.put((FRAME, time.time(), frame, frame_ms, asteroids, bullets))
+
+    def round(self, number, time_played, fastest_bullet_speed, asteroids_destroyed, score, won):
+        """Records the end of a round (win or loss).
+                :param number: int - rounds played in this run.
+                :param time_played: int - game milliseconds.
+                :param fastest_bullet_speed: float
+                :param asteroids_destroyed: int
+                :param score: int or float - easy mode scores have halves.
+                :param won: bool
+                :return: None
+                """
+        self.ring.put((ROUND, time.time(), number, time_played, fastest_bullet_speed, asteroids_destroyed, score, won))
+
+    def _write_loop(self):
+        """Writer thread - flushes the ring every flush_interval seconds until close.
+                :return: None
+                """
+        while not self._stop.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _flush(self):
+        """Helper method to write the records of the ring and the Prometheus file (writer thread).
+                :return: None
+                """
+        records = self.ring.take()
+        if not records:
+            return
+        start = time.perf_counter()
+        try:
+            for record in records:
+                if record[0] == FRAME:
+                    self.frames += 1
+                    self.frame_times.add(record[3])
+                else:
+                    self.rounds += 1
+                    self.wins += record[7]
+                    self.asteroids_destroyed += record[5]
+                    self.fastest_bullet_speed = max(self.fastest_bullet_speed, record[4])
+                    self.best_score = max(self.best_score, record[6])
+            if self.path:
+                self._write(self._encode(records))
+            if self.prometheus_path:
+                self._export_prometheus()
+        except (OSError, struct.error, ValueError, TypeError):  # Bad disk or bad record - the thread goes on
+            self.write_errors += 1
+        self.write_time += time.perf_counter() - start
+
+    def _encode(self, records):
+        """Helper method to turn records into the bytes of the file. A record that can't be encoded is left out
+        (counted in write_errors), not the whole flush.
+                :param records: list of tuples.
+                :return: bytes
+                """
+        chunks = []
+        for record in records:
+            try:
+                if self.binary:
+                    chunks.append(RECORDS[record[0]].pack(*record))
+                else:
+                    fields = dict(zip(FIELDS[record[0]], record))
+                    fields['type'] = NAMES[record[0]]
+                    chunks.append(json.dumps(fields).encode() + b'\n')
+            except (struct.error, ValueError, TypeError):
+                self.write_errors += 1
+        return b''.join(chunks)
+
+    def _write(self, data):
+        """Helper method to append to the file, rotating it first when it would get too big.
+                :param data: bytes
+                :return: None
+                """
+        if self._file is not None and self._size + len(data) > self.max_bytes and self._size > HEADER.size:
+            self._rotate()
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'ab')
+            self._size = self._file.tell()
+            if self.binary and self._size == 0:
+                self._file.write(HEADER.pack(MAGIC, VERSION))
+                self._size = HEADER.size
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        self.written += len(data)
+
+    def _rotate(self):
+        """Helper method to move the full file to name.1.ext, name.1.ext to name.2.ext and so on - the oldest is
+        removed.
+                :return: None
+                """
+        self._file.close()
+        self._file = None
+        base, extension = os.path.splitext(self.path)
+        for i in range(self.backups, 0, -1):
+            source = f'{base}.{i - 1}{extension}' if i > 1 else self.path
+            if os.path.exists(source):
+                os.replace(source, f'{base}.{i}{extension}')
+        if self.backups == 0:
+            os.remove(self.path)
+        self.rotations += 1
+
+    def _export_prometheus(self):
+        """Helper method to write the Prometheus textfile - replaced in one step, the collector never reads half.
+                :return: None
+                """
+        summary = self.frame_times.summary()
+        metrics = [
+            ('frames_total', 'counter', 'Frames played.', self.frames),
+            ('rounds_total', 'counter', 'Rounds played.', self.rounds),
+            ('wins_total', 'counter', 'Rounds won.', self.wins),
+            ('asteroids_destroyed_total', 'counter', 'Asteroids destroyed in all the rounds.',
+             self.asteroids_destroyed),
+            ('fastest_bullet_speed', 'gauge', 'Fastest bullet of all the rounds.', self.fastest_bullet_speed),
+            ('best_score', 'gauge', 'Best score of all the rounds.', self.best_score),
+            ('telemetry_dropped_total', 'counter', 'Records dropped because the writer was behind.',
+             self.ring.dropped),
+        ]
+        lines = []
+        for name, kind, text, value in metrics:
+            lines += [f'# HELP {METRIC_PREFIX}_{name} {text}', f'# TYPE {METRIC_PREFIX}_{name} {kind}',
+                      f'{METRIC_PREFIX}_{name} {value}']
+        name = f'{METRIC_PREFIX}_frame_milliseconds'
+        lines += [f'# HELP {name} Frame time of the last frames.', f'# TYPE {name} summary']
+        for quantile in ('p50', 'p95', 'p99'):
+            lines.append(f'{name}{{quantile="0.{quantile[1:]}"}} {summary[quantile]:.4f}')
+        lines.append(f'{name}_count {self.frames}')
+        temp_path = f'{self.prometheus_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, self.prometheus_path)
+
+    def close(self):
+        """Writes what's left and stops the writer thread. Runs at exit.
+                :return: None
+                """
+        if self._writer is not None:
+            self._stop.set()
+            self._writer.join()
+            self._writer = None
+            atexit.unregister(self.close)
+
+    def stats(self):
+        """Counts of the telemetry.
+                :return: dict
+                """
+        return {
+            'records': self.ring.head,
+            'dropped': self.ring.dropped,
+            'waiting': self.ring.head - self.ring.tail,
+            'written_bytes': self.written,
+            'rotations': self.rotations,
+            'write_errors': self.write_errors,
+            'write_ms': self.write_time * 1000,
+        }
+
+
+def read_records(path):
+    """Reads a telemetry file of either format.
+            :param path: str - .jsonl or .bin file.
+            :return: list of dict - the fields of FIELDS, with the type as a name.
+            """
+    if not path.endswith('.bin'):
+        with open(path) as file:
+            return [json.loads(line) for line in file if line.strip()]
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path} is not a telemetry file of version {VERSION}')
+    records = []
+    offset = HEADER.size
+    while offset < len(data):
+        record = RECORDS[data[offset]]
+        if offset + record.size > len(data):
+            break  # Cut by a crash
+        values = record.unpack_from(data, offset)
+        fields = dict(zip(FIELDS[values[0]], values))
+        fields['type'] = NAMES[values[0]]
+        records.append(fields)
+        offset += record.size
+    return records
@@ -0,0 +1,71 @@
+import os
+
+import pygame
+import pytest
+
+import archive
+from archive import AssetArchive, build_archive
+
+
+def _save_png(path, size, color):
+    surface = pygame.Surface(size)
+    surface.fill(color)
+    pygame.image.save(surface, str(path))
+
+
+@pytest.fixture
+def assets(tmp_path):
+    sprites = tmp_path / 'assets' / 'sprites'
+    sprites.mkdir(parents=True)
+    _save_png(sprites / 'ship.png', (8, 8), (255, 0, 0))
+    _save_png(sprites / 'rock.png', (16, 16), (0, 255, 0))
+    (sprites / 'notes.txt').write_text('not packed')
+    return tmp_path / 'assets'
+
+
+def test_archive_serves_the_packed_files(assets, tmp_path):
+    path = str(tmp_path / 'assets.pak')
+    index = build_archive(str(assets), path)
+    assert sorted(index) == ['sprites/rock.png', 'sprites/ship.png']
+
+    pak = AssetArchive(path, str(assets))
+    try:
+        assert pak.names('sprites/') == ['sprites/rock.png', 'sprites/ship.png']
+        assert pak.read('sprites/ship.png') == (assets / 'sprites' / 'ship.png').read_bytes()
+        assert pak.get('sprites/rock.png').get_size() == (16, 16)
+        assert pak.get('sprites/missing.png') is None
+        assert pak.stats()['stale'] == 0
+    finally:
+        pak.close()
+
+
+def test_changed_source_file_falls_back_to_the_loose_file(assets, tmp_path):
+    path = str(tmp_path / 'assets.pak')
+    build_archive(str(assets), path)
+    ship = assets / 'sprites' / 'ship.png'
+    _save_png(ship, (12, 12), (0, 0, 255))  # Changed after the build - the archive is stale for it
+    stat = os.stat(ship)
+    os.utime(ship, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    pak = AssetArchive(path, str(assets))
+    try:
+        assert pak.stale == ['sprites/ship.png']
+        assert 'sprites/ship.png' not in pak
+        assert pak.get('sprites/ship.png') is None  # load_sprite reads the loose file then
+        pak.preload(['sprites/ship.png'])
+        assert pak.get('sprites/ship.png') is None
+        assert pak.get('sprites/rock.png').get_size() == (16, 16)  # The other entries are still used
+    finally:
+        pak.close()
+
+
+def test_broken_archive_is_ignored_with_a_warning(tmp_path, monkeypatch):
+    path = tmp_path / 'assets.pak'
+    path.write_bytes(b'not an archive at all')
+    monkeypatch.setattr(archive, 'ARCHIVE_PATH', str(path))
+    monkeypatch.setattr(archive, '_archive', None)
+    monkeypatch.setattr(archive, '_archive_checked', False)
+
+    with pytest.warns(UserWarning, match='Ignoring the asset archive'):
+        assert archive.get_archive() is None
+    assert archive.get_archive() is None  # Checked once
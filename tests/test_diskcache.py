@@ -0,0 +1,75 @@
+import os
+
+import pygame
+import pytest
+
+import diskcache
+from diskcache import DiskSurfaceCache
+
+KEY = ('ship', True, 0.5, 0, None)  # (name, with_alpha, scale, angle, size) of load_sprite
+
+
+@pytest.fixture
+def sprites(tmp_path, monkeypatch):
+    pygame.display.init()
+    pygame.display.set_mode((64, 64))  # convert() needs a display
+    monkeypatch.setattr(diskcache, 'ASSETS_DIR', str(tmp_path / 'assets'))
+    folder = tmp_path / 'assets' / 'sprites'
+    folder.mkdir(parents=True)
+    return folder
+
+
+def _save_png(path, color):
+    surface = pygame.Surface((8, 8), pygame.SRCALPHA)
+    surface.fill(color)
+    pygame.image.save(surface, str(path))
+    stat = os.stat(path)  # A new mtime even when the file system keeps seconds only
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _scaled(color):
+    surface = pygame.Surface((4, 4), pygame.SRCALPHA)
+    surface.fill(color)
+    return surface.convert_alpha()
+
+
+def test_cached_sprite_is_read_by_the_next_launch(sprites, tmp_path):
+    _save_png(sprites / 'ship.png', (255, 0, 0, 255))
+    cache = DiskSurfaceCache(str(tmp_path / 'cache'))
+    assert cache.load(KEY) is None
+    cache.save(KEY, _scaled((255, 0, 0, 128)))
+
+    cache = DiskSurfaceCache(str(tmp_path / 'cache'))
+    surface = cache.load(KEY)
+    assert surface.get_size() == (4, 4)
+    assert surface.get_at((1, 1)) == (255, 0, 0, 128)
+    assert cache.stats()['hits'] == 1
+    assert cache.names() == {'ship'}
+
+
+def test_changed_source_png_makes_the_entry_again(sprites, tmp_path):
+    _save_png(sprites / 'ship.png', (255, 0, 0, 255))
+    cache = DiskSurfaceCache(str(tmp_path / 'cache'))
+    cache.save(KEY, _scaled((255, 0, 0, 255)))
+
+    _save_png(sprites / 'ship.png', (0, 0, 255, 255))  # The artist changed the sprite
+    cache = DiskSurfaceCache(str(tmp_path / 'cache'))
+    assert cache.load(KEY) is None
+    assert cache.stats()['stale'] == 1
+    cache.save(KEY, _scaled((0, 0, 255, 255)))  # What load_sprite does after a miss
+
+    cache = DiskSurfaceCache(str(tmp_path / 'cache'))
+    assert cache.load(KEY).get_at((1, 1)) == (0, 0, 255, 255)
+
+
+def test_broken_cache_file_is_not_used(sprites, tmp_path):
+    _save_png(sprites / 'ship.png', (255, 0, 0, 255))
+    cache = DiskSurfaceCache(str(tmp_path / 'cache'))
+    cache.save(KEY, _scaled((255, 0, 0, 255)))
+    path = cache._path(KEY)
+    with open(path, 'rb') as file:
+        data = file.read()
+    with open(path, 'wb') as file:
+        file.write(data[:-10])  # Cut off, e.g. by a full disk
+
+    assert DiskSurfaceCache(str(tmp_path / 'cache')).load(KEY) is None
@@ -0,0 +1,48 @@
+import pytest
+from pygame.math import Vector2
+
+from lod import LevelOfDetail
+from pools import EntityList
+
+
+class _Direction:
+    """Counts the rotations of an asteroid."""
+
+    def __init__(self):
+        self.turns = 0
+
+    def rotate_ip(self, angle):
+        self.turns += 1
+
+
+class _Asteroid:
+    """What the level of detail reads of an asteroid."""
+
+    def __init__(self, x, y):
+        self.size = 3
+        self.position = Vector2(x, y)
+        self.velocity = Vector2(1, 0)
+        self.ast_direction = _Direction()
+        self.rotation_direction = 1
+        self.rotation_speed = 0.3
+
+    def random_rotation(self):
+        self.ast_direction.turns += 1
+
+
+@pytest.mark.parametrize('index', range(12))
+def test_far_asteroids_rotate_once_per_interval_across_a_removal(index):
+    lod = LevelOfDetail(focus_radius=100, far_interval=4)
+    asteroids = EntityList(_Asteroid(1000 + 60 * i, 1000) for i in range(12))  # All far from the focus
+    removed = asteroids[index]
+    removals = 0
+    for cycle in range(3):
+        for part in range(4):
+            if cycle == 1 and part == 1:  # Destroyed in the middle of a cycle
+                asteroids.remove(removed)
+                removals += 1
+                removed_turns = removed.ast_direction.turns
+            lod.rotate(asteroids, Vector2(0, 0), removals)
+        assert [asteroid.ast_direction.turns for asteroid in asteroids] == [cycle + 1] * len(asteroids), cycle
+    assert removed.ast_direction.turns == removed_turns  # Not rotated after its release
+    assert lod.stats()['rotations'] == 12 + 11 + 11 + removed_turns - 1
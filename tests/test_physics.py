@@ -0,0 +1,148 @@
+import pygame
+import pytest
+
+import game as game_module
+from game import Game
+from inputs import InputFrame, ScriptedInput
+from modules import Asteroid, Bullet
+from physics import BOUNCE_MARGIN, PhysicsWorld
+from scores import ScoreStore
+from simulation import random_streams
+from utils import load_sprite
+
+
+@pytest.fixture(autouse=True)
+def headless_game(monkeypatch):
+    monkeypatch.setattr(Game, 'score_store', ScoreStore(path=None))
+    monkeypatch.setattr(game_module, 'shield_state', False)  # Global - the pilots toggle it
+    Game._init_pygame(headless=True)
+
+
+def _hard_pilot(tick, game):
+    """Hard mode - turns, flies and shoots until it dies or wins."""
+    if tick == 0:
+        return InputFrame.create(key_down=[pygame.K_SPACE])
+    pressed = [pygame.K_LEFT] if tick % 90 < 40 else [pygame.K_UP, pygame.K_RIGHT]
+    return InputFrame.create(pressed=pressed, key_down=[pygame.K_SPACE] if tick % 6 == 0 else [])
+
+
+def _easy_pilot(tick, game):
+    """Easy mode (shield, half points) - sits in the middle and spins while shooting."""
+    if tick == 0:
+        return InputFrame.create(click=game.menu_toggle_mode.center)
+    if tick == 1:
+        return InputFrame.create(key_down=[pygame.K_SPACE])
+    return InputFrame.create(pressed=[pygame.K_RIGHT], key_down=[pygame.K_SPACE] if tick % 4 == 0 else [])
+
+
+def _snapshot(game):
+    return {
+        'asteroids': [(*asteroid.position, *asteroid.velocity, *asteroid.ast_direction, asteroid.size)
+                      for asteroid in game.asteroids],
+        'bullets': [(*bullet.position, *bullet.velocity) for bullet in game.bullets],
+        'spaceship': tuple(game.spaceship.position) if game.spaceship else None,
+        'score': game.score,
+        'asteroids_destroyed': game.asteroids_destroyed,
+        'rounds': game.rounds,
+        'won': game.win_option,
+    }
+
+
+def _play(physics, seed, pilot, ticks=900):
+    game_module.shield_state = False
+    game = Game(physics, headless=True, seed=seed, screen_size=(1280, 720))
+    game.input_source = ScriptedInput(pilot, game)
+    snapshots = []
+    for tick in range(ticks):
+        game.step()
+        if tick % 30 == 0:
+            snapshots.append(_snapshot(game))
+    snapshots.append(_snapshot(game))
+    return snapshots
+
+
+@pytest.mark.parametrize('pilot', [_hard_pilot, _easy_pilot])
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_numpy_game_matches_python_game(seed, pilot):
+    python_game = _play('python', seed, pilot)
+    numpy_game = _play('numpy', seed, pilot)
+    assert python_game[-1]['asteroids_destroyed'] > 0  # The pilot played - not only the menu
+    for tick, (expected, actual) in enumerate(zip(python_game, numpy_game)):
+        assert actual == expected, f'different at tick {tick * 30}'
+
+
+def _bounce_positions(margin, width=800, height=600):
+    """Positions on every wall and the bottom of the menu half, half a pixel before and after them, and far outside."""
+    menu_bottom = (height - margin + 50) / 2
+    xs = [-10, width / 2, width + 10]
+    ys = [-10, height / 2, height + 10]
+    for x in (margin, width - margin):
+        xs += [x - 0.5, x, x + 0.5]
+    for y in (margin, menu_bottom, height - margin):
+        ys += [y - 0.5, y, y + 0.5]
+    return [(x, y) for x in xs for y in ys]
+
+
+@pytest.mark.parametrize('menu_state', [True, False])
+@pytest.mark.parametrize('size', [1, 2, 3])
+def test_batch_bounce_matches_asteroid_bounce(size, menu_state):
+    screen = pygame.display.set_mode((800, 600))
+    world = PhysicsWorld()
+    positions = _bounce_positions(BOUNCE_MARGIN[size])
+    plain, bodies = [], []
+    for i, position in enumerate(positions):
+        random_streams.seed(i)
+        plain.append(Asteroid(position, None, size, menu_state))
+        random_streams.seed(i)
+        bodies.append(world.Asteroid(position, None, size, menu_state))
+
+    for asteroid in plain:
+        asteroid.asteroid_bounce(screen)
+    world.bounce(screen)
+    for position, asteroid, body in zip(positions, plain, bodies):
+        assert (body.position, body.velocity) == (asteroid.position, asteroid.velocity), position
+
+
+def _around(center, distance, rng):
+    """A point at a distance from the centre, in a random direction."""
+    return pygame.Vector2(center) + pygame.Vector2(distance, 0).rotate(rng.uniform(0, 360))
+
+
+def test_batch_collisions_match_collides_with():
+    pygame.display.set_mode((800, 600))
+    random_streams.seed(5)
+    rng = random_streams.get('spawn')
+    world = PhysicsWorld()
+    sprite = load_sprite('bullet')
+    asteroids = [world.Asteroid((rng.uniform(100, 700), rng.uniform(100, 500)), None, rng.choice([1, 2, 3]))
+                 for _ in range(30)]
+    # A bullet just inside and one just outside the reach of every asteroid
+    bullets = []
+    for asteroid in asteroids:
+        reach = asteroid.radius + sprite.get_width() / 2
+        for distance in (reach - 0.001, reach + 0.001):
+            bullets.append(world.Bullet(_around(asteroid.position, distance, rng), sprite, (0, 0)))
+
+    hits = world.collisions(asteroids, bullets)
+    expected = [[asteroid.collides_with(bullet) for bullet in bullets] for asteroid in asteroids]
+    assert hits.tolist() == expected
+    assert all(row[2 * i] and not row[2 * i + 1] for i, row in enumerate(expected))
+
+
+def test_circle_hits_match_collides_with():
+    pygame.display.set_mode((800, 600))
+    random_streams.seed(6)
+    rng = random_streams.get('spawn')
+    world = PhysicsWorld()
+    ship = Bullet((400, 300), load_sprite('bullet'), (0, 0))
+    ship.radius = 40  # A circle as big as the spaceship
+    asteroids = []
+    for i in range(40):  # Just inside and just outside the circle, in turn
+        asteroid = world.Asteroid((0, 0), None, rng.choice([1, 2, 3]))
+        reach = asteroid.radius + ship.radius
+        asteroid.position = _around(ship.position, reach - 0.001 if i % 2 == 0 else reach + 0.001, rng)
+        asteroids.append(asteroid)
+
+    hits = world.circle_hits(asteroids, ship.position, ship.radius)
+    assert hits.tolist() == [asteroid.collides_with(ship) for asteroid in asteroids]
+    assert hits.tolist() == [i % 2 == 0 for i in range(40)]
@@ -0,0 +1,80 @@
+import random
+
+import pygame
+import pytest
+
+from game import Game
+from modules import Asteroid, Bullet
+from physics import PhysicsWorld
+from pools import EntityList, ObjectPool, release
+from simulation import random_streams
+from utils import load_sprite
+
+
+@pytest.fixture(autouse=True)
+def screen():
+    Game._init_pygame(headless=True)
+    return pygame.display.set_mode((800, 600))
+
+
+def _asteroid_state(asteroid):
+    return (tuple(asteroid.position), tuple(asteroid.velocity), tuple(asteroid.ast_direction), asteroid.radius,
+            asteroid.sprite, asteroid.size, asteroid.menu_state, asteroid.rotation_direction, asteroid.rotation_speed)
+
+
+def test_released_bullet_is_reused_in_its_own_vectors():
+    pool = ObjectPool(Bullet)
+    sprite = load_sprite('bullet')
+    bullet = pool.acquire((1, 2), sprite, (3, 4))
+    position, velocity = bullet.position, bullet.velocity
+    release(bullet)
+    reused = pool.acquire((5, 6), sprite, (7, 8), True)
+
+    assert reused is bullet
+    assert reused.position is position and reused.velocity is velocity  # Updated in place, not new vectors
+    assert (reused.position, reused.velocity, reused.powerup) == ((5, 6), (7, 8), True)
+    assert reused.pool is pool
+    assert pool.stats() == {'in_use': 1, 'free': 0, 'peak_in_use': 1, 'created': 1, 'reused': 1}
+
+
+@pytest.mark.parametrize('physics', [False, True])
+def test_reused_asteroid_is_the_same_as_a_new_one(physics):
+    world = PhysicsWorld() if physics else None
+    cls = world.Asteroid if physics else Asteroid
+    pool = ObjectPool(cls)
+    random_streams.seed(1)
+    released = pool.acquire((100, 100), None, 3, True)
+    if physics:
+        world.remove(released)
+    release(released)
+
+    random_streams.seed(2)
+    reused = pool.acquire((300, 200), None, 2, False)
+    random_streams.seed(2)
+    new = cls((300, 200), None, 2, False)
+
+    assert pool.stats()['reused'] == 1
+    assert _asteroid_state(reused) == _asteroid_state(new)
+    if physics:
+        arrays = world.asteroids
+        assert arrays.count == 2 and arrays.handles[reused.slot] is reused
+        assert arrays.spin_cos[reused.slot] == arrays.spin_cos[new.slot]
+        assert arrays.spin_sin[reused.slot] == arrays.spin_sin[new.slot]
+
+
+def test_entity_list_keeps_its_index_after_swap_removes():
+    rng = random.Random(7)
+    items = EntityList(object() for _ in range(50))
+    removed = []
+    for step in range(500):
+        if items and rng.random() < 0.6:
+            item = items[rng.randrange(len(items))]
+            items.remove(item)
+            removed.append(item)
+        else:
+            items.append(removed.pop() if removed and rng.random() < 0.5 else object())
+        assert items._index == {id(item): i for i, item in enumerate(items)}, step
+    assert all(item in items for item in items)
+    assert not any(item in items for item in removed)
+    with pytest.raises(ValueError):
+        items.remove(object())
@@ -0,0 +1,76 @@
+import pygame
+import pytest
+
+import game as game_module
+from game import Game, GameOptions, replay_session
+from inputs import InputFrame, ScriptedInput
+from scores import ScoreStore
+
+RESET_TICK = 400  # F1 in the middle of the round
+
+
+@pytest.fixture(autouse=True)
+def headless_game(monkeypatch):
+    monkeypatch.setattr(Game, 'score_store', ScoreStore(path=None))
+    monkeypatch.setattr(game_module, 'shield_state', False)
+    Game._init_pygame(headless=True)
+
+
+def _pilot(tick, game):
+    """Starts, flies and shoots, starts again with F1 and plays on."""
+    if tick in (0, RESET_TICK + 2):
+        return InputFrame.create(key_down=[pygame.K_SPACE])
+    if tick == RESET_TICK:
+        return InputFrame.create(key_down=[pygame.K_F1])
+    pressed = [pygame.K_LEFT] if tick % 90 < 40 else [pygame.K_UP, pygame.K_RIGHT]
+    return InputFrame.create(pressed=pressed, key_down=[pygame.K_SPACE] if tick % 6 == 0 else [])
+
+
+def _state(game):
+    return {
+        'score': game.score,
+        'asteroids_destroyed': game.asteroids_destroyed,
+        'ticks': game.game_clock.get_ticks(),
+        'frame': game.game_clock.frame,
+        'asteroids': [(*asteroid.position, *asteroid.velocity) for asteroid in game.asteroids],
+        'spaceship': tuple(game.spaceship.position) if game.spaceship else None,
+    }
+
+
+def _record(path, ticks=800):
+    source = ScriptedInput(_pilot)
+    game = Game(headless=True, seed=7, screen_size=(1280, 720), input_source=source,
+                options=GameOptions(record=path))
+    source.game = game
+    game.run_headless(ticks)
+    game.input_source.close()
+    return game
+
+
+@pytest.mark.parametrize('physics', ['python', 'numpy'])
+def test_replay_plays_the_recorded_game_again(tmp_path, monkeypatch, physics):
+    resets = []
+    reset = Game.reset
+    monkeypatch.setattr(Game, 'reset', lambda game: resets.append(game) or reset(game))
+    path = str(tmp_path / 'session.jsonl')
+    recorded = _record(path)
+    assert resets == [recorded]  # The F1 soft reset is part of the recording
+    assert recorded.asteroids_destroyed > 0
+
+    game_module.shield_state = True  # Changed after the recording - the replay takes it from the header
+    replayed = replay_session(path, physics=physics)
+    assert resets == [recorded, replayed]
+    assert _state(replayed) == _state(recorded)
+    assert game_module.shield_state is False
+
+
+def test_replay_keeps_the_fps_to_its_game(tmp_path, monkeypatch):
+    path = str(tmp_path / 'session.jsonl')
+    monkeypatch.setattr(Game, 'target_fps', 30)
+    recorded = _record(path, ticks=200)
+    monkeypatch.setattr(Game, 'target_fps', 60)
+
+    replayed = replay_session(path)
+    assert replayed.target_fps == 30
+    assert replayed.game_clock.get_ticks() == recorded.game_clock.get_ticks()
+    assert Game.target_fps == 60
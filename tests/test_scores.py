@@ -0,0 +1,68 @@
+import os
+
+from scores import HEADER, RECORD, ScoreStore
+
+
+def test_fractional_score_is_saved_and_reloaded(tmp_path):
+    path = str(tmp_path / 'scores.log')
+    store = ScoreStore(path)
+    store.add(7.5, 1200, 15)  # Easy mode - half a point per asteroid
+    store.add(3, 800, 3)
+    store.close()
+    assert store.write_errors == 0
+
+    reloaded = ScoreStore(path)
+    assert reloaded.top() == [7.5, 3]
+    assert isinstance(reloaded.top()[1], int)  # Whole scores come back as int, like the game has them
+
+
+def test_record_cut_by_a_crash_is_left_out(tmp_path):
+    path = str(tmp_path / 'scores.log')
+    store = ScoreStore(path)
+    for score in (4, 9, 6):
+        store.add(score)
+    store.close()
+    with open(path, 'ab') as file:
+        file.write(RECORD.pack(100, 0, 0, 0)[:RECORD.size // 2])  # Half a record
+
+    reloaded = ScoreStore(path)
+    assert reloaded.top() == [9, 6, 4]
+    assert reloaded.stats()['rounds'] == 3
+    reloaded.add(7)
+    reloaded.close()
+    assert reloaded.compactions == 1  # The cut record is dropped before appending
+    assert os.path.getsize(path) == HEADER.size + 4 * RECORD.size
+    assert ScoreStore(path).top(amount=5) == [9, 7, 6, 4]
+
+
+def test_compaction_keeps_the_top_rounds(tmp_path):
+    path = str(tmp_path / 'scores.log')
+    store = ScoreStore(path, keep=5, compact_records=8)
+    scores = [(i * 7) % 20 for i in range(20)]
+    for score in scores:
+        store.add(score)
+        store.flush()  # One record per write, so the compactions happen at known rounds
+    store.close()
+    stats = store.stats()
+    assert stats['compactions'] == 4  # The new log (written whole) and at rounds 9, 13 and 17
+    assert stats['write_errors'] == 0
+    assert os.path.getsize(path) == HEADER.size + stats['log_records'] * RECORD.size
+    assert stats['log_records'] <= 8
+
+    reloaded = ScoreStore(path, keep=5, compact_records=8)
+    assert reloaded.top(amount=5) == sorted(scores, reverse=True)[:5]
+    assert reloaded.stats()['rounds'] == 20  # The dropped rounds are still counted
+
+
+def test_close_writes_the_queued_rounds(tmp_path):
+    path = str(tmp_path / 'scores.log')
+    store = ScoreStore(path)
+    for score in range(50):
+        store.add(score, 1000, score)
+    store.close()
+    assert store.written == store.added == 50
+    assert os.path.getsize(path) == HEADER.size + 50 * RECORD.size
+
+    reloaded = ScoreStore(path)
+    assert reloaded.stats()['rounds'] == 50
+    assert reloaded.top() == [49, 48, 47]
@@ -0,0 +1,71 @@
+from simulation import GameClock, RandomStreams
+
+
+def _ticks(clock, amount):
+    for _ in range(amount):
+        clock.tick()
+
+
+def test_timers_fire_in_due_order_on_game_time():
+    clock = GameClock(fps=50)  # 20 ms per tick
+    fired = []
+    clock.schedule(100, fired.append, 'late')
+    clock.schedule(40, fired.append, 'early')
+    clock.schedule(100, fired.append, 'late, scheduled second')
+    cancelled = clock.schedule(60, fired.append, 'cancelled')
+    GameClock.cancel(cancelled)
+    GameClock.cancel(None)
+    assert clock.pending() == 3
+
+    _ticks(clock, 2)
+    assert fired == ['early'] and clock.get_ticks() == 40
+    _ticks(clock, 3)
+    assert fired == ['early', 'late', 'late, scheduled second']
+    assert clock.pending() == 0 and clock.fired == 3
+
+
+def test_paused_clock_stops_the_time_and_the_timers():
+    clock = GameClock(fps=50)
+    fired = []
+    clock.schedule(60, fired.append, 'powerup ends')
+    _ticks(clock, 2)
+    clock.pause()
+    _ticks(clock, 10)
+    assert clock.get_ticks() == 40 and fired == []
+    assert clock.frame == 12  # Ticks are still counted
+    clock.resume()
+    clock.tick()
+    assert clock.get_ticks() == 60 and fired == ['powerup ends']
+
+
+def test_time_scale_runs_the_timers_faster_or_slower():
+    fast, slow = GameClock(fps=50), GameClock(fps=50)
+    fast.time_scale, slow.time_scale = 2.0, 0.5
+    fired = []
+    fast.schedule(200, fired.append, 'fast')
+    slow.schedule(200, fired.append, 'slow')
+    _ticks(fast, 5)
+    _ticks(slow, 5)
+    assert fired == ['fast'] and (fast.get_ticks(), slow.get_ticks()) == (200, 50)
+    _ticks(slow, 15)
+    assert fired == ['fast', 'slow']
+
+
+def test_reset_starts_from_zero_without_the_old_timers():
+    clock = GameClock(fps=50)
+    fired = []
+    clock.schedule(100, fired.append, 'last game')
+    _ticks(clock, 3)
+    clock.reset()
+    assert (clock.get_ticks(), clock.frame, clock.pending()) == (0, 0, 0)
+    clock.schedule(20, fired.append, 'new game')
+    _ticks(clock, 10)
+    assert fired == ['new game']
+
+
+def test_streams_repeat_with_a_seed_and_are_independent():
+    first, second = RandomStreams(5), RandomStreams(5)
+    second.get('sounds').random()  # Using one stream doesn't move the others
+    assert [first.get('spawn').random() for _ in range(3)] == [second.get('spawn').random() for _ in range(3)]
+    assert RandomStreams(5).get('spawn').random() != RandomStreams(6).get('spawn').random()
+    assert first.seed() == first.seed_value
@@ -0,0 +1,80 @@
+import random
+
+import pygame
+import pytest
+
+from modules import GameObject
+from spatial import CELL_SIZE, PlacementSampler, SpatialHash
+
+
+def _circle(x, y, radius):
+    return GameObject((x, y), pygame.Surface((radius * 2, radius * 2)), (0, 0))
+
+
+def _objects(rng, count):
+    """Circles anywhere on (and around) the screen, and circles that straddle the cell borders and corners."""
+    circles = []
+    for _ in range(count):
+        radius = rng.choice([10, 25, 45, 60])
+        circles.append(_circle(rng.uniform(-200, 1400), rng.uniform(-200, 900), radius))
+        border = rng.randrange(-1, 10) * CELL_SIZE
+        offset = rng.uniform(-radius, radius)  # Centre on either side of the border, the circle over it
+        if rng.random() < 0.5:
+            circles.append(_circle(border + offset, rng.uniform(0, 720), radius))
+        else:
+            circles.append(_circle(border + offset, rng.randrange(0, 6) * CELL_SIZE + rng.uniform(-radius, radius),
+                                   radius))
+    return circles
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_query_finds_the_same_collisions_as_a_full_scan(seed):
+    rng = random.Random(seed)
+    grid = SpatialHash()
+    objects = _objects(rng, 150)
+    grid.build(objects)
+    probes = _objects(rng, 150) + objects
+    for probe in probes:
+        expected = [other for other in objects if probe.collides_with(other)]
+        assert [other for other in grid.query(probe) if probe.collides_with(other)] == expected
+    assert sum(len(grid.query(probe)) for probe in probes) < len(probes) * len(objects) / 4  # A broadphase
+
+
+def test_circle_on_a_corner_is_found_from_all_four_cells():
+    grid = SpatialHash()
+    corner = _circle(CELL_SIZE, CELL_SIZE, 10)
+    grid.build([corner])
+    assert sorted(cell for cell, indices in grid.cells.items() if indices) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    for dx in (-5, 5):
+        for dy in (-5, 5):
+            probe = _circle(CELL_SIZE + dx, CELL_SIZE + dy, 1)  # Only in one of the cells
+            assert grid.query(probe) == [corner] and probe.collides_with(corner)
+    assert grid.query_indices((CELL_SIZE * 3, CELL_SIZE * 3), 10) == []
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_placements_keep_clear_of_the_exclusions_and_each_other(seed):
+    rect = pygame.Rect(0, 70, 1210, 580)
+    sampler = PlacementSampler(rect)
+    rng = random.Random(seed)
+    exclusions = [((rng.uniform(0, 1280), rng.uniform(0, 720)), rng.choice([40, 90, 150])) for _ in range(12)]
+    positions = sampler.place(6, exclusions, 100, rng)
+
+    assert len(positions) == 6
+    for i, position in enumerate(positions):
+        assert rect.collidepoint(position)
+        assert all(position.distance_to(center) > radius for center, radius in exclusions)
+        assert all(position.distance_to(other) >= 100 for other in positions[i + 1:])
+    assert sampler.place(6, exclusions, 100, random.Random(seed)) == \
+        PlacementSampler(rect).place(6, exclusions, 100, random.Random(seed))  # Same stream, same positions
+
+
+def test_placement_fails_instead_of_looping_when_there_is_no_room():
+    rect = pygame.Rect(0, 0, 400, 400)
+    sampler = PlacementSampler(rect)
+    rng = random.Random(1)
+    assert sampler.place(3, [((200, 200), 1000)], 50, rng) == []  # Everything excluded
+    assert len(sampler.place(5, [], 300, rng)) < 5  # Room for only a few at this spacing
+    stats = sampler.stats()
+    assert stats['placements'] > 0
+    assert stats['failures'] == 3 + 5 - stats['placements']
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from game import Game, GameOptions
+from scores import ScoreStore
+from telemetry import Telemetry, read_records
+
+
+def test_end_round_records_the_round(tmp_path, monkeypatch):
+    monkeypatch.setattr(Game, 'score_store', ScoreStore(path=None))
+    path = str(tmp_path / 'session.jsonl')
+    game = Game(headless=True, seed=1, options=GameOptions(telemetry_path=path))
+    game.score = 4.5
+    game.asteroids_destroyed = 9
+    game.fastest_bullet_speed = 7.25
+    game._end_round(False)
+    game.telemetry.close()
+
+    rounds = [record for record in read_records(path) if record['type'] == 'round']
+    assert len(rounds) == 1
+    assert rounds[0]['round'] == 1
+    assert rounds[0]['score'] == 4.5
+    assert rounds[0]['asteroids_destroyed'] == 9
+    assert rounds[0]['fastest_bullet_speed'] == 7.25
+    assert rounds[0]['won'] is False
+    assert game.telemetry.write_errors == 0
+
+
+def test_frame_does_not_wait_for_a_stalled_writer(tmp_path):
+    telemetry = Telemetry(str(tmp_path / 'session.jsonl'), ring_size=16, flush_interval=0.001)
+    stalled = threading.Event()
+    release = threading.Event()
+    write = telemetry._write
+
+    def stalled_write(data):  # A disk that doesn't answer
+        stalled.set()
+        release.wait()
+        write(data)
+    telemetry._write = stalled_write
+
+    telemetry.frame(0, 16.0, 6, 0)
+    assert stalled.wait(5)  # The writer took the first frame and hangs in the write
+    start = time.perf_counter()
+    for frame in range(1, 101):
+        telemetry.frame(frame, 16.0, 6, 0)
+    assert time.perf_counter() - start < 0.5
+    assert telemetry.ring.dropped == 100 - 16  # The ring is full - the rest is dropped, not waited for
+
+    release.set()
+    telemetry.close()
+    assert len(read_records(telemetry.path)) == 1 + 16
@@ -1,50 +1,359 @@
+import os
+import time
+import weakref
+from collections import OrderedDict
+
+import pygame.font
 import pygame.image
+import pygame.transform
 from pygame.math import Vector2
+from pygame.transform import rotozoom
 import random
 
+from archive import ASSETS_DIR, get_archive
+from diskcache import scaled_cache
+
+SPRITE_CACHE_BUDGET = 64 * 1024 * 1024  # Bytes of pixel data the sprite cache may hold (64MB)
+ROTATION_STEPS = 72  # Angles pre-rotated per sprite (72 = every 5 degrees, 360 = every degree)
+TEXT_CACHE_BUDGET = 4 * 1024 * 1024  # Bytes of rendered text the text cache may hold (4MB)
+
+
+class SurfaceCache:
+    """ LRU cache for loaded sprites. Keeps decoded and converted surfaces in memory so the same image is read from
+    disk only once, and evicts the least recently used surfaces when the memory budget is exceeded.
+            :param budget_bytes: int - max bytes of pixel data to keep.
+            """
+
+    def __init__(self, budget_bytes=SPRITE_CACHE_BUDGET):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._surfaces = OrderedDict()  # key -> surface, oldest first
+
+    @staticmethod
+    def surface_bytes(surface):
+        """Helper method to calculate the memory a surface uses.
+                :param surface: pygame.Surface.
+                :return: int - bytes of pixel data.
+                """
+        return surface.get_pitch() * surface.get_height()
+
+    def get(self, key):
+        """Returns the cached surface and marks it as recently used.
+                :param key: tuple - (name, with_alpha, scale, angle).
+                :return: pygame.Surface or None if not cached.
+                """
+        surface = self._surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._surfaces.move_to_end(key)
+        return surface
+
+    def put(self, key, surface):
+        """Adds a surface to the cache, evicting old surfaces until it fits the budget.
+                :param key: tuple - (name, with_alpha, scale, angle).
+                :param surface: pygame.Surface.
+                :return: pygame.Surface - the same surface.
+                """
+        size = self.surface_bytes(surface)
+        if size > self.budget_bytes:
+            return surface  # Bigger than the whole budget - not worth keeping
+        if key in self._surfaces:
+            self.used_bytes -= self.surface_bytes(self._surfaces.pop(key))
+        self._surfaces[key] = surface
+        self.used_bytes += size
+        self._evict()
+        return surface
+
+    def set_budget(self, budget_bytes):
+        """Changes the memory budget and evicts surfaces if needed.
+                :param budget_bytes: int.
+                """
+        self.budget_bytes = budget_bytes
+        self._evict()
+
+    def _evict(self):
+        """Removes the least recently used surfaces until the cache fits the budget.
+                """
+        while self.used_bytes > self.budget_bytes and self._surfaces:
+            _, surface = self._surfaces.popitem(last=False)
+            self.used_bytes -= self.surface_bytes(surface)
+            self.evictions += 1
+
+    def clear(self):
+        """Empties the cache (counters are kept).
+                """
+        self._surfaces.clear()
+        self.used_bytes = 0
+
+    def stats(self):
+        """Cache counters - misses are also the number of PNG decodes from disk.
+                :return: dict.
+                """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._surfaces),
+            'used_bytes': self.used_bytes,
+            'budget_bytes': self.budget_bytes,
+        }
+
+
+sprite_cache = SurfaceCache()
+
+
+class RotationAtlas:
+    """ Pre-rotated copies of one sprite at quantized angles, so drawing a rotated sprite is a lookup and not a
+    rotozoom. Frames are built lazily on first use, or all at once with build().
+            :param sprite: pygame.Surface - the unrotated sprite.
+            :param steps: int - amount of angles in a full circle.
+            :param rle: bool - run-length encodes the frames, blits skip their transparent runs (several times faster
+            for big sprites, the blend of the edges can be 1 off).
+            """
+
+    def __init__(self, sprite, steps=ROTATION_STEPS, rle=False):
+        self.sprite = sprite
+        self.steps = steps
+        self.rle = rle
+        self.step_angle = 360 / steps
+        self.frames = [None] * steps
+        self.offsets = [None] * steps  # Half the size of each frame - the blit position is the centre minus this
+        self.memory_bytes = 0
+        self.build_time = 0.0  # Seconds spent rotating
+
+    def _build_frame(self, index):
+        """Rotates the sprite to the angle of the given index and stores it.
+                :param index: int - angle index.
+                """
+        start = time.perf_counter()
+        frame = rotozoom(self.sprite, index * self.step_angle, 1.0)
+        if self.rle:
+            frame.set_alpha(255, pygame.RLEACCEL)  # Encoded on the first blit
+        self.frames[index] = frame
+        self.offsets[index] = Vector2(frame.get_size()) * 0.5
+        self.memory_bytes += SurfaceCache.surface_bytes(frame)
+        self.build_time += time.perf_counter() - start
+
+    def build(self):
+        """Builds all the frames that were not built yet (to pay the cost at startup instead of during the game).
+                """
+        for index in range(self.steps):
+            if self.frames[index] is None:
+                self._build_frame(index)
+
+    def frame(self, angle):
+        """Returns the frame closest to the angle.
+                :param angle: float - degrees, any range.
+                :return: tuple - (rotated surface, offset from the centre to the top-left).
+                """
+        index = round(angle / self.step_angle) % self.steps
+        if self.frames[index] is None:
+            self._build_frame(index)
+        return self.frames[index], self.offsets[index]
+
+
+class RotationCache:
+    """ Holds a RotationAtlas for every sprite drawn rotated. Atlases are dropped with their sprite.
+            :param steps: int - amount of angles in a full circle.
+            """
+
+    def __init__(self, steps=ROTATION_STEPS):
+        self.steps = steps
+        self.rle = False
+        self._atlases = weakref.WeakKeyDictionary()  # sprite -> atlas
+
+    def atlas(self, sprite):
+        """Returns the atlas of the sprite, creating an empty one if needed.
+                :param sprite: pygame.Surface.
+                :return: RotationAtlas.
+                """
+        atlas = self._atlases.get(sprite)
+        if atlas is None:
+            atlas = self._atlases[sprite] = RotationAtlas(sprite, self.steps, self.rle)
+        return atlas
 
-def load_sprite(name, with_alpha=True):
-    """Helper method to load img of a sprite.
+    def frame(self, sprite, angle):
+        """Returns the rotated sprite and its offset (see RotationAtlas.frame).
+                :param sprite: pygame.Surface.
+                :param angle: float - degrees.
+                :return: tuple - (rotated surface, offset).
+                """
+        atlas = self._atlases.get(sprite)
+        if atlas is None:
+            atlas = self.atlas(sprite)
+        return atlas.frame(angle)
+
+    def prebuild(self, sprites):
+        """Builds all angles of the given sprites now instead of lazily.
+                :param sprites: iterable of pygame.Surface.
+                """
+        for sprite in sprites:
+            self.atlas(sprite).build()
+
+    def set_steps(self, steps):
+        """Changes the angular resolution. Drops all the frames built so far.
+                :param steps: int - amount of angles in a full circle.
+                """
+        self.steps = steps
+        self._atlases.clear()
+
+    def set_rle(self, rle):
+        """Turns the run-length encoding of the frames on or off (see RotationAtlas). Drops all the frames built so
+        far when it changes.
+                :param rle: bool
+                """
+        if rle != self.rle:
+            self.rle = rle
+            self._atlases.clear()
+
+    def stats(self):
+        """Memory and build time of all atlases - to trade angular resolution against RAM.
+                :return: dict.
+                """
+        atlases = list(self._atlases.values())
+        return {
+            'steps': self.steps,
+            'rle': self.rle,
+            'atlases': len(atlases),
+            'frames': sum(self.steps - atlas.frames.count(None) for atlas in atlases),
+            'memory_bytes': sum(atlas.memory_bytes for atlas in atlases),
+            'build_time': sum(atlas.build_time for atlas in atlases),
+        }
+
+
+rotation_cache = RotationCache()
+
+
+def load_sprite(name, with_alpha=True, scale=1.0, angle=0, size=None):
+    """Helper method to load img of a sprite. Images are cached, so only the first call reads the file.
+    Scaled images are also kept on disk (see DiskSurfaceCache), so the next launches don't scale them again.
+    The returned surface is shared - don't draw on it.
             :param name: name of the sprite img.
             :param with_alpha: bool - enables transparent colors.
-            :return: bool - Placement of score (x), using backspaces
+            :param scale: float - rotozoom scale of the img.
+            :param angle: float - rotozoom angle of the img.
+            :param size: tuple (width, height) or None - scales the img to exactly this size instead (backgrounds).
+            :return: pygame.Surface
             """
-    img_path = f'assets/sprites/{name}.png'
-    loaded_sprite = pygame.image.load(img_path)
+    key = (name, with_alpha, scale, angle, size and tuple(size))
+    cached_sprite = sprite_cache.get(key)
+    if cached_sprite is not None:
+        return cached_sprite
+
+    if scale != 1.0 or angle != 0 or size:
+        scaled_sprite = scaled_cache.load(key)
+        if scaled_sprite is None:
+            # Transformed from the original (cached as well) instead of decoding the file again
+            original = load_sprite(name, with_alpha)
+            scaled_sprite = pygame.transform.scale(original, size) if size else rotozoom(original, angle, scale)
+            scaled_cache.save(key, scaled_sprite)
+        return sprite_cache.put(key, scaled_sprite)
+
+    archive = get_archive()
+    loaded_sprite = archive.get(f'sprites/{name}.png') if archive else None
+    if loaded_sprite is None:  # No archive, or not in it
+        loaded_sprite = pygame.image.load(os.path.join(ASSETS_DIR, 'sprites', f'{name}.png'))
     if with_alpha:
         # Convert_alpha is to handle transparent color but is a bit slower
-        return loaded_sprite.convert_alpha()
+        return sprite_cache.put(key, loaded_sprite.convert_alpha())
     else:
-        return loaded_sprite.convert()
+        return sprite_cache.put(key, loaded_sprite.convert())
+
+
+def preload_sprites(names):
+    """Starts decoding sprites of the asset archive in background threads, so load_sprite only converts them.
+            :param names: list of str - names of the sprites the game is about to use.
+            :return: None
+            """
+    archive = get_archive()
+    if archive:
+        on_disk = scaled_cache.names()  # Only used scaled - read from the disk cache, no need to decode them
+        archive.preload([f'sprites/{name}.png' for name in names if name not in on_disk])
 
 
-def get_random_position(surface):
+fonts = {}  # (name, size) -> pygame.font.Font
+text_cache = SurfaceCache(TEXT_CACHE_BUDGET)  # Rendered text by (text, color, font)
+
+
+def get_font(size, name=None):
+    """Helper method to get a font. Fonts are created once per name and size and shared.
+            :param size: int - font size.
+            :param name: str or None - font file, None is the default font of pygame.
+            :return: pygame.font.Font
+            """
+    key = (name, size)
+    font = fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = fonts[key] = pygame.font.Font(name, size)
+    return font
+
+
+def render_text(font, text, color):
+    """Helper method to render antialiased text. Rendered text is cached, so text that didn't change costs only the blit.
+    The returned surface is shared - don't draw on it.
+            :param font: pygame.font.Font.
+            :param text: str.
+            :param color: str or tuple.
+            :return: pygame.Surface
+            """
+    key = (text, color if isinstance(color, str) else tuple(color), font)
+    text_surface = text_cache.get(key)
+    if text_surface is None:
+        text_surface = text_cache.put(key, font.render(text, True, color))
+    return text_surface
+
+
+def get_random_position(surface, rng=random):
     """Helper method to give a random position inside the screen borders.
             :param surface: screen.
+            :param rng: random.Random stream (default is the random module).
             :return: Vector position.
             """
     return Vector2(
-        random.randrange(70, surface.get_width()) - 70,
-        random.randrange(70, surface.get_height() - 70)
+        rng.randrange(70, surface.get_width()) - 70,
+        rng.randrange(70, surface.get_height() - 70)
     )
 
 
-def menu_get_random_position(surface):
+def menu_get_random_position(surface, rng=random):
     """Helper method to give a random position inside the screen borders in the menu.
             :param surface: screen.
+            :param rng: random.Random stream (default is the random module).
             :return: Vector position.
             """
-    return Vector2(random.randrange(100, surface.get_width() - 100), random.randrange(100, surface.get_height() // 2))
+    return Vector2(rng.randrange(100, surface.get_width() - 100), rng.randrange(100, surface.get_height() // 2))
 
 
-def get_random_velocity(min_speed, max_speed):
+def get_random_velocity(min_speed, max_speed, rng=random):
     """Helper method to give a random speed at a random direction.
             :param min_speed: minimum speed.
             :param max_speed: maximum speed.
+            :param rng: random.Random stream (default is the random module).
             :return: Vector speed .
             """
-    speed = random.randint(min_speed, max_speed)
-    angle = random.randint(0, 360)
+    return set_random_velocity(Vector2(), min_speed, max_speed, rng)
+
+
+def set_random_velocity(velocity, min_speed, max_speed, rng=random):
+    """Helper method to give a random speed at a random direction, in a vector that already exists (see
+    get_random_velocity) - the same random values and the same result.
+            :param velocity: Vector2 - changed in place.
+            :param min_speed: minimum speed.
+            :param max_speed: maximum speed.
+            :param rng: random.Random stream (default is the random module).
+            :return: the vector.
+            """
+    speed = rng.randint(min_speed, max_speed)
+    angle = rng.randint(0, 360)
     # The random angle changes the direction of th speed and the x / y are not really important to have a value over 0.
-    return Vector2(0, speed).rotate(angle)
+    velocity.update(0, speed)
+    velocity.rotate_ip(angle)
+    return velocity
 